@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+小六壬择日：与逐时辰调用 solar_to_lunar + HandTechnique 的暴力扫描校验并对比耗时
+
+用法：
+    uv run benchmarks/bench_auspicious_time.py
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.chdir(ROOT)
+
+from auspicious_time import find_slots, iter_slots
+from hand_technique import HandTechnique
+from utils.calendar_converter import solar_to_lunar
+
+TARGETS = ["大安", "速喜", "小吉"]
+
+
+def brute_force(start: datetime, end: datetime, targets=TARGETS, position: int = 2):
+    """按 CLI 日期起卦的映射逐小时计算，合并为时段起点列表"""
+    starts = []
+    t = start
+    previous = None
+    while t < end:
+        _, lunar_month, lunar_day, _ = solar_to_lunar(t.year, t.month, t.day)
+        numbers = (lunar_month, lunar_day, (t.hour + 1) % 24 // 2 + 1)
+        symbols = HandTechnique._HandTechnique__generate_prediction(*numbers)
+        hit = symbols[position].name in targets
+        # 同一时辰、同一农历日期的连续小时属于同一时段
+        key = (t.date(), numbers)
+        if hit and key != previous:
+            starts.append(t)
+        previous = key if hit else None
+        t += timedelta(hours=1)
+    return starts
+
+
+def validate() -> None:
+    start, end = datetime(2024, 1, 1), datetime(2025, 3, 1)
+    for position in range(3):
+        expected = brute_force(start, end, position=position)
+        found = [slot.start for slot in iter_slots(TARGETS, start, end, position)]
+        assert found == expected, position
+    page1 = find_slots(TARGETS, start, limit=20)
+    page2 = find_slots(TARGETS, start, limit=20, offset=20)
+    assert page1 + page2 == find_slots(TARGETS, start, limit=40)
+    assert find_slots(TARGETS, page1[-1].end, limit=20) == page2
+    print("校验通过：与逐小时暴力扫描结果一致，分页结果连续")
+
+
+def main():
+    validate()
+
+    start, end = datetime(2025, 1, 1), datetime(2045, 1, 1)
+
+    begin = time.perf_counter()
+    find_slots(TARGETS, start, limit=20)
+    first_page = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    count = sum(1 for _ in iter_slots(["天德"], start, end, position=0))
+    full_scan = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    brute_force(datetime(2025, 1, 1), datetime(2026, 1, 1))
+    brute_year = time.perf_counter() - begin
+
+    print(f"前 20 个时段：{first_page * 1000:.2f} ms")
+    print(f"20 年全量扫描（{count} 个时段）：{full_scan * 1000:.1f} ms")
+    print(f"暴力扫描 1 年：{brute_year * 1000:.1f} ms（20 年约 {brute_year * 20:.1f} s）")
+
+
+if __name__ == "__main__":
+    main()
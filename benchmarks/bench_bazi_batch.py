@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+批量八字引擎：与标量函数逐条校验并对比吞吐
+
+用法：
+    uv run benchmarks/bench_bazi_batch.py [样本数]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.chdir(ROOT)
+
+import numpy as np
+
+from utils.bazi_batch import (
+    DAY_MASTER_TEXTS, SPOUSE_PALACE_TEXTS, batch_analyze, decode_bazi, decode_missing
+)
+from utils.bazi_calculator import calculate_bazi, analyze_day_master_strength, analyze_spouse_palace
+from utils.five_elements_utils import analyze_wuxing
+from utils.ganzhi import EARTHLY_BRANCHES, WUXING_ORDER
+
+
+def _random_cohort(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.integers(1900, 2100, n),
+        rng.integers(1, 13, n),
+        rng.integers(1, 29, n),
+        rng.integers(0, 24, n),
+        rng.integers(0, 60, n),
+        rng.integers(0, 2, n).astype(bool),
+    )
+
+
+def validate(n: int = 20_000) -> None:
+    """逐条对比批量引擎与标量函数的结果"""
+    years, months, days, hours, minutes, is_male = _random_cohort(n, seed=11)
+    result = batch_analyze(years, months, days, hours, is_male, minutes)
+
+    for i in range(n):
+        gender = "男" if is_male[i] else "女"
+        bazi = calculate_bazi(int(years[i]), int(months[i]), int(days[i]), int(hours[i]), int(minutes[i]))
+        analysis = analyze_wuxing(bazi)
+
+        assert decode_bazi(result.charts[i]) == bazi, i
+        counts = dict(zip(WUXING_ORDER, result.element_counts[i].tolist()))
+        assert counts == analysis["wuxing_count"], i
+        assert decode_missing(int(result.missing_mask[i])) == analysis["missing"], i
+
+        day_master = DAY_MASTER_TEXTS[int(is_male[i])][int(result.day_master_yang[i])]
+        assert day_master == analyze_day_master_strength(bazi, gender), i
+        branch = EARTHLY_BRANCHES[result.spouse_branch[i]]
+        spouse = SPOUSE_PALACE_TEXTS[result.spouse_category[i]]
+        assert analyze_spouse_palace(bazi, gender).endswith(f"{branch}，{spouse}"), i
+
+    print(f"校验通过：{n} 条记录与标量函数一致")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    validate()
+
+    years, months, days, hours, minutes, is_male = _random_cohort(n)
+
+    start = time.perf_counter()
+    batch_analyze(years, months, days, hours, is_male, minutes)
+    batch_elapsed = time.perf_counter() - start
+
+    sample = min(n, 50_000)
+    start = time.perf_counter()
+    for i in range(sample):
+        gender = "男" if is_male[i] else "女"
+        bazi = calculate_bazi(int(years[i]), int(months[i]), int(days[i]), int(hours[i]), int(minutes[i]))
+        analyze_wuxing(bazi)
+        analyze_day_master_strength(bazi, gender)
+        analyze_spouse_palace(bazi, gender)
+    scalar_per_record = (time.perf_counter() - start) / sample
+
+    print(f"批量引擎：{n} 条 {batch_elapsed * 1000:.1f} ms（{batch_elapsed / n * 1e9:.0f} ns/条）")
+    print(f"标量函数：{scalar_per_record * 1e6:.2f} µs/条")
+    print(f"加速比：{scalar_per_record / (batch_elapsed / n):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
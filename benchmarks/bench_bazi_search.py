@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+八字反查：与逐时刻 compute_chart 的结果校验，并测量查询耗时
+
+用法：
+    uv run benchmarks/bench_bazi_search.py
+"""
+
+import os
+import random
+import sys
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.chdir(ROOT)
+
+from utils.bazi_search import get_pillar_index, parse_pillar, search_bazi
+from utils.ganzhi import compute_chart
+
+QUERIES = [
+    {"day": "甲子", "time": "午"},
+    {"year": "甲辰", "month": "丙寅", "day": "甲子"},
+    {"month": "丙寅", "time": "子"},
+    {"year": "庚子", "month": "戊子", "day": "庚", "time": "丙子"},
+    {"month": "卯", "day": "壬"},
+    {"year": "癸卯", "time": "亥"},
+]
+
+
+def validate(samples: int = 20_000, seed: int = 3) -> None:
+    """随机抽取时刻，检查是否落入结果区间与其四柱是否满足条件一致"""
+    rng = random.Random(seed)
+    lo, hi = datetime(1998, 1, 1), datetime(2026, 1, 1)
+    span = int((hi - lo).total_seconds() // 60)
+
+    for query in QUERIES:
+        matches = list(search_bazi(**query, start=lo, end=hi))
+        starts = [m.start for m in matches]
+        allowed = {pillar: parse_pillar(value) for pillar, value in query.items()}
+        positions = {"year": 0, "month": 1, "day": 2, "time": 3}
+
+        for _ in range(samples):
+            t = lo + timedelta(minutes=rng.randrange(span))
+            chart = compute_chart(t.year, t.month, t.day, t.hour, t.minute)
+            expected = all(chart[positions[p]] in s for p, s in allowed.items())
+            i = bisect_right(starts, t) - 1
+            found = i >= 0 and matches[i].start <= t < matches[i].end
+            assert found == expected, (query, t)
+
+        # 区间边界两侧各一分钟
+        for m in matches[:200]:
+            for t, inside in ((m.start, True), (m.end - timedelta(minutes=1), True),
+                              (m.start - timedelta(minutes=1), False)):
+                if not lo <= t < hi:
+                    continue
+                chart = compute_chart(t.year, t.month, t.day, t.hour, t.minute)
+                ok = all(chart[positions[p]] in s for p, s in allowed.items())
+                assert ok == inside, (query, t)
+
+    print(f"校验通过：{len(QUERIES)} 组条件，每组 {samples} 个随机时刻")
+
+
+def main():
+    start = time.perf_counter()
+    get_pillar_index()
+    print(f"建立索引：{(time.perf_counter() - start) * 1000:.2f} ms")
+
+    validate()
+
+    for query in QUERIES:
+        start = time.perf_counter()
+        results = search_bazi(**query)
+        first = next(results)
+        first_elapsed = time.perf_counter() - start
+        count = 1 + sum(1 for _ in results)
+        total_elapsed = time.perf_counter() - start
+        print(f"{query}：首个结果 {first_elapsed * 1e6:.0f} µs，全部 {count} 段 {total_elapsed * 1000:.2f} ms"
+              f"（首段 {first.start:%Y-%m-%d %H:%M} ~ {first.end:%Y-%m-%d %H:%M}）")
+
+
+if __name__ == "__main__":
+    main()
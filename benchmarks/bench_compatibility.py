@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+合婚匹配引擎：与逐对标量计算校验，并测量 N×N 矩阵与 top-k 查询耗时
+
+用法：
+    uv run benchmarks/bench_compatibility.py [人数]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+os.chdir(ROOT)
+
+import numpy as np
+
+from utils.bazi_calculator import calculate_bazi
+from utils.compatibility import (
+    build_profiles, compatibility_matrix, complement_score, pair_breakdown,
+    top_matches, branch_relation, stem_score, SPOUSE_RELATION_SCORES, ZODIAC_RELATION_SCORES
+)
+from utils.five_elements_utils import analyze_wuxing
+from utils.ganzhi import EARTHLY_BRANCHES, HEAVENLY_STEMS, WUXING_ORDER
+
+
+def _random_group(n: int, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.integers(1950, 2010, n),
+        rng.integers(1, 13, n),
+        rng.integers(1, 29, n),
+        rng.integers(0, 24, n),
+        rng.integers(0, 2, n).astype(bool),
+        rng.integers(0, 60, n),
+    )
+
+
+def _scalar_score(a: dict, b: dict) -> int:
+    """直接由干支字符串计算的参考实现"""
+    def missing_mask(person):
+        return sum(1 << WUXING_ORDER.index(e) for e in analyze_wuxing(person["bazi"])["missing"])
+
+    def palace(person):
+        return person["bazi"]["day" if person["male"] else "year"][1]
+
+    stem = stem_score(HEAVENLY_STEMS.index(a["bazi"]["day"][0]), HEAVENLY_STEMS.index(b["bazi"]["day"][0]))
+    spouse = SPOUSE_RELATION_SCORES[branch_relation(EARTHLY_BRANCHES.index(palace(a)),
+                                                    EARTHLY_BRANCHES.index(palace(b)))]
+    zodiac = ZODIAC_RELATION_SCORES[branch_relation(EARTHLY_BRANCHES.index(a["bazi"]["year"][1]),
+                                                    EARTHLY_BRANCHES.index(b["bazi"]["year"][1]))]
+    return stem + spouse + zodiac + complement_score(missing_mask(a), missing_mask(b))
+
+
+def validate(n: int = 300) -> None:
+    years, months, days, hours, is_male, minutes = _random_group(n, seed=9)
+    profiles = build_profiles(years, months, days, hours, is_male, minutes)
+    matrix = compatibility_matrix(profiles)
+
+    people = [
+        {"bazi": calculate_bazi(int(years[i]), int(months[i]), int(days[i]), int(hours[i]), int(minutes[i])),
+         "male": bool(is_male[i])}
+        for i in range(n)
+    ]
+    for i in range(n):
+        for j in range(n):
+            assert matrix[i, j] == _scalar_score(people[i], people[j]), (i, j)
+    assert (matrix == matrix.T).all()
+    assert pair_breakdown(profiles, 0, 1)["total"] == matrix[0, 1]
+
+    for i, best, scores in top_matches(profiles, k=5, block_rows=64):
+        row = matrix[i].astype(np.int16)
+        row[i] = -1
+        expected = sorted(range(n), key=lambda j: (-row[j], j))[:5]
+        assert best.tolist() == expected, i
+        assert scores.tolist() == row[expected].tolist(), i
+
+    print(f"校验通过：{n}×{n} 分数矩阵与逐对计算一致，top-k 结果正确")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    validate()
+
+    profiles = build_profiles(*_random_group(n))
+
+    start = time.perf_counter()
+    compatibility_matrix(profiles)
+    matrix_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in top_matches(profiles, k=10, opposite_gender=True):
+        pass
+    topk_elapsed = time.perf_counter() - start
+
+    print(f"{n}×{n} 分数矩阵：{matrix_elapsed * 1000:.1f} ms（{matrix_elapsed / n / n * 1e9:.2f} ns/对）")
+    print(f"每人 top-10 异性匹配：{topk_elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+公历转农历性能对比：预计算速查表 vs lunardate
+
+用法：
+    uv run benchmarks/bench_lunar_table.py
+"""
+
+import os
+import random
+import sys
+import timeit
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from lunardate import LunarDate
+
+from utils.calendar_converter import solar_to_lunar
+from utils.lunar_table import START_DATE, get_lunar_table
+
+
+def _sample_dates(n: int, seed: int = 42) -> list[tuple[int, int, int]]:
+    table = get_lunar_table()
+    rng = random.Random(seed)
+    dates = []
+    for _ in range(n):
+        d = START_DATE + timedelta(days=rng.randrange(table.count))
+        dates.append((d.year, d.month, d.day))
+    return dates
+
+
+def _lunardate_convert(dates):
+    for y, m, d in dates:
+        lunar = LunarDate.fromSolarDate(y, m, d)
+        (lunar.year, lunar.month, lunar.day, lunar.isLeapMonth)
+
+
+def _table_convert(dates):
+    for y, m, d in dates:
+        solar_to_lunar(y, m, d)
+
+
+def main():
+    dates = _sample_dates(10_000)
+
+    # 先校验结果一致
+    for y, m, d in dates:
+        lunar = LunarDate.fromSolarDate(y, m, d)
+        assert solar_to_lunar(y, m, d) == (lunar.year, lunar.month, lunar.day, lunar.isLeapMonth), (y, m, d)
+
+    results = {}
+    for name, func in [("lunardate", _lunardate_convert), ("lunar_table", _table_convert)]:
+        best = min(timeit.repeat(lambda: func(dates), number=1, repeat=5))
+        results[name] = best / len(dates) * 1e6
+        print(f"{name:<12} {results[name]:8.3f} µs/次")
+
+    print(f"加速比：{results['lunardate'] / results['lunar_table']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
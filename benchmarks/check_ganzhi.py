@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+日柱回归检查：已知参考日期的日柱
+
+逐个比较标量 ganzhi.day_pillar 与批量 bazi_batch 引擎（batch_day_numbers + batch_day_pillars）
+在参考日期上的结果，覆盖日柱速查表的两端（1900-01-01、2100-12-31）与表外日期（按公式计算）。
+参考值以 1900-01-01 甲戌、1949-10-01 甲子等公认日柱为准，直接写成干支，不由被测代码推算。
+同时运行 utils.ganzhi 中的 doctest（该模块使用相对导入，不能直接用 python -m doctest 运行）。
+
+任一日期不符时以退出码 1 结束，可直接用于 CI。
+
+用法：
+    uv run benchmarks/check_ganzhi.py
+"""
+
+import doctest
+import os
+import sys
+from typing import List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+
+import numpy as np
+
+from utils.bazi_batch import batch_day_numbers, batch_day_pillars
+from utils import ganzhi
+from utils.ganzhi import JIAZI_NAMES, day_pillar
+
+# (年, 月, 日, 日柱)
+REFERENCE_DAYS: List[Tuple[int, int, int, str]] = [
+    (1800, 1, 1, "庚寅"),     # 表外，早于速查表
+    (1899, 12, 31, "癸酉"),   # 表外，速查表前一日
+    (1900, 1, 1, "甲戌"),     # 速查表首日
+    (1949, 10, 1, "甲子"),
+    (2000, 1, 1, "戊午"),
+    (2024, 2, 10, "甲辰"),
+    (2100, 12, 31, "丁未"),   # 速查表末日
+    (2101, 1, 1, "戊申"),     # 表外，速查表后一日
+]
+
+
+def main() -> int:
+    years, months, days, expected = (list(column) for column in zip(*REFERENCE_DAYS))
+    batch = batch_day_pillars(batch_day_numbers(np.array(years), np.array(months), np.array(days))).tolist()
+
+    failures = []
+    print(f"{'日期':<14}{'参考':>6}{'标量':>6}{'批量':>6}")
+    for (year, month, day, name), batch_pillar in zip(REFERENCE_DAYS, batch):
+        scalar = JIAZI_NAMES[day_pillar(year, month, day)]
+        vector = JIAZI_NAMES[batch_pillar]
+        label = f"{year:04d}-{month:02d}-{day:02d}"
+        print(f"{label:<14}{name:>6}{scalar:>6}{vector:>6}")
+        if scalar != name:
+            failures.append(f"{label} 标量日柱 {scalar}，应为 {name}")
+        if vector != name:
+            failures.append(f"{label} 批量日柱 {vector}，应为 {name}")
+
+    doctests = doctest.testmod(ganzhi)
+    if doctests.failed:
+        failures.append(f"utils.ganzhi 的 doctest 有 {doctests.failed} 项失败")
+
+    for failure in failures:
+        print(f"✗ {failure}", file=sys.stderr)
+    if not failures:
+        print(f"✓ {len(REFERENCE_DAYS)} 个参考日期的日柱一致，{doctests.attempted} 项 doctest 通过")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+启动耗时预算检查：python -X importtime
+
+在子进程中逐个导入 CLI 入口模块，读取 -X importtime 输出中该模块的累计导入耗时，
+取多次运行的最小值与预算比较；同时检查启动时不应加载的重量级依赖（pydantic-ai、
+openai、NumPy 只在占卜解读、八字批量计算等功能真正用到时才导入）。
+另外计时一次笔画数、公历转农历子命令的完整进程耗时。
+
+任一项超出预算时以退出码 1 结束，可直接用于 CI。
+
+用法：
+    uv run benchmarks/check_import_time.py
+    uv run benchmarks/check_import_time.py --scale 2 --repeat 7
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+
+# 模块 -> (累计导入耗时预算 ms, 不应加载的模块)
+IMPORT_BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "cli": (150.0, ("pydantic_ai", "openai", "numpy")),
+    "cli_batch": (100.0, ("pydantic_ai", "openai", "numpy", "rich")),
+    "daemon": (30.0, ("pydantic_ai", "openai", "numpy", "rich", "asyncio")),
+    "utils.stroke_count": (10.0, ()),
+    "utils.calendar_converter": (30.0, ("numpy",)),
+}
+
+# 子命令 -> (标准输入, 完整进程耗时预算 ms)
+COMMAND_BUDGETS: Dict[str, Tuple[str, float]] = {
+    "strokes": ('{"chars": "小六壬"}\n', 500.0),
+    "lunar": ('{"date": "2024-02-10"}\n', 500.0),
+}
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = SRC_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure_import(module: str) -> Tuple[float, Set[str]]:
+    """
+    在新进程中导入模块
+
+    Returns:
+        (该模块的累计导入耗时 ms, 导入过程中加载的全部模块名)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    cumulative, loaded = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|", 2)
+        if not total.strip().isdigit():
+            continue  # 表头
+        loaded.add(name.strip())
+        if name.rstrip() == f" {module}":
+            cumulative = int(total) / 1000
+    if cumulative is None:
+        raise RuntimeError(f"未找到 {module} 的导入耗时")
+    return cumulative, loaded
+
+
+def measure_command(command: str, stdin: str) -> float:
+    """运行一次 cli.py 子命令，返回完整进程耗时 ms"""
+    begin = time.perf_counter()
+    subprocess.run(
+        [sys.executable, os.path.join("src", "cli.py"), command],
+        cwd=PROJECT_ROOT, env=_env(), input=stdin, capture_output=True, text=True, check=True,
+    )
+    return (time.perf_counter() - begin) * 1000
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="CLI 启动耗时预算检查")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量次数，取最小值")
+    parser.add_argument("--scale", type=float, default=1.0, help="预算倍数，较慢的机器可放宽")
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'模块':<28}{'耗时 ms':>10}{'预算 ms':>10}")
+    for module, (budget, forbidden) in IMPORT_BUDGETS.items():
+        runs = [measure_import(module) for _ in range(args.repeat)]
+        best = min(cumulative for cumulative, _ in runs)
+        limit = budget * args.scale
+        print(f"{module:<28}{best:>10.1f}{limit:>10.1f}")
+        if best > limit:
+            failures.append(f"{module} 导入耗时 {best:.1f} ms 超出预算 {limit:.1f} ms")
+        leaked = sorted(name for name in forbidden if name in runs[0][1])
+        if leaked:
+            failures.append(f"{module} 启动时加载了 {', '.join(leaked)}")
+
+    for command, (stdin, budget) in COMMAND_BUDGETS.items():
+        best = min(measure_command(command, stdin) for _ in range(args.repeat))
+        limit = budget * args.scale
+        print(f"{'cli.py ' + command:<28}{best:>10.1f}{limit:>10.1f}")
+        if best > limit:
+            failures.append(f"cli.py {command} 耗时 {best:.1f} ms 超出预算 {limit:.1f} ms")
+
+    for failure in failures:
+        print(f"✗ {failure}", file=sys.stderr)
+    if not failures:
+        print("✓ 启动耗时均在预算内")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
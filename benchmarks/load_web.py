@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Web 压测：模拟多个浏览器会话并发占卜
+
+启动一个 web.py 进程（使用本地模拟 LLM，见 src/mock_llm.py），按 NiceGUI 浏览器端的协议
+模拟 N 个客户端：请求页面（服务端构建整页元素树）、建立 socket.io 连接并握手、
+依次按数字、时间、汉字三种方式填写输入与问题并点击「开始占卜」，直到解读结果推送回来；
+指定 --follow-ups 时，每次占卜后再在追问框中追问若干次。
+并发数逐级增加，每一级报告：
+
+    页面构建      GET / 的耗时 p50 / p95 / p99 与页面大小
+    即时解读      点击到离线模板解读（LLM 结果到达前的即时首答）推送到达的耗时 p50
+    占卜结果      点击到解读结果推送到达的耗时 p50 / p95 / p99，以及每秒完成数
+    追问          回车到追问回答推送到达的耗时 p50 / p95 / p99（仅 --follow-ups）
+    推送消息      websocket update 消息的 JSON 大小 p50 / p95 / 最大值与总量
+    事件循环      服务端 /metrics 中事件循环延迟的均值与 p99（按直方图桶估计）、服务进程 CPU 占用
+
+客户端与服务端在同一台机器上运行时会争用 CPU，单核机器上的结果偏保守。
+
+用法：
+    uv run benchmarks/load_web.py
+    uv run benchmarks/load_web.py --clients 1,10,50,100 --rounds 3 --ttft 0.8 --token-rate 60
+    uv run benchmarks/load_web.py --clients 5 --follow-ups 2
+    uv run benchmarks/load_web.py --url http://127.0.0.1:8080 -o load.json   # 压测已运行的服务
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+
+FLOWS = ("numbers", "date", "chinese")
+QUESTIONS = ("今年换工作是否顺利？", "这次考试能通过吗？", "合作项目能否谈成？", "搬家选在下个月好吗？")
+FOLLOW_UPS = ("什么时候行动最好？", "需要注意哪些人？", "往哪个方向发展更好？")
+CHINESE_SAMPLES = ("天行健", "小六壬", "关税战", "川建国", "地势坤")
+
+_HTML_ENTITIES = (('&#36;', '$'), ('&#96;', '`'), ('&gt;', '>'), ('&lt;', '<'), ('&amp;', '&'))
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """最近秩百分位数，values 为空时返回 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def parse_page(html: str) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+    """
+    从 NiceGUI 页面中取出元素树与 socket.io 连接参数
+
+    Returns:
+        (元素编号 -> 元素, 连接参数 {client_id, next_message_id})
+    """
+    raw = re.search(r"parseElements\(String\.raw`(.*?)`\)", html, re.S).group(1)
+    for entity, char in _HTML_ENTITIES:
+        raw = raw.replace(entity, char)
+    query = re.search(r"query: (\{.*?\}),", html).group(1)
+    return json.loads(raw), json.loads(query.replace("'", '"'))
+
+
+@dataclass
+class ClientStats:
+    """一个模拟客户端的测量结果"""
+    page_ms: List[float] = field(default_factory=list)
+    page_bytes: List[int] = field(default_factory=list)
+    result_ms: List[float] = field(default_factory=list)
+    instant_ms: List[float] = field(default_factory=list)
+    follow_up_ms: List[float] = field(default_factory=list)
+    message_bytes: List[int] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+class SimulatedClient:
+    """按浏览器端协议操作占卜页面的客户端"""
+
+    def __init__(self, base_url: str, index: int, stats: ClientStats, timeout: float):
+        self.base_url = base_url
+        self.index = index
+        self.stats = stats
+        self.timeout = timeout
+        self.elements: Dict[str, Dict[str, Any]] = {}
+        self.query: Dict[str, Any] = {}
+        self.sio = None
+        self.next_message_id = 0
+        self._done: Optional[asyncio.Future] = None
+        self._began = 0.0
+        self._instant_seen = True
+
+    async def open(self, http):
+        """请求页面并建立 socket.io 连接"""
+        import socketio
+
+        begin = time.perf_counter()
+        response = await http.get(self.base_url + "/")
+        response.raise_for_status()
+        self.stats.page_ms.append((time.perf_counter() - begin) * 1000)
+        self.stats.page_bytes.append(len(response.content))
+        self.elements, self.query = parse_page(response.text)
+
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.sio.on("update", self._on_update)
+        url = f"{self.base_url}/?client_id={self.query['client_id']}&next_message_id={self.query['next_message_id']}"
+        await self.sio.connect(url, transports=["websocket"], socketio_path="/_nicegui_ws/socket.io")
+        ok = await self.sio.call("handshake", {
+            "client_id": self.query["client_id"],
+            "document_id": f"load-{self.index}",
+            "tab_id": f"load-tab-{self.index}",
+            "old_tab_id": None,
+            "next_message_id": self.query["next_message_id"],
+        }, timeout=self.timeout)
+        if not ok:
+            raise RuntimeError("握手失败")
+
+    async def close(self):
+        if self.sio is not None:
+            await self.sio.disconnect()
+
+    def _find(self, tag: str, placeholder: str = "") -> List[str]:
+        return [element_id for element_id, element in self.elements.items()
+                if element["tag"] == tag and element.get("props", {}).get("placeholder", "").startswith(placeholder)]
+
+    def _listener(self, element_id: str, prefix: str) -> str:
+        for event in self.elements[element_id].get("events", []):
+            if event["type"].startswith(prefix):
+                return event["listener_id"]
+        raise KeyError(f"元素 {element_id} 没有 {prefix} 事件")
+
+    async def _emit(self, element_id: str, event: str, *args):
+        await self.sio.emit("event", {
+            "id": int(element_id),
+            "client_id": self.query["client_id"],
+            "listener_id": self._listener(element_id, event),
+            "args": [json.dumps(arg, ensure_ascii=False) for arg in args],
+        })
+
+    async def _set_value(self, element_id: str, value):
+        await self._emit(element_id, "update:", value)
+
+    def _on_update(self, message: Dict[str, Any]):
+        self.next_message_id = max(self.next_message_id, message.pop("_id", -1) + 1)
+        payload = json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+        self.stats.message_bytes.append(len(payload.encode("utf-8")))
+        for element_id, element in message.items():
+            if element is None:  # 已从页面删除（如重新占卜时清空的旧结果与追问框）
+                self.elements.pop(element_id, None)
+                continue
+            self.elements[element_id] = element
+            if self._done is None or self._done.done():
+                continue
+            if "instant-interpretation" in element.get("class", []):
+                if not self._instant_seen:
+                    self._instant_seen = True
+                    self.stats.instant_ms.append((time.perf_counter() - self._began) * 1000)
+            elif "ai-interpretation" in element.get("class", []):
+                error = "LLM 解读出错" if "解读出错" in payload else "熔断回退" if "暂时不可用" in payload else None
+                self._done.set_result(error)
+            elif "text-red-500" in element.get("class", []) and element.get("text"):
+                self._done.set_result(element["text"])
+
+    async def divine(self, flow: str, round_no: int):
+        """填写一种起卦方式的输入并点击「开始占卜」，等待结果推送"""
+        question = QUESTIONS[(self.index + round_no) % len(QUESTIONS)]
+        await self._set_value(self._find("q-tabs")[0], flow)
+        if flow == "numbers":
+            for i, element_id in enumerate(self._find("q-input")[:3]):
+                await self._set_value(element_id, (self.index * 7 + round_no * 3 + i * 11) % 999 + 1)
+        elif flow == "date":
+            day = date(2024, 1, 1) + timedelta(days=(self.index * 37 + round_no) % 365)
+            await self._set_value(self._find("q-date")[0], day.isoformat())
+            await self._set_value(self._find("q-time")[0], f"{(self.index + round_no) % 24:02d}:30")
+        else:
+            chars = CHINESE_SAMPLES[(self.index + round_no) % len(CHINESE_SAMPLES)]
+            await self._set_value(self._find("nicegui-input", "例如")[0], chars)
+        await self._set_value(self._find("nicegui-input", "请详细描述")[0], question)
+
+        button = next(element_id for element_id, element in self.elements.items()
+                      if element["tag"] == "button" and any(e["type"] == "click" for e in element.get("events", [])))
+        await self._wait_result(self._emit(button, "click"), flow, self.stats.result_ms)
+
+    def can_follow_up(self) -> bool:
+        """页面上是否有追问框（解读成功后才会出现）"""
+        return bool(self._find("nicegui-input", "针对这次"))
+
+    async def follow_up(self, round_no: int, turn: int):
+        """在追问框中输入追问并回车，等待回答推送"""
+        question = FOLLOW_UPS[(self.index + round_no + turn) % len(FOLLOW_UPS)]
+        element_id = self._find("nicegui-input", "针对这次")[-1]
+        await self._set_value(element_id, question)
+        await self._wait_result(self._emit(element_id, "keydown"), "follow_up", self.stats.follow_up_ms)
+
+    async def _wait_result(self, trigger, label: str, samples: List[float]):
+        """触发事件后等待解读（带 ai-interpretation 样式的元素）推送到达，记录耗时或错误"""
+        self._done = asyncio.get_running_loop().create_future()
+        self._began = begin = time.perf_counter()
+        self._instant_seen = samples is not self.stats.result_ms
+        await trigger
+        try:
+            error = await asyncio.wait_for(self._done, self.timeout)
+        except asyncio.TimeoutError:
+            error = f"超时（{self.timeout:.0f} 秒）"
+        if error:
+            self.stats.errors.append(f"{label}: {error}")
+        else:
+            samples.append((time.perf_counter() - begin) * 1000)
+        await self.sio.emit("ack", {"client_id": self.query["client_id"], "next_message_id": self.next_message_id})
+
+
+async def run_client(base_url: str, index: int, rounds: int, timeout: float, http,
+                     follow_ups: int = 0) -> ClientStats:
+    stats = ClientStats()
+    client = SimulatedClient(base_url, index, stats, timeout)
+    try:
+        await client.open(http)
+        for round_no in range(rounds):
+            await client.divine(FLOWS[(index + round_no) % len(FLOWS)], round_no)
+            for turn in range(follow_ups if client.can_follow_up() else 0):
+                await client.follow_up(round_no, turn)
+    except Exception as e:
+        stats.errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        await client.close()
+    return stats
+
+
+# ---- 服务端指标 ----
+
+def parse_metrics(text: str) -> Dict[str, float]:
+    """Prometheus 文本格式 -> {指标名{标签}: 数值}"""
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            values[name] = float(value)
+    return values
+
+
+def loop_lag(before: Dict[str, float], after: Dict[str, float]) -> Dict[str, Optional[float]]:
+    """两次抓取之间的事件循环延迟：均值与 p99（取所在桶的上界）ms"""
+    name = "sixren_event_loop_lag_seconds"
+    count = after.get(f"{name}_count", 0) - before.get(f"{name}_count", 0)
+    if count <= 0:
+        return {"mean_ms": None, "p99_ms": None}
+    total = after.get(f"{name}_sum", 0) - before.get(f"{name}_sum", 0)
+    buckets = sorted(
+        (float(key.split('le="')[1].rstrip('"}')), after[key] - before.get(key, 0))
+        for key in after if key.startswith(f"{name}_bucket")
+    )
+    p99 = next((bound for bound, cumulative in buckets if cumulative >= 0.99 * count), None)
+    return {"mean_ms": total / count * 1000, "p99_ms": None if p99 is None else p99 * 1000}
+
+
+def process_cpu_seconds(pid: Optional[int]) -> Optional[float]:
+    """进程累计 CPU 时间（Linux /proc），无法读取时返回 None"""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+async def run_level(base_url: str, clients: int, rounds: int, timeout: float, server_pid: Optional[int],
+                    follow_ups: int = 0) -> Dict[str, Any]:
+    """以给定并发数运行一轮压测"""
+    import httpx
+
+    limits = httpx.Limits(max_connections=clients + 1)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as http:
+        before = parse_metrics((await http.get(base_url + "/metrics")).text)
+        cpu_before = process_cpu_seconds(server_pid)
+        begin = time.perf_counter()
+        results = await asyncio.gather(*(run_client(base_url, i, rounds, timeout, http, follow_ups) for i in range(clients)))
+        elapsed = time.perf_counter() - begin
+        cpu_after = process_cpu_seconds(server_pid)
+        after = parse_metrics((await http.get(base_url + "/metrics")).text)
+
+    merged = ClientStats()
+    for stats in results:
+        for name in ("page_ms", "page_bytes", "result_ms", "instant_ms", "follow_up_ms", "message_bytes", "errors"):
+            getattr(merged, name).extend(getattr(stats, name))
+    return {
+        "clients": clients,
+        "divinations": len(merged.result_ms),
+        "errors": len(merged.errors),
+        "error_samples": merged.errors[:5],
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(merged.result_ms) / elapsed if elapsed else 0.0,
+        "page_ms": {f"p{q}": percentile(merged.page_ms, q) for q in (50, 95, 99)},
+        "page_kb": (sum(merged.page_bytes) / len(merged.page_bytes) / 1024) if merged.page_bytes else None,
+        "result_ms": {f"p{q}": percentile(merged.result_ms, q) for q in (50, 95, 99)},
+        "instant_ms": {f"p{q}": percentile(merged.instant_ms, q) for q in (50, 95, 99)},
+        "follow_ups": len(merged.follow_up_ms),
+        "follow_up_ms": {f"p{q}": percentile(merged.follow_up_ms, q) for q in (50, 95, 99)},
+        "message_bytes": {
+            "p50": percentile(merged.message_bytes, 50),
+            "p95": percentile(merged.message_bytes, 95),
+            "max": max(merged.message_bytes, default=None),
+            "total_kb": sum(merged.message_bytes) / 1024,
+            "count": len(merged.message_bytes),
+        },
+        "event_loop_lag": loop_lag(before, after),
+        "server_cpu": None if cpu_before is None or cpu_after is None else (cpu_after - cpu_before) / elapsed,
+    }
+
+
+# ---- 服务进程 ----
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, ttft: float, token_rate: float, error_rate: float) -> subprocess.Popen:
+    """启动使用模拟 LLM 的 web.py（关闭热重载），真实模型的密钥置空以免被选中"""
+    sys.path.insert(0, SRC_DIR)
+    from ai_agent import SupportedModels
+
+    env = dict(os.environ)
+    for model in SupportedModels:
+        if model is not SupportedModels.MOCK:
+            env[SupportedModels.get_api_key_name(model)] = ""
+    env.update(
+        PYTHONPATH=SRC_DIR + os.pathsep + env.get("PYTHONPATH", ""),
+        SIXREN_MOCK_LLM="1",
+        SIXREN_MOCK_TTFT=str(ttft),
+        SIXREN_MOCK_TOKEN_RATE=str(token_rate),
+        SIXREN_MOCK_ERROR_RATE=str(error_rate),
+    )
+    code = f"import web; web.main(host='127.0.0.1', port={port}, reload=False)"
+    return subprocess.Popen([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def wait_ready(base_url: str, process: Optional[subprocess.Popen], timeout: float = 60.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"web.py 启动失败：\n{process.stderr.read().decode('utf-8', 'replace')}")
+        try:
+            if httpx.get(base_url + "/metrics", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"等待 {base_url} 超时")
+
+
+def _fmt(value: Optional[float], digits: int = 0) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+
+def print_level(result: Dict[str, Any]):
+    page, res, msg, lag = result["page_ms"], result["result_ms"], result["message_bytes"], result["event_loop_lag"]
+    cpu = result["server_cpu"]
+    print(
+        f"{result['clients']:>6}"
+        f"{_fmt(page['p50']):>8}{_fmt(page['p95']):>8}{_fmt(page['p99']):>8}"
+        f"{_fmt(res['p50']):>9}{_fmt(res['p95']):>9}{_fmt(res['p99']):>9}"
+        f"{result['throughput_per_s']:>8.2f}"
+        f"{_fmt(msg['p50']):>8}{_fmt(msg['p95']):>8}{_fmt(msg['max']):>8}{msg['total_kb']:>9.0f}"
+        f"{_fmt(lag['mean_ms'], 1):>8}{_fmt(lag['p99_ms'], 1):>8}"
+        f"{'-' if cpu is None else f'{cpu * 100:.0f}%':>6}"
+        f"{result['errors']:>6}"
+    )
+    instant = result["instant_ms"]
+    if instant["p50"] is not None:
+        print(f"{'即时解读':>4}{'':>22}{_fmt(instant['p50']):>9}{_fmt(instant['p95']):>9}{_fmt(instant['p99']):>9}")
+    if result["follow_ups"]:
+        follow = result["follow_up_ms"]
+        print(f"{'追问':>4}{'':>24}{_fmt(follow['p50']):>9}{_fmt(follow['p95']):>9}{_fmt(follow['p99']):>9}"
+              f"{'':>8}{result['follow_ups']:>8} 次")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="小六壬 Web 压测（模拟并发浏览器会话）")
+    parser.add_argument("--clients", default="1,5,10,25", help="逐级并发数，逗号分隔")
+    parser.add_argument("--rounds", type=int, default=3, help="每个客户端的占卜次数（轮流使用三种起卦方式）")
+    parser.add_argument("--follow-ups", type=int, default=0, help="每次占卜后的追问次数")
+    parser.add_argument("--timeout", type=float, default=60.0, help="单次占卜的超时秒数")
+    parser.add_argument("--url", default=None, help="压测已运行的服务（需使用模拟模型），默认自行启动")
+    parser.add_argument("--ttft", type=float, default=0.5, help="模拟 LLM 首字延迟（秒）")
+    parser.add_argument("--token-rate", type=float, default=40.0, help="模拟 LLM 输出速率（令牌/秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟 LLM 失败概率")
+    parser.add_argument("-o", "--output", default=None, help="结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+    levels = [int(n) for n in args.clients.split(",") if n.strip()]
+
+    process = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        process = start_server(port, args.ttft, args.token_rate, args.error_rate)
+    try:
+        wait_ready(base_url, process)
+        print(f"{'':>6}{'页面构建 ms':^24}{'占卜结果 ms':^27}{'':>8}{'推送消息 bytes':^33}{'事件循环 ms':^16}")
+        print(f"{'并发':>6}{'p50':>8}{'p95':>8}{'p99':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'次/秒':>8}"
+              f"{'p50':>8}{'p95':>8}{'max':>8}{'总 KB':>9}{'均值':>8}{'p99':>8}{'CPU':>6}{'失败':>6}")
+        results = []
+        for clients in levels:
+            result = asyncio.run(run_level(base_url, clients, args.rounds, args.timeout,
+                                           process.pid if process else None, args.follow_ups))
+            results.append(result)
+            print_level(result)
+            for sample in result["error_samples"]:
+                print(f"  ✗ {sample}", file=sys.stderr)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.output:
+        report = {
+            "url": base_url,
+            "rounds": args.rounds,
+            "follow_ups": args.follow_ups,
+            "mock_llm": {"ttft": args.ttft, "token_rate": args.token_rate, "error_rate": args.error_rate},
+            "levels": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入：{args.output}")
+    return 1 if any(result["errors"] for result in results) and not args.error_rate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
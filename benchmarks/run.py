@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+性能基准套件
+
+微基准覆盖各热点函数：笔画数查询、三传计算、八字排盘、五行分析、公历转农历、
+解读提示词生成；端到端场景用桩 LLM（pydantic-ai FunctionModel，固定的中文流式输出）
+替代真实模型，测量 CLI、Web 与批处理路径除网络之外的全部开销。
+
+每项先用 timeit 自动确定循环次数，重复多轮取最小值与中位数（µs/次）。
+结果可保存为 JSON 基线；再次运行时与基线比较，最小值变慢超过阈值即视为性能回退，
+以退出码 1 结束。基线与机器相关，默认保存在 benchmarks/results/（不纳入版本库）。
+
+用法：
+    uv run benchmarks/run.py --save-baseline
+    uv run benchmarks/run.py --compare --threshold 0.15
+    uv run benchmarks/run.py --filter bazi --repeat 7 -o results.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, 'src'))
+os.chdir(PROJECT_ROOT)
+
+from outcome_table import lookup_outcome
+from utils.bazi_calculator import calculate_bazi
+from utils.calendar_converter import solar_to_lunar
+from utils.five_elements_utils import analyze_wuxing
+from utils.lunar_table import START_DATE, get_lunar_table
+from utils.stroke_count import get_stroke_counts, get_stroke_table, getbihua
+
+RESULTS_DIR = os.path.join(PROJECT_ROOT, 'benchmarks', 'results')
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+
+QUESTION = "今年换工作是否顺利？"
+
+# 桩 LLM 的流式输出：固定的分段中文文本，约等于一次正常解读的长度
+STUB_CHUNKS = [
+    "### 针对性分析\n", "初传大安，事情起步平稳，", "宜守不宜进。\n\n",
+    "### 时间发展脉络\n", "- 初传：根基稳固\n", "- 中传：贵人相助，", "事态逐步推进\n",
+    "- 末传：终有所成\n\n", "### 具体建议\n", "1. 稳中求进，", "不宜急躁\n",
+    "2. 东方有利，", "可多与同事沟通\n",
+] * 4
+
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: Callable[[], Callable[[], Any]]  # 返回被计时的无参函数
+    description: str
+
+
+def _sample_dates(n: int, seed: int = 42) -> List[date]:
+    table = get_lunar_table()
+    rng = random.Random(seed)
+    return [START_DATE + timedelta(days=rng.randrange(table.count)) for _ in range(n)]
+
+
+def _sample_chars(n: int, seed: int = 42) -> List[str]:
+    chars = sorted(get_stroke_table())
+    rng = random.Random(seed)
+    return [rng.choice(chars) for _ in range(n)]
+
+
+def _cycle(items: List[Any]) -> Callable[[], Any]:
+    """依次返回列表中的元素，避免每次计时都命中同一个输入"""
+    state = {"i": 0}
+
+    def next_item():
+        i = state["i"]
+        state["i"] = (i + 1) % len(items)
+        return items[i]
+    return next_item
+
+
+@contextlib.contextmanager
+def stub_llm(chunks: Optional[List[str]] = None, delay: float = 0.0):
+    """
+    用桩模型替换 DivinationAgent 的 LLM
+
+    Args:
+        chunks: 流式输出的文本片段，默认 STUB_CHUNKS
+        delay: 每个片段前的等待秒数，默认 0（只测本地开销）
+    """
+    import ai_agent
+    from pydantic_ai import Agent
+    from pydantic_ai.models.function import FunctionModel
+
+    pieces = chunks or STUB_CHUNKS
+
+    async def stream(messages, info):
+        for piece in pieces:
+            if delay:
+                await asyncio.sleep(delay)
+            yield piece
+
+    model = FunctionModel(stream_function=stream, model_name="benchmark-stub")
+
+    def stub_init(self, model_type=ai_agent.SupportedModels.OPENAI_GPT4O, prompt_mode=None, length_mode=None):
+        self.model_type = model_type
+        self.prompt_mode = prompt_mode or ai_agent.default_prompt_mode()
+        self.length_mode = length_mode or ai_agent.default_length_mode()
+        self.agent = Agent(model, deps_type=ai_agent.DivinationDeps, system_prompt=self._get_system_prompt())
+
+    original_init = ai_agent.DivinationAgent.__init__
+    key_name = ai_agent.SupportedModels.get_api_key_name(ai_agent.SupportedModels.OPENAI_GPT4O)
+    original_key = os.environ.get(key_name)
+    ai_agent.DivinationAgent.__init__ = stub_init
+    os.environ[key_name] = original_key or "benchmark-stub"
+    try:
+        yield
+    finally:
+        ai_agent.DivinationAgent.__init__ = original_init
+        if original_key is None:
+            os.environ.pop(key_name, None)
+
+
+# ---- 微基准 ----
+
+def _bench_getbihua():
+    get_stroke_table()
+    next_char = _cycle(_sample_chars(1000))
+    return lambda: getbihua(next_char())
+
+
+def _bench_get_stroke_counts():
+    chars = _sample_chars(999)
+    next_text = _cycle([''.join(chars[i:i + 3]) for i in range(0, len(chars), 3)])
+    get_stroke_table()
+    return lambda: get_stroke_counts(next_text())
+
+
+def _bench_predict():
+    from hand_technique import HandTechnique
+
+    rng = random.Random(42)
+    next_numbers = _cycle([(rng.randint(1, 999), rng.randint(1, 999), rng.randint(1, 999)) for _ in range(1000)])
+    return lambda: HandTechnique.predict(*next_numbers())
+
+
+def _bench_calculate_bazi():
+    rng = random.Random(42)
+    next_args = _cycle([(d.year, d.month, d.day, rng.randrange(24), rng.randrange(60)) for d in _sample_dates(1000)])
+    return lambda: calculate_bazi(*next_args())
+
+
+def _bench_analyze_wuxing():
+    rng = random.Random(42)
+    charts = [calculate_bazi(d.year, d.month, d.day, rng.randrange(24), 0) for d in _sample_dates(1000)]
+    next_chart = _cycle(charts)
+    return lambda: analyze_wuxing(next_chart())
+
+
+def _bench_solar_to_lunar():
+    next_date = _cycle([(d.year, d.month, d.day) for d in _sample_dates(1000)])
+    return lambda: solar_to_lunar(*next_date())
+
+
+def _bench_interpretation_prompt():
+    with stub_llm():
+        from ai_agent import DivinationAgent
+        agent = DivinationAgent()
+    next_symbols = _cycle([lookup_outcome(r1 + 1, r2 + 1, 1).symbols for r1 in range(9) for r2 in range(9)])
+    return lambda: agent._generate_interpretation_prompt(next_symbols(), QUESTION)
+
+
+def _bench_compact_prompt():
+    from prompt_builder import build_prompt
+
+    next_symbols = _cycle([lookup_outcome(r1 + 1, r2 + 1, 1).symbols for r1 in range(9) for r2 in range(9)])
+    return lambda: build_prompt(next_symbols(), QUESTION, "compact")
+
+
+# ---- 端到端（桩 LLM）----
+
+def _bench_e2e_cli():
+    """CLI 占卜：三传 + 表格 + 同步流式解读（控制台输出丢弃）"""
+    from hand_technique import HandTechnique
+
+    def run():
+        with stub_llm(), contextlib.redirect_stdout(io.StringIO()):
+            return HandTechnique.predict(3, 5, 7, QUESTION)
+    return run
+
+
+def _bench_e2e_web():
+    """Web 占卜：异步预测 + 流式解读 + Markdown 整理"""
+    from hand_technique import HandTechnique
+
+    loop = asyncio.new_event_loop()
+
+    def run():
+        with stub_llm():
+            return loop.run_until_complete(HandTechnique.predict_async(3, 5, 7, QUESTION))
+    return run
+
+
+def _bench_e2e_batch():
+    """批处理：100 条占卜记录，确定性部分 + 并发 8 的 AI 解读"""
+    from ai_agent import DivinationAgent
+    from cli_batch import build_divinations, interpret_stream
+
+    rng = random.Random(42)
+    chunk = [(i, {"numbers": [rng.randint(1, 99) for _ in range(3)], "question": QUESTION}) for i in range(1, 101)]
+    loop = asyncio.new_event_loop()
+
+    async def emit(result):
+        pass
+
+    def run():
+        with stub_llm():
+            agent = DivinationAgent()
+            return loop.run_until_complete(interpret_stream(iter(build_divinations(chunk)), agent, 8, emit))
+    return run
+
+
+BENCHMARKS = [
+    Benchmark("stroke.getbihua", _bench_getbihua, "单个汉字笔画数"),
+    Benchmark("stroke.get_stroke_counts", _bench_get_stroke_counts, "三个汉字笔画数"),
+    Benchmark("hand_technique.predict", _bench_predict, "三传计算与表格（无解读）"),
+    Benchmark("bazi.calculate_bazi", _bench_calculate_bazi, "四柱排盘"),
+    Benchmark("bazi.analyze_wuxing", _bench_analyze_wuxing, "五行分析"),
+    Benchmark("lunar.solar_to_lunar", _bench_solar_to_lunar, "公历转农历"),
+    Benchmark("ai.interpretation_prompt", _bench_interpretation_prompt, "解读提示词生成"),
+    Benchmark("ai.compact_prompt", _bench_compact_prompt, "精简解读提示词生成"),
+    Benchmark("e2e.cli_divination", _bench_e2e_cli, "CLI 占卜端到端（桩 LLM）"),
+    Benchmark("e2e.web_divination", _bench_e2e_web, "Web 占卜端到端（桩 LLM）"),
+    Benchmark("e2e.batch_divination_100", _bench_e2e_batch, "批处理 100 条带解读（桩 LLM）"),
+]
+
+
+def measure(bench: Benchmark, repeat: int, min_time: float) -> Dict[str, Any]:
+    """自动确定循环次数，重复 repeat 轮，返回每次调用的耗时统计（µs）"""
+    func = bench.setup()
+    func()  # 预热
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    runs = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": round(min(runs), 3),
+        "median_us": round(statistics.median(runs), 3),
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names: Optional[List[str]] = None, repeat: int = 5, min_time: float = 0.2) -> Dict[str, Any]:
+    results = {}
+    for bench in BENCHMARKS:
+        if names is not None and bench.name not in names:
+            continue
+        results[bench.name] = measure(bench, repeat, min_time)
+        stats = results[bench.name]
+        print(f"{bench.name:<30}{stats['min_us']:>12.2f}{stats['median_us']:>12.2f}  {bench.description}")
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """比较最小耗时，返回变慢超过 threshold（比例）的项目说明"""
+    regressions = []
+    print(f"\n{'项目':<30}{'基线 µs':>12}{'当前 µs':>12}{'变化':>10}")
+    for name, stats in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<30}{'-':>12}{stats['min_us']:>12.2f}{'新增':>10}")
+            continue
+        change = stats["min_us"] / base["min_us"] - 1
+        flag = " ✗" if change > threshold else ""
+        print(f"{name:<30}{base['min_us']:>12.2f}{stats['min_us']:>12.2f}{change:>+10.1%}{flag}")
+        if change > threshold:
+            regressions.append(f"{name} 变慢 {change:.1%}（阈值 {threshold:.0%}）")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="小六壬性能基准套件")
+    parser.add_argument("--filter", default=None, help="只运行名称包含该字符串的项目")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复轮数")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每轮最少计时秒数")
+    parser.add_argument("-o", "--output", default=None, help="结果写入 JSON 文件")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, default=None, metavar="PATH",
+                        help=f"保存为基线，默认 {os.path.relpath(DEFAULT_BASELINE, PROJECT_ROOT)}")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, default=None, metavar="PATH",
+                        help="与基线比较")
+    parser.add_argument("--threshold", type=float, default=0.2, help="回退阈值（比例），默认 0.2 即慢 20%%")
+    args = parser.parse_args(argv)
+
+    names = [b.name for b in BENCHMARKS if args.filter in b.name] if args.filter else None
+    print(f"{'项目':<30}{'最小 µs':>12}{'中位 µs':>12}")
+    current = run_suite(names, args.repeat, args.min_time)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"结果已写入 {path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for regression in regressions:
+            print(f"✗ {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("✓ 未发现性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
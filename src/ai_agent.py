@@ -1,27 +1,33 @@
 import os
+from contextlib import aclosing
 from dataclasses import dataclass
 from dotenv import load_dotenv
-from pydantic_ai import Agent, RunContext
 import re
-import asyncio
+import time
 from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.live import Live
 from enum import Enum
-from typing import Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import metrics
+import offline_interpreter
+import tracing
+from prompt_builder import SYSTEM_PROMPT, build_follow_up_prompt, build_prompt, default_prompt_mode
+from response_length import EarlyStop, LengthTier, default_length_mode, select_follow_up_tier, select_tier
 
 
 class SupportedModels(Enum):
     """支持的LLM模型枚举"""
     OPENAI_GPT4O = "openai:gpt-4o"
     DEEPSEEK_CHAT = "deepseek:deepseek-chat"
+    MOCK = "mock:sixren"  # 本地模拟模型，见 mock_llm.py
     
     @classmethod
     def get_display_name(cls, model):
         """获取模型的显示名称"""
         names = {
             cls.OPENAI_GPT4O: "OpenAI GPT-4o",
-            cls.DEEPSEEK_CHAT: "DeepSeek Chat"
+            cls.DEEPSEEK_CHAT: "DeepSeek Chat",
+            cls.MOCK: "本地模拟模型"
         }
         return names.get(model, model.value)
     
@@ -30,7 +36,8 @@ class SupportedModels(Enum):
         """获取模型对应的API密钥环境变量名"""
         keys = {
             cls.OPENAI_GPT4O: "OPENAI_API_KEY",
-            cls.DEEPSEEK_CHAT: "DEEPSEEK_API_KEY"
+            cls.DEEPSEEK_CHAT: "DEEPSEEK_API_KEY",
+            cls.MOCK: "SIXREN_MOCK_LLM"
         }
         return keys.get(model, "")
 
@@ -42,14 +49,132 @@ class DivinationDeps:
     model_type: SupportedModels
 
 
+class CircuitBreaker:
+    """
+    LLM 调用熔断器
+
+    连续失败 failure_threshold 次后打开：reset_timeout 秒内的解读不再调用 LLM，直接给出离线模板解读；
+    到时后放行一个试探请求（半开），成功则关闭，失败则重新打开。
+    阈值与时长可用环境变量 SIXREN_BREAKER_FAILURES（默认 3）、SIXREN_BREAKER_RESET（秒，默认 30）修改。
+    """
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.environ.get('SIXREN_BREAKER_FAILURES', 3))
+        self.reset_timeout = float(os.environ.get('SIXREN_BREAKER_RESET', 30)) if reset_timeout is None else reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """closed / open / half_open"""
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self._probing else "open"
+
+    def allow(self) -> bool:
+        """本次是否调用 LLM"""
+        if self.opened_at is None:
+            return True
+        if not self._probing and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        metrics.LLM_BREAKER_OPEN.labels(model=self.name).set(0)
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            metrics.LLM_BREAKER_OPEN.labels(model=self.name).set(1)
+        self._probing = False
+
+    def end_probe(self):
+        """
+        结束本次试探而不计成功或失败
+
+        试探请求被取消（CancelledError、KeyboardInterrupt）时不会调用 record_success / record_failure，
+        若不清除试探标记，熔断器会一直停在半开状态，之后的请求全部走离线解读。
+        清除后熔断器回到打开状态，且已到重试时间，下一个请求会重新试探。
+        """
+        self._probing = False
+
+
+_circuit_breakers: Dict[SupportedModels, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(model: SupportedModels) -> CircuitBreaker:
+    """各模型的熔断器（进程内共用，每次占卜新建的代理共享同一状态）"""
+    breaker = _circuit_breakers.get(model)
+    if breaker is None:
+        breaker = _circuit_breakers[model] = CircuitBreaker(model.value)
+    return breaker
+
+
+def default_max_follow_ups() -> int:
+    """环境变量 SIXREN_MAX_FOLLOW_UPS 指定的追问历史轮数，默认 4"""
+    return max(0, int(os.environ.get('SIXREN_MAX_FOLLOW_UPS', 4)))
+
+
+class ConversationSession:
+    """
+    一次占卜的追问会话
+
+    保存每一轮请求与回答的消息（pydantic-ai ModelMessage）。首轮含系统提示词、三传与完整解读，
+    始终保留；其后只保留最近 max_follow_ups 轮追问，历史长度有上限。
+    代理本身不保存会话，同一个代理可以同时服务多个会话（守护进程、批处理）。
+    """
+
+    def __init__(self, max_follow_ups: Optional[int] = None):
+        self.max_follow_ups = default_max_follow_ups() if max_follow_ups is None else max_follow_ups
+        self.turns: List[list] = []
+
+    @property
+    def started(self) -> bool:
+        """是否已完成首轮解读，可以追问"""
+        return bool(self.turns)
+
+    def reset(self):
+        self.turns = []
+
+    def history(self) -> Optional[list]:
+        """本轮请求要带上的历史消息，尚未开始时为 None"""
+        if not self.turns:
+            return None
+        return [message for turn in self.turns for message in turn]
+
+    def record(self, messages: list):
+        """记录一轮消息，超出上限时丢弃最早的追问"""
+        self.turns.append(messages)
+        overflow = len(self.turns) - 1 - self.max_follow_ups
+        if overflow > 0:
+            del self.turns[1:1 + overflow]
+
+
 class DivinationAgent:
     """小六壬占卜AI解读代理"""
     
-    def __init__(self, model_type: SupportedModels = SupportedModels.OPENAI_GPT4O):
+    def __init__(self, model_type: SupportedModels = SupportedModels.OPENAI_GPT4O, prompt_mode: Optional[str] = None,
+                 length_mode: Optional[str] = None):
+        # pydantic-ai 导入较慢，只在真正创建代理时加载，查询可用模型等操作无需等待
+        from pydantic_ai import Agent
+
         load_dotenv()
         self.model_type = model_type
+        self.prompt_mode = prompt_mode or default_prompt_mode()
+        self.length_mode = length_mode or default_length_mode()
+        model = model_type.value
+        if model_type is SupportedModels.MOCK:
+            from mock_llm import build_model
+            model = build_model()
         self.agent = Agent(
-            model_type.value,
+            model,
             deps_type=DivinationDeps,
             system_prompt=self._get_system_prompt()
         )
@@ -76,61 +201,130 @@ class DivinationAgent:
     
     def _get_system_prompt(self) -> str:
         """获取系统提示词"""
-        return (
-            "你是一位精通小六壬占卜的大师，具有深厚的传统文化功底。你的职责是：\n"
-            "1. 仔细理解求问者的具体问题和关切\n"
-            "2. 深入分析三传符号的含义和五行关系\n"
-            "3. 将占卜结果与求问事项紧密结合，提供针对性解读\n"
-            "4. 避免泛泛而谈，要针对具体问题给出具体指导\n"
-            "5. 语言要优雅含蓄，富有哲理，但让现代人容易理解\n\n"
-            "格式要求：\n"
-            "- 使用清晰的段落结构，每段专注一个要点\n"
-            "- 用 ### 标题区分不同主题（如：卦象分析、时间发展、建议指导等）\n"
-            "- 重要内容使用 **粗体** 强调\n"
-            "- 具体建议可用列表形式呈现\n"
-            "请始终围绕求问者的具体问题进行解读，字数控制在1000字以内。"
-        )
+        return SYSTEM_PROMPT
     
-    def interpret_prediction(self, symbols, question: str) -> str:
+    def interpret_prediction(self, symbols, question: str, length_mode: Optional[str] = None,
+                             session: Optional[ConversationSession] = None) -> str:
         """
         使用PydanticAI解读小六壬占卜结果
         
         Args:
             symbols: 三传符号列表
             question: 用户问题
+            length_mode: 解读篇幅（auto / brief / standard / detailed），默认使用代理的设置
+            session: 追问会话，传入时重新开始并记录本轮解读，之后可用 follow_up 追问
             
         Returns:
             str: AI解读结果
         """
-        api_key_name = SupportedModels.get_api_key_name(self.model_type)
-        api_key = os.getenv(api_key_name)
-        
-        if not api_key:
-            model_name = SupportedModels.get_display_name(self.model_type)
-            return f"错误：未设置{api_key_name}环境变量，无法使用{model_name}"
-        
-        deps = DivinationDeps(api_key=api_key, model_type=self.model_type)
-        prompt = self._generate_interpretation_prompt(symbols, question)
-        
-        try:
-            # 使用同步方式运行异步流式响应
-            return asyncio.run(self._stream_interpretation(prompt, deps))
-            
-        except Exception as e:
-            model_name = SupportedModels.get_display_name(self.model_type)
-            return f"{model_name}解读出错：{str(e)}"
+        import asyncio
+
+        # 使用同步方式运行异步流式响应，在控制台上实时显示
+        return asyncio.run(self._interpret(symbols, question, length_mode, session, Console()))
     
-    async def interpret_prediction_async(self, symbols, question: str) -> str:
+    async def interpret_prediction_async(self, symbols, question: str, length_mode: Optional[str] = None,
+                                         session: Optional[ConversationSession] = None) -> str:
         """
         异步版本的AI解读方法，用于Web界面
         
         Args:
             symbols: 三传符号列表
             question: 用户问题
+            length_mode: 解读篇幅（auto / brief / standard / detailed），默认使用代理的设置
+            session: 追问会话，传入时重新开始并记录本轮解读，之后可用 follow_up 追问
             
         Returns:
             str: AI解读结果
         """
+        return await self._interpret(symbols, question, length_mode, session)
+    
+    def follow_up(self, session: ConversationSession, question: str, length_mode: Optional[str] = None) -> str:
+        """
+        针对上一轮解读追问（CLI）：三传与之前的解读从会话历史中带上，只新增追问本身
+        
+        Args:
+            session: 已完成首轮解读的追问会话
+            question: 追问内容
+            length_mode: 解读篇幅，默认使用代理的设置
+            
+        Returns:
+            str: AI回答
+        """
+        import asyncio
+
+        return asyncio.run(self._follow_up(session, question, length_mode, Console()))
+    
+    async def follow_up_async(self, session: ConversationSession, question: str,
+                              length_mode: Optional[str] = None) -> str:
+        """
+        异步版本的追问方法，用于Web界面
+        
+        Args:
+            session: 已完成首轮解读的追问会话
+            question: 追问内容
+            length_mode: 解读篇幅，默认使用代理的设置
+            
+        Returns:
+            str: AI回答
+        """
+        return await self._follow_up(session, question, length_mode)
+    
+    async def _interpret(self, symbols, question: str, length_mode: Optional[str],
+                         session: Optional[ConversationSession], console: Optional[Console] = None) -> str:
+        """首轮解读（CLI 与 Web 共用）；熔断期间或调用出错时给出离线模板解读"""
+        async def run(deps: DivinationDeps) -> str:
+            tier, prompt = self._interpretation_prompt(symbols, question, length_mode)
+            if session is not None:
+                session.reset()
+            return await self._stream_interpretation(prompt, deps, tier, session, console)
+
+        model_name = SupportedModels.get_display_name(self.model_type)
+        return await self._guarded_call(
+            run,
+            unavailable=lambda: self._offline_interpretation(symbols, question, "breaker"),
+            failed=lambda e: f"{model_name}解读出错：{str(e)}\n\n" + self._offline_interpretation(symbols, question, "error"),
+        )
+    
+    async def _follow_up(self, session: ConversationSession, question: str, length_mode: Optional[str],
+                         console: Optional[Console] = None) -> str:
+        """追问（CLI 与 Web 共用）；离线模板无法回答追问，熔断期间只给出提示"""
+        if not session.started:
+            return "错误：请先完成一次占卜解读，再进行追问"
+
+        async def run(deps: DivinationDeps) -> str:
+            tier, prompt = self._follow_up_prompt(question, length_mode)
+            return await self._stream_interpretation(prompt, deps, tier, session, console)
+
+        model_name = SupportedModels.get_display_name(self.model_type)
+        return await self._guarded_call(
+            run,
+            unavailable=lambda: f"{model_name}暂时不可用，请稍后再追问",
+            failed=lambda e: f"{model_name}解读出错：{str(e)}",
+        )
+    
+    def _interpretation_prompt(self, symbols, question: str, length_mode: Optional[str]) -> Tuple[LengthTier, str]:
+        with tracing.span("ai.build_prompt"):
+            tier = select_tier(question, length_mode or self.length_mode)
+            return tier, self._generate_interpretation_prompt(symbols, question) + tier.instruction
+    
+    def _follow_up_prompt(self, question: str, length_mode: Optional[str]) -> Tuple[LengthTier, str]:
+        with tracing.span("ai.build_prompt", follow_up=True):
+            tier = select_follow_up_tier(question, length_mode or self.length_mode)
+            return tier, build_follow_up_prompt(question, self.prompt_mode) + tier.instruction
+    
+    async def _guarded_call(self, run: Callable[[DivinationDeps], Awaitable[str]], unavailable: Callable[[], str],
+                            failed: Callable[[Exception], str]) -> str:
+        """
+        检查 API 密钥与熔断器后调用 LLM（解读与追问共用），并把结果计入熔断器
+        
+        Args:
+            run: 以 DivinationDeps 调用 LLM 并返回回答的协程函数
+            unavailable: 熔断期间的替代回答
+            failed: 调用出错时的替代回答，参数为异常
+            
+        Returns:
+            str: AI回答或替代回答
+        """
         api_key_name = SupportedModels.get_api_key_name(self.model_type)
         api_key = os.getenv(api_key_name)
         
@@ -138,67 +332,120 @@ class DivinationAgent:
             model_name = SupportedModels.get_display_name(self.model_type)
             return f"错误：未设置{api_key_name}环境变量，无法使用{model_name}"
         
-        deps = DivinationDeps(api_key=api_key, model_type=self.model_type)
-        prompt = self._generate_interpretation_prompt(symbols, question)
+        breaker = get_circuit_breaker(self.model_type)
+        if not breaker.allow():
+            # 熔断期间不调用 LLM
+            return unavailable()
+        probing = breaker.state == "half_open"  # 本次为熔断后的试探请求
         
         try:
-            # 直接调用异步流式响应方法
-            return await self._stream_interpretation_web(prompt, deps)
-            
+            answer = await run(DivinationDeps(api_key=api_key, model_type=self.model_type))
         except Exception as e:
-            model_name = SupportedModels.get_display_name(self.model_type)
-            return f"{model_name}解读出错：{str(e)}"
+            breaker.record_failure()
+            return failed(e)
+        finally:
+            if probing:
+                # 试探被取消时既不算成功也不算失败，见 CircuitBreaker.end_probe
+                breaker.end_probe()
+        
+        breaker.record_success()
+        return answer
     
-    async def _stream_interpretation(self, prompt: str, deps: DivinationDeps) -> str:
-        """异步流式处理AI解读"""
-        console = Console()
+    async def _stream_interpretation(self, prompt: str, deps: DivinationDeps, tier: LengthTier,
+                                     session: Optional[ConversationSession] = None,
+                                     console: Optional[Console] = None) -> str:
+        """
+        流式处理AI解读（CLI 与 Web 共用）
+        
+        首字延迟、按篇幅档位提前结束、令牌用量与追问会话记录都在这里完成，两种界面的行为一致。
+        传入 console 时（CLI）在控制台上实时显示，重绘间隔不小于 0.1 秒；Web 版不输出。
+        """
+        model_name = SupportedModels.get_display_name(self.model_type)
         full_response = ""
         
         # 显示开始提示
-        model_name = SupportedModels.get_display_name(self.model_type)
-        console.print(f"\n[bold cyan]正在使用{model_name}生成AI解读...[/bold cyan]")
+        if console is not None:
+            console.print(f"\n[bold cyan]正在使用{model_name}生成AI解读...[/bold cyan]")
         
+        # 首字延迟与流式输出分别计时
+        ttft = tracing.start_span("ai.ttft", model=self.model_type.value)
+        streaming = None
+        stopper = EarlyStop(tier)
         try:
-            async with self.agent.run_stream(
-                prompt, 
-                deps=deps,
-                model_settings={'max_tokens': 1000}
-            ) as result:
-                console.print(f"[bold cyan]{model_name}解读结果：[/bold cyan]")
+            with metrics.llm_call(self.model_type.value) as call:
+                async with self.agent.run_stream(
+                    prompt, 
+                    deps=deps,
+                    message_history=session.history() if session else None,
+                    model_settings={'max_tokens': tier.max_tokens}
+                ) as result:
+                    if console is not None:
+                        console.print(f"[bold cyan]{model_name}解读结果：[/bold cyan]")
                 
-                # 使用简单的打印方式避免Live冲突
-                async for message in result.stream_text():
-                    full_response = message
-                    # 清屏并显示当前内容
-                    console.clear()
-                    console.print(f"[bold cyan]{model_name}解读结果：[/bold cyan]")
-                    console.print(self._clean_markdown(full_response))
+                    # 使用简单的打印方式避免Live冲突；逐个增量读取以便随时提前结束，重绘间隔自行控制。
+                    # 中途 break 时须立即关闭生成器（aclosing），pydantic-ai 的 debounce_by 合并任务也不能遗留
+                    redrawn = 0.0
+                    async with aclosing(result.stream_text(debounce_by=None)) as stream:
+                        async for message in stream:
+                            if streaming is None:
+                                ttft.end()
+                                call.first_token()
+                                streaming = tracing.start_span("ai.streaming", model=self.model_type.value)
+                            full_response = message
+                            cut = stopper.check(message)
+                            if cut is not None:
+                                # 篇幅已够，提前结束并关闭流式连接
+                                full_response = cut
+                                break
+                            if console is not None and time.perf_counter() - redrawn >= 0.1:
+                                redrawn = time.perf_counter()
+                                self._redraw(console, model_name, full_response)
+                    if console is not None:
+                        self._redraw(console, model_name, full_response)
+                    # 提前结束时收不到流末尾的用量，见 LLMCall.record_usage
+                    call.record_usage(result.usage(), complete=result.is_complete and not stopper.reason)
+                    if stopper.reason:
+                        call.early_stop(stopper.reason)
+                    if session is not None:
+                        session.record(self._turn_messages(result, full_response))
                 
-                console.print("\n[bold green]解读完成！[/bold green]")
+                    if console is not None:
+                        console.print("\n[bold green]解读完成！[/bold green]")
                 
         except Exception as e:
-            console.print(f"\n[bold red]{model_name}解读失败：{str(e)}[/bold red]")
+            if console is not None:
+                console.print(f"\n[bold red]{model_name}解读失败：{str(e)}[/bold red]")
             raise
+        finally:
+            ttft.end()
+            if streaming is not None:
+                streaming.end(chars=len(full_response), tier=tier.name, early_stop=stopper.reason)
         
-        return self._format_markdown_for_web(full_response)
+        with tracing.span("ai.format_markdown"):
+            return self._format_markdown_for_web(full_response)
     
-    async def _stream_interpretation_web(self, prompt: str, deps: DivinationDeps) -> str:
-        """异步流式处理AI解读 - Web版本（无控制台输出）"""
-        full_response = ""
-        
-        try:
-            async with self.agent.run_stream(
-                prompt, 
-                deps=deps,
-                model_settings={'max_tokens': 1000}
-            ) as result:
-                async for message in result.stream_text():
-                    full_response = message
-                
-        except Exception:
-            raise
-        
-        return self._format_markdown_for_web(full_response)
+    def _offline_interpretation(self, symbols, question: str, reason: str) -> str:
+        """LLM 不可用时的离线模板解读（reason：breaker 熔断中 / error 本次调用失败）"""
+        metrics.OFFLINE_INTERPRETATIONS.labels(reason=reason).inc()
+        notice = offline_interpreter.OFFLINE_NOTICE
+        if reason == "breaker":
+            notice = f"{SupportedModels.get_display_name(self.model_type)}暂时不可用，以下为{notice}"
+        return offline_interpreter.interpret(symbols, question, notice)
+    
+    def _turn_messages(self, result, text: str) -> list:
+        """本轮的请求与回答消息；提前结束时流未读完，以已显示的文本作为回答"""
+        from pydantic_ai.messages import ModelResponse, TextPart
+
+        messages = result.new_messages()
+        if not result.is_complete:
+            messages.append(ModelResponse(parts=[TextPart(text)], model_name=self.model_type.value))
+        return messages
+    
+    def _redraw(self, console: Console, model_name: str, text: str):
+        """清屏并显示当前内容"""
+        console.clear()
+        console.print(f"[bold cyan]{model_name}解读结果：[/bold cyan]")
+        console.print(self._clean_markdown(text))
     
     def _clean_markdown(self, text: str) -> str:
         """清理Markdown格式 - CLI版本"""
@@ -231,73 +478,5 @@ class DivinationAgent:
         return text.strip()
     
     def _generate_interpretation_prompt(self, symbols, question: str) -> str:
-        """生成解读提示词"""
-        prompt = f"【重要】求问事项：{question}\n"
-        prompt += "请您务必围绕此具体问题进行解读，避免泛泛而谈。\n\n"
-        
-        prompt += "=== 三传占卜结果 ===\n"
-
-        for i, symbol in enumerate(symbols):
-            position = ["初传（前期）", "中传（中期）", "末传（后期）"][i]
-            prompt += f"\n{position}：\n"
-            prompt += f"• 符号：{symbol.name}\n"
-            prompt += f"• 描述：{symbol.description}\n"
-            prompt += f"• 解释：{symbol.interpretation}\n"
-            prompt += f"• 五行：{symbol.element.name}\n"
-            prompt += f"• 方位：{symbol.direction}\n"
-            prompt += f"• 神灵：{symbol.deity} - {symbol.deity_description}\n"
-
-        # 添加明确的五行属性和生克关系
-        prompt += "\n=== 五行生克关系 ===\n"
-        prompt += f"初传五行：{symbols[0].element.name}\n"
-        prompt += f"中传五行：{symbols[1].element.name}\n"
-        prompt += f"末传五行：{symbols[2].element.name}\n\n"
-
-        relations = self._get_relations(symbols)
-        prompt += f"初传→中传：{relations[0]}（{symbols[0].element.name}{'生' if relations[0] == '生' else '克' if relations[0] == '克' else '与'}{symbols[1].element.name}）\n"
-        prompt += f"中传→末传：{relations[1]}（{symbols[1].element.name}{'生' if relations[1] == '生' else '克' if relations[1] == '克' else '与'}{symbols[2].element.name}）\n\n"
-
-        prompt += "=== 解读要求 ===\n"
-        prompt += f"请紧密结合求问事项「{question}」，进行以下分析：\n\n"
-        prompt += f"1. **针对性分析**：这三传结果对于「{question}」这个具体问题意味着什么？请直接回应求问者的关切。\n\n"
-        prompt += "2. **时间发展脉络**：\n"
-        prompt += f"   - 初传（当前/近期）：{symbols[0].name}对此事的影响\n"
-        prompt += f"   - 中传（中期发展）：{symbols[1].name}如何推动事态变化\n"
-        prompt += f"   - 末传（最终结果）：{symbols[2].name}预示的最终走向\n\n"
-        
-        if relations[0] != '无' or relations[1] != '无':
-            prompt += "3. **五行影响机制**：结合求问事项，解释五行生克如何具体影响这件事的发展：\n"
-            if relations[0] != '无':
-                prompt += f"   - {symbols[0].element.name}{relations[0]}{symbols[1].element.name}：对此事态发展的推动/阻碍作用\n"
-            if relations[1] != '无':
-                prompt += f"   - {symbols[1].element.name}{relations[1]}{symbols[2].element.name}：对最终结果的影响机制\n"
-        else:
-            prompt += "3. **符号启示**：三传间无明显五行生克，请重点分析各符号本身对此问题的指导意义。\n"
-        
-        prompt += "\n4. **具体建议**：基于以上分析，针对这个具体问题给出实用的行动指导和注意事项。\n\n"
-        prompt += "5. **关键提示**：如有特别需要注意的时间、方位、或神灵护佑，请一并说明。\n\n"
-        
-        prompt += "【重要提醒】请始终围绕求问事项进行解读，将抽象的占卜符号与具体问题紧密结合，给出有针对性的指导。"
-
-        return prompt
-    
-    def _is_generating(self, element1, element2):
-        """判断五行相生关系"""
-        return element1.generates == element2.name
-
-    def _is_overcoming(self, element1, element2):
-        """判断五行相克关系"""
-        return element1.overcomes == element2.name
-    
-    def _get_relations(self, symbols):
-        """获取三传之间的五行关系"""
-        relations = []
-        for i in range(2):
-            if self._is_generating(symbols[i].element, symbols[i+1].element):
-                relation = "生"
-            elif self._is_overcoming(symbols[i].element, symbols[i+1].element):
-                relation = "克"
-            else:
-                relation = "无"
-            relations.append(relation)
-        return relations
\ No newline at end of file
+        """生成解读提示词（full / compact 见 prompt_builder）"""
+        return build_prompt(symbols, question, self.prompt_mode)
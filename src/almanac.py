@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+小六壬时辰历书
+
+为指定年份范围内每一天的十二时辰预先计算日期起卦（与 CLI 相同的映射：
+农历月、农历日、时辰地支序号 + 1）的三传符号与生克关系，写入列式二进制文件：
+
+    文件头：magic, 版本, 每日时辰数, 起始日序, 天数
+    按日的列：lunar_month, lunar_day, is_leap            各 天数 字节
+    按时辰的列：first, second, third, relation1, relation2  各 天数 × 12 字节
+
+每列均为单字节，文件可直接 mmap，查询一个时辰只需按偏移读取几个字节。
+日期不在历书文件范围内（或文件不存在）时，按农历速查表与结果表直接计算。
+
+用法：
+    uv run src/almanac.py --start-year 2025 --end-year 2030
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+import metrics
+from outcome_table import OUTCOMES, SYMBOL_NAMES, outcome_key
+from utils.ganzhi import EARTHLY_BRANCHES
+from utils.lunar_bulk import solar_range_to_lunar
+from utils.lunar_table import get_lunar_table, unpack_record
+
+ALMANAC_PATH = Path(__file__).parent.parent / 'data' / 'almanac.bin'
+
+MAGIC = b'XLAL'
+VERSION = 1
+SLOTS_PER_DAY = 12
+HEADER = struct.Struct('<4sHHII')
+
+DAY_COLUMNS = ("lunar_month", "lunar_day", "is_leap")
+SLOT_COLUMNS = ("first", "second", "third", "relation1", "relation2")
+
+RELATION_NAMES = ("生", "克", "无")
+
+# 结果表的列形式，用于向量化生成
+_OUTCOME_COLUMNS = {
+    "first": np.array([o.indices[0] for o in OUTCOMES], dtype=np.uint8),
+    "second": np.array([o.indices[1] for o in OUTCOMES], dtype=np.uint8),
+    "third": np.array([o.indices[2] for o in OUTCOMES], dtype=np.uint8),
+    "relation1": np.array([RELATION_NAMES.index(o.relations[0]) for o in OUTCOMES], dtype=np.uint8),
+    "relation2": np.array([RELATION_NAMES.index(o.relations[1]) for o in OUTCOMES], dtype=np.uint8),
+}
+
+
+class AlmanacEntry(NamedTuple):
+    """某一天某个时辰的起卦结果"""
+    solar_date: date
+    branch: int  # 时辰地支序号
+    lunar_month: int
+    lunar_day: int
+    is_leap: bool
+    symbols: Tuple[str, str, str]
+    relations: Tuple[str, str]
+
+    @property
+    def shichen(self) -> str:
+        return f"{EARTHLY_BRANCHES[self.branch]}时"
+
+    @property
+    def hours(self) -> str:
+        """时辰对应的钟点，子时为 23:00-01:00"""
+        return f"{(2 * self.branch - 1) % 24:02d}:00-{2 * self.branch + 1:02d}:00"
+
+    @property
+    def lunar_date(self) -> str:
+        return f"{'闰' if self.is_leap else ''}{self.lunar_month}月{self.lunar_day}日"
+
+    @property
+    def numbers(self) -> Tuple[int, int, int]:
+        return self.lunar_month, self.lunar_day, self.branch + 1
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "date": self.solar_date.isoformat(),
+            "shichen": self.shichen,
+            "hours": self.hours,
+            "lunar_date": self.lunar_date,
+            "numbers": list(self.numbers),
+            "symbols": list(self.symbols),
+            "relations": list(self.relations),
+        }
+
+
+def hour_branch(hour: int) -> int:
+    """钟点对应的时辰地支序号（23 点起为子时）"""
+    return (hour + 1) % 24 // 2
+
+
+def build_almanac(start_year: int, end_year: int, path: Optional[Path] = None) -> Path:
+    """
+    生成 [start_year, end_year] 闭区间的时辰历书文件
+
+    Returns:
+        Path: 写入的文件路径
+    """
+    path = Path(path) if path else ALMANAC_PATH
+    first, last = date(start_year, 1, 1), date(end_year, 12, 31)
+    lunar = solar_range_to_lunar(first, last)
+    day_count = len(lunar.solar_date)
+
+    month_residue = (lunar.lunar_month.astype(np.int64) - 1) % 9
+    day_residue = (lunar.lunar_day.astype(np.int64) - 1) % 9
+    branch_residue = np.arange(SLOTS_PER_DAY) % 9
+    keys = (month_residue * 81 + day_residue * 9)[:, None] + branch_residue[None, :]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, SLOTS_PER_DAY, first.toordinal(), day_count))
+        f.write(lunar.lunar_month.astype(np.uint8).tobytes())
+        f.write(lunar.lunar_day.astype(np.uint8).tobytes())
+        f.write(lunar.is_leap.astype(np.uint8).tobytes())
+        for name in SLOT_COLUMNS:
+            f.write(_OUTCOME_COLUMNS[name][keys].tobytes())
+    return path
+
+
+class Almanac:
+    """mmap 映射的时辰历书"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else ALMANAC_PATH
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, slots_per_day, start_ordinal, day_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or slots_per_day != SLOTS_PER_DAY:
+            self._mmap.close()
+            raise ValueError(f"时辰历书格式不匹配：{self.path}")
+
+        self.start_ordinal = start_ordinal
+        self.day_count = day_count
+
+        view = memoryview(self._mmap)
+        offset = HEADER.size
+        self.columns: Dict[str, memoryview] = {}
+        for name in DAY_COLUMNS:
+            self.columns[name] = view[offset:offset + day_count]
+            offset += day_count
+        for name in SLOT_COLUMNS:
+            self.columns[name] = view[offset:offset + day_count * SLOTS_PER_DAY]
+            offset += day_count * SLOTS_PER_DAY
+
+    def __contains__(self, ordinal: int) -> bool:
+        return self.start_ordinal <= ordinal < self.start_ordinal + self.day_count
+
+    @property
+    def first_date(self) -> date:
+        return date.fromordinal(self.start_ordinal)
+
+    @property
+    def last_date(self) -> date:
+        return date.fromordinal(self.start_ordinal + self.day_count - 1)
+
+    def entry(self, day: date, branch: int) -> AlmanacEntry:
+        """读取某天某时辰的结果，日期须在历书范围内"""
+        d = day.toordinal() - self.start_ordinal
+        s = d * SLOTS_PER_DAY + branch
+        c = self.columns
+        return AlmanacEntry(
+            solar_date=day,
+            branch=branch,
+            lunar_month=c["lunar_month"][d],
+            lunar_day=c["lunar_day"][d],
+            is_leap=bool(c["is_leap"][d]),
+            symbols=(SYMBOL_NAMES[c["first"][s]], SYMBOL_NAMES[c["second"][s]], SYMBOL_NAMES[c["third"][s]]),
+            relations=(RELATION_NAMES[c["relation1"][s]], RELATION_NAMES[c["relation2"][s]]),
+        )
+
+
+def compute_entry(day: date, branch: int) -> AlmanacEntry:
+    """不经历书文件，按农历速查表与结果表直接计算"""
+    _, lunar_month, lunar_day, is_leap = unpack_record(get_lunar_table().record(day.toordinal()))
+    outcome = OUTCOMES[outcome_key(lunar_month, lunar_day, branch + 1)]
+    return AlmanacEntry(day, branch, lunar_month, lunar_day, is_leap, outcome.names, outcome.relations)
+
+
+_almanac: Optional[Almanac] = None
+
+
+def get_almanac() -> Optional[Almanac]:
+    """获取默认时辰历书（data/almanac.bin），文件不存在时返回 None"""
+    global _almanac
+    if _almanac is None and ALMANAC_PATH.exists():
+        _almanac = Almanac()
+    return _almanac
+
+
+def lookup_shichen(day: date, branch: int) -> AlmanacEntry:
+    """查询某天某时辰的起卦结果，优先读取历书文件"""
+    if not 0 <= branch < SLOTS_PER_DAY:
+        raise ValueError(f"时辰地支序号应在 0-11 之间：{branch}")
+    almanac = get_almanac()
+    if almanac is not None and day.toordinal() in almanac:
+        metrics.record_cache("almanac", True)
+        return almanac.entry(day, branch)
+    if day.toordinal() not in get_lunar_table():
+        raise ValueError(f"日期超出支持范围：{day}")
+    metrics.record_cache("almanac", False)
+    return compute_entry(day, branch)
+
+
+def lookup_time(moment: datetime) -> AlmanacEntry:
+    """查询某一时刻所在时辰的起卦结果"""
+    return lookup_shichen(moment.date(), hour_branch(moment.hour))
+
+
+def day_almanac(day: date) -> List[AlmanacEntry]:
+    """某一天十二时辰的起卦结果（子时至亥时）"""
+    return [lookup_shichen(day, branch) for branch in range(SLOTS_PER_DAY)]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="生成小六壬时辰历书")
+    this_year = date.today().year
+    parser.add_argument("--start-year", type=int, default=this_year, help="起始年份（含）")
+    parser.add_argument("--end-year", type=int, default=this_year + 9, help="结束年份（含）")
+    parser.add_argument("-o", "--output", default=None, help=f"输出路径，默认 {ALMANAC_PATH}")
+    args = parser.parse_args(argv)
+
+    path = build_almanac(args.start_year, args.end_year, args.output)
+    print(f"已生成时辰历书：{path}（{args.start_year}-{args.end_year}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+小六壬择日：查找日期起卦结果符合要求的时辰
+
+与 CLI 日期起卦相同的映射：
+    num1 = 农历月，num2 = 农历日，num3 = 时辰地支序号 + 1（(hour + 1) % 24 // 2 + 1）
+子时按该映射在零点处分为两段：23:00-24:00 取当天农历日期，00:00-01:00 取次日。
+
+农历日期直接读农历速查表的原始记录，三传查 729 项结果表。每个农历月/日组合
+（记录低 9 位）对应的命中时辰预先算好，逐日扫描时只做一次查表；结果以生成器
+产出，取够所需条数即停止。
+
+用法：
+    uv run src/auspicious_time.py 大安 速喜 小吉 --start 2025-01-01 --limit 20 --page 2
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
+from typing import FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from outcome_table import OUTCOMES, POSITION_NAMES, SYMBOL_INDEX, Outcome, outcome_key
+from utils.lunar_table import DAY_MASK, LEAP_SHIFT, MONTH_MASK, MONTH_SHIFT, get_lunar_table
+
+# 一天内的起卦时段：(起始小时, 结束小时, 时辰地支序号)
+DAY_WINDOWS = ((0, 1, 0),) + tuple((2 * b - 1, 2 * b + 1, b) for b in range(1, 12)) + ((23, 24, 0),)
+
+_MONTH_DAY_BITS = MONTH_SHIFT + 4  # 记录低 9 位为农历月、日
+
+
+class TimeSlot(NamedTuple):
+    """一个符合条件的起卦时段 [start, end)"""
+    start: datetime
+    end: datetime
+    lunar_month: int
+    lunar_day: int
+    is_leap: bool
+    numbers: Tuple[int, int, int]
+    outcome: Outcome
+
+
+@lru_cache(maxsize=64)
+def _matching_windows(targets: FrozenSet[str], position: int) -> Tuple[Tuple[int, ...], ...]:
+    """农历月/日记录位 -> 当天命中的时段下标"""
+    wanted = set()
+    for name in targets:
+        if name not in SYMBOL_INDEX:
+            raise ValueError(f"未知的小六壬符号：{name}")
+        wanted.add(SYMBOL_INDEX[name])
+    if not 0 <= position < len(POSITION_NAMES):
+        raise ValueError(f"三传位置应为 0-2：{position}")
+
+    by_month_day = []
+    for bits in range(1 << _MONTH_DAY_BITS):
+        month, day = bits >> MONTH_SHIFT & MONTH_MASK, bits & DAY_MASK
+        by_month_day.append(tuple(
+            w for w, (_, _, branch) in enumerate(DAY_WINDOWS)
+            if month and day and OUTCOMES[outcome_key(month, day, branch + 1)].indices[position] in wanted
+        ))
+    return tuple(by_month_day)
+
+
+def iter_slots(targets: Iterable[str], start: datetime, end: Optional[datetime] = None,
+               position: int = 2) -> Iterator[TimeSlot]:
+    """
+    按时间顺序逐个产出符合条件的起卦时段
+
+    Args:
+        targets: 期望的符号名称，如 ["大安", "速喜", "小吉"]
+        start: 查询起点，起点所在时段若已开始则跳过
+        end: 查询终点（不含），默认为农历速查表终点
+        position: 匹配的三传位置，0 初传，1 中传，2 末传（默认）
+
+    Yields:
+        TimeSlot: 符合条件的时段
+    """
+    table = get_lunar_table()
+    windows_by_month_day = _matching_windows(frozenset(targets), position)
+    mask = (1 << _MONTH_DAY_BITS) - 1
+
+    first = start.toordinal()
+    if first not in table:
+        raise ValueError(f"日期超出农历速查表范围：{start.date()}")
+    last = table.end_ordinal if end is None else min(end.toordinal() + 1, table.end_ordinal)
+
+    records = table.records
+    offset = table.start_ordinal
+    for ordinal in range(first, last):
+        record = records[ordinal - offset]
+        windows = windows_by_month_day[record & mask]
+        if not windows:
+            continue
+        day_start = datetime.fromordinal(ordinal)
+        for w in windows:
+            begin_hour, end_hour, branch = DAY_WINDOWS[w]
+            slot_start = day_start + timedelta(hours=begin_hour)
+            if slot_start < start:
+                continue
+            if end is not None and slot_start >= end:
+                return
+            month, day = record >> MONTH_SHIFT & MONTH_MASK, record & DAY_MASK
+            numbers = (month, day, branch + 1)
+            yield TimeSlot(
+                start=slot_start,
+                end=day_start + timedelta(hours=end_hour),
+                lunar_month=month,
+                lunar_day=day,
+                is_leap=bool(record >> LEAP_SHIFT & 1),
+                numbers=numbers,
+                outcome=OUTCOMES[outcome_key(*numbers)],
+            )
+
+
+def find_slots(targets: Iterable[str], start: datetime, end: Optional[datetime] = None,
+               position: int = 2, limit: int = 20, offset: int = 0) -> List[TimeSlot]:
+    """
+    分页查询符合条件的时段，取满 offset + limit 条即停止扫描
+
+    翻页时也可以把上一页最后一个时段的 end 作为下一次查询的 start，无需重新跳过前面的结果。
+    """
+    return list(islice(iter_slots(targets, start, end, position), offset, offset + limit))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="小六壬择日：查找日期起卦结果符合要求的时辰")
+    parser.add_argument("targets", nargs="+", help="期望的符号，如 大安 速喜 小吉")
+    parser.add_argument("--start", default=None, help="起始时间 YYYY-MM-DD[ HH:MM]，默认为当前时间")
+    parser.add_argument("--end", default=None, help="结束日期 YYYY-MM-DD（不含）")
+    parser.add_argument("--position", type=int, default=2, choices=[0, 1, 2], help="匹配的三传位置，默认末传")
+    parser.add_argument("--limit", type=int, default=20, help="每页条数")
+    parser.add_argument("--page", type=int, default=1, help="页码（从 1 开始）")
+    args = parser.parse_args(argv)
+    if args.limit < 1:
+        parser.error(f"--limit 应为正整数：{args.limit}")
+    if args.page < 1:
+        parser.error(f"--page 从 1 开始：{args.page}")
+
+    def parse_time(value: str) -> datetime:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M" if ' ' in value else "%Y-%m-%d")
+
+    start = parse_time(args.start) if args.start else datetime.now()
+    end = parse_time(args.end) if args.end else None
+    slots = find_slots(args.targets, start, end, args.position, args.limit, (args.page - 1) * args.limit)
+
+    for slot in slots:
+        names = slot.outcome.names
+        lunar = f"{'闰' if slot.is_leap else ''}{slot.lunar_month}月{slot.lunar_day}日"
+        print(f"{slot.start:%Y-%m-%d %H:%M}-{slot.end:%H:%M}  农历{lunar}  "
+              f"数字 {','.join(map(str, slot.numbers))}  "
+              f"{names[0]}→{names[1]}→{names[2]}")
+    if not slots:
+        print("查询范围内没有符合条件的时辰")
+
+
+if __name__ == "__main__":
+    main()
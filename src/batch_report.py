@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+八字批量报告导出
+Non-interactive Bazi report pipeline
+
+从 CSV / JSONL 读取出生记录，计算与 CLI 八字测算相同的完整报告
+（农历生日、四柱、五行分析、日主、配偶宫、五行缺失影响），
+以 JSONL / CSV 流式写出。记录按块分发到进程池，报告在工作进程内完成序列化，
+同时在途的块数有上限，内存占用与输入规模无关。
+
+输入字段：
+    id      记录标识（可选，缺省为行号）
+    date    公历日期 YYYY-MM-DD
+    time    出生时间 HH:MM
+    gender  性别 M/F（也接受 男/女）
+
+用法：
+    uv run src/batch_report.py births.csv -o reports.jsonl --workers 8
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.five_elements_utils import analyze_missing_wuxing
+from utils.ganzhi import (
+    EARTHLY_BRANCHES, HEAVENLY_STEMS, HELPING_ELEMENTS, JIAZI_ELEMENTS, JIAZI_NAMES,
+    PILLARS, STEM_ELEMENT, WEAKENING_ELEMENTS, WUXING_COUNT_ORDER, WUXING_ORDER
+)
+from utils.lunar_table import get_lunar_table
+
+CSV_FIELDS = [
+    "id", "gender", "solar_birth", "lunar_birth", "bazi", "day_master_element", "bazi_wuxing",
+    "wuxing_count", "helping_wuxing", "weakening_wuxing", "missing", "missing_impact",
+    "day_master_analysis", "spouse_palace_analysis", "error",
+]
+
+_COUNT_COLUMNS = [WUXING_ORDER.index(name) for name in WUXING_COUNT_ORDER]
+
+
+class InvalidRecord(NamedTuple):
+    """无法解析的输入行，由各 build 函数输出为该行的错误记录"""
+    message: str
+
+
+def check_record(record: Any) -> Dict[str, Any]:
+    """检查一条输入记录：无法解析或不是 JSON 对象时抛出 ValueError"""
+    if isinstance(record, InvalidRecord):
+        raise ValueError(record.message)
+    if not isinstance(record, dict):
+        raise ValueError(f"记录应为 JSON 对象：{json.dumps(record, ensure_ascii=False)[:50]}")
+    return record
+
+
+def record_id(record: Any, line_no: int) -> Any:
+    """记录标识：记录中的 id，缺省或记录无法解析时为行号"""
+    return (record.get('id') if isinstance(record, dict) else None) or str(line_no)
+
+
+def _parse_record(record: Any, line_no: int) -> Dict[str, Any]:
+    """解析单条出生记录，格式错误时抛出 ValueError"""
+    check_record(record)
+    birth = datetime.strptime(f"{record['date'].strip()} {record['time'].strip()}", "%Y-%m-%d %H:%M")
+    gender = str(record.get('gender', '')).strip().upper()
+    if gender not in ('M', 'F', '男', '女'):
+        raise ValueError(f"性别应为 M/F：{record.get('gender')}")
+    if birth.toordinal() not in get_lunar_table():
+        raise ValueError(f"日期超出支持范围：{record['date']}")
+    return {
+        "id": record.get('id') or str(line_no),
+        "birth": birth,
+        "is_male": gender in ('M', '男'),
+    }
+
+
+def build_reports(chunk: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    计算一块记录的八字报告（在工作进程中执行）
+
+    Args:
+        chunk: (行号, 原始记录) 列表，原始记录可为 InvalidRecord 或任意 JSON 值
+
+    Returns:
+        List[Dict[str, Any]]: 与输入顺序一致的报告列表
+    """
+    # NumPy 与批量八字引擎在计算时才导入，只使用读写流程的调用方（如 cli_batch 的其他子命令）无需加载
+    import numpy as np
+
+    from utils.bazi_batch import DAY_MASTER_TEXTS, SPOUSE_PALACE_TEXTS, batch_analyze, decode_missing
+    from utils.lunar_bulk import solar_to_lunar_arrays
+
+    parsed, reports = [], []
+    for line_no, record in chunk:
+        try:
+            parsed.append(_parse_record(record, line_no))
+            reports.append(None)
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            reports.append({"id": record_id(record, line_no), "error": f"输入格式错误：{e}"})
+
+    if not parsed:
+        return reports
+
+    births = [p["birth"] for p in parsed]
+    result = batch_analyze(
+        [b.year for b in births], [b.month for b in births], [b.day for b in births],
+        [b.hour for b in births], [p["is_male"] for p in parsed], [b.minute for b in births],
+    )
+    lunar = solar_to_lunar_arrays(np.array([b.date() for b in births], dtype='datetime64[D]'))
+
+    charts = result.charts.tolist()
+    counts = result.element_counts[:, _COUNT_COLUMNS].tolist()
+    missing_masks = result.missing_mask.tolist()
+    lunar_rows = zip(lunar.lunar_year.tolist(), lunar.lunar_month.tolist(),
+                     lunar.lunar_day.tolist(), lunar.is_leap.tolist())
+
+    built = iter(range(len(parsed)))
+    for slot, report in enumerate(reports):
+        if report is not None:
+            continue
+        i = next(built)
+        p, chart, birth = parsed[i], charts[i], births[i]
+        lunar_year, lunar_month, lunar_day, is_leap = next(lunar_rows)
+
+        day_stem = chart[2] % 10
+        day_element = STEM_ELEMENT[day_stem]
+        missing = decode_missing(missing_masks[i])
+        is_male = p["is_male"]
+        spouse_branch = result.spouse_branch[i]
+        spouse_pillar = "日支" if is_male else "年柱"
+
+        reports[slot] = {
+            "id": p["id"],
+            "gender": "男" if is_male else "女",
+            "solar_birth": birth.strftime("%Y-%m-%d %H:%M"),
+            "lunar_birth": f"{lunar_year}年{'闰' if is_leap else ''}{lunar_month}月{lunar_day}日",
+            "bazi": dict(zip(PILLARS, (JIAZI_NAMES[j] for j in chart))),
+            "day_master_element": f"{HEAVENLY_STEMS[day_stem]}{WUXING_ORDER[day_element]}命",
+            "bazi_wuxing": ' '.join(
+                WUXING_ORDER[JIAZI_ELEMENTS[j][0]] + WUXING_ORDER[JIAZI_ELEMENTS[j][1]] for j in chart
+            ),
+            "wuxing_count": dict(zip(WUXING_COUNT_ORDER, counts[i])),
+            "helping_wuxing": ''.join(WUXING_ORDER[e] for e in HELPING_ELEMENTS[day_element]),
+            "weakening_wuxing": ''.join(WUXING_ORDER[e] for e in WEAKENING_ELEMENTS[day_element]),
+            "missing": missing,
+            "missing_impact": analyze_missing_wuxing(missing, "男" if is_male else "女"),
+            "day_master_analysis": DAY_MASTER_TEXTS[is_male][bool(result.day_master_yang[i])],
+            "spouse_palace_analysis": (
+                f"配偶宫在{spouse_pillar}：{EARTHLY_BRANCHES[spouse_branch]}，"
+                f"{SPOUSE_PALACE_TEXTS[result.spouse_category[i]]}"
+            ),
+        }
+    return reports
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[Any]:
+    """逐条读取 CSV / JSONL 记录；无法解析的 JSONL 行产出 InvalidRecord，不中断读取"""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield InvalidRecord(f"JSON 解析失败：{e}")
+
+
+def chunk_records(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[tuple]]:
+    numbered = enumerate(records, 1)
+    while chunk := list(islice(numbered, size)):
+        yield chunk
+
+
+def format_reports(reports: List[Dict[str, Any]], fmt: str) -> str:
+    """将报告序列化为 JSONL 行或 CSV 行（不含表头）"""
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        for report in reports:
+            row = dict(report)
+            if "bazi" in row:
+                row["bazi"] = ' '.join(row["bazi"].values())
+                row["wuxing_count"] = ' '.join(f"{c}个{e}" for e, c in row["wuxing_count"].items())
+                row["missing"] = ''.join(row["missing"])
+            writer.writerow(row)
+        return buffer.getvalue()
+    return ''.join(json.dumps(report, ensure_ascii=False) + '\n' for report in reports)
+
+
+def render_chunk(chunk: List[tuple], fmt: str,
+                 build: Callable[[List[tuple]], List[Dict[str, Any]]] = build_reports) -> Tuple[int, str]:
+    """计算并序列化一块记录（在工作进程中执行），只把文本传回主进程"""
+    reports = build(chunk)
+    return len(reports), format_reports(reports, fmt)
+
+
+class ReportWriter:
+    """报告输出（JSONL 或 CSV）"""
+
+    def __init__(self, stream: TextIO, fmt: str):
+        self.stream = stream
+        self.fmt = fmt
+        self.count = 0
+        if fmt == 'csv':
+            csv.DictWriter(stream, fieldnames=CSV_FIELDS).writeheader()
+
+    def write(self, count: int, text: str):
+        self.stream.write(text)
+        self.count += count
+
+
+def map_chunks(fn: Callable[[List[tuple]], Any], chunks: Iterable[List[tuple]], workers: Optional[int] = None,
+               max_pending: Optional[int] = None) -> Iterator[Any]:
+    """
+    在进程池中逐块执行 fn，按输入顺序产出结果
+
+    Args:
+        fn: 可序列化的模块级函数（或其 functools.partial）
+        chunks: 记录块（可为惰性迭代器）
+        workers: 进程数，默认为 CPU 核数；为 1 时在当前进程内计算
+        max_pending: 同时在途的块数上限，默认为进程数的 2 倍
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk in chunks:
+            yield fn(chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_pending = max_pending or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(fn, chunk))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_pipeline(records: Iterable[Dict[str, Any]], writer: ReportWriter, workers: Optional[int] = None,
+                 chunk_size: int = 2000, max_pending: Optional[int] = None,
+                 build: Callable[[List[tuple]], List[Dict[str, Any]]] = build_reports) -> int:
+    """
+    分块并行计算报告并按输入顺序写出
+
+    Args:
+        records: 输入记录（可为惰性迭代器）
+        writer: 报告输出
+        workers: 进程数，默认为 CPU 核数；为 1 时在当前进程内计算
+        chunk_size: 每块记录数
+        max_pending: 同时在途的块数上限，默认为进程数的 2 倍
+        build: 由 (行号, 记录) 块生成结果列表的函数，默认为八字报告
+
+    Returns:
+        int: 写出的报告条数
+    """
+    render = partial(render_chunk, fmt=writer.fmt, build=build)
+    for count, text in map_chunks(render, chunk_records(records, chunk_size), workers, max_pending):
+        writer.write(count, text)
+    return writer.count
+
+
+def detect_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="八字批量报告导出")
+    parser.add_argument("input", help="输入文件（CSV / JSONL），- 表示标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出文件（JSONL / CSV），默认标准输出")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], help="输入格式，默认按扩展名判断")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], help="输出格式，默认按扩展名判断")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认为 CPU 核数")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="每块记录数")
+    args = parser.parse_args(argv)
+
+    in_fmt = detect_format(args.input, args.input_format)
+    out_fmt = detect_format(args.output, args.output_format)
+
+    source = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8', newline='')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        count = run_pipeline(iter_records(source, in_fmt), ReportWriter(target, out_fmt),
+                             workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    print(f"已导出 {count} 条八字报告", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 from hand_technique import HandTechnique
-from ai_agent import DivinationAgent, SupportedModels
+from ai_agent import ConversationSession, DivinationAgent, SupportedModels
+from response_length import LENGTH_LABELS, LENGTH_MODES, classify_question
+from outcome_table import lookup_outcome
+import offline_interpreter
 from five_elements import FIVE_ELEMENTS
 from utils.calendar_converter import solar_to_lunar, calculate_bazi, analyze_wuxing, format_bazi_output
 from utils.stroke_count import get_stroke_counts, format_stroke_count_output
@@ -16,6 +19,7 @@ from rich.table import Table
 from datetime import datetime 
 import random
 import os
+import sys
 import re
 
 console = Console()
@@ -93,6 +97,32 @@ def solar_to_lunar_conversion():
         console.print(f"[bold green]农历日期：[/bold green]{lunar_year}年{'闰' if is_leap else ''}{lunar_month}月{lunar_day}日")
     except ValueError:
         console.print("[bold red]输入格式错误，请确保输入正确的日期格式（YYYY-MM-DD）。[/bold red]")
+
+def shichen_almanac_lookup():
+    date_str = Prompt.ask("[bold cyan]请输入公历日期（格式：YYYY-MM-DD）[/bold cyan]",
+                          default=datetime.now().strftime("%Y-%m-%d"))
+
+    # 时辰历书依赖 NumPy，使用该工具时才导入
+    from almanac import day_almanac
+
+    try:
+        day = datetime.strptime(date_str, "%Y-%m-%d").date()
+        entries = day_almanac(day)
+    except ValueError:
+        console.print("[bold red]输入格式错误，请确保输入正确的日期格式（YYYY-MM-DD）。[/bold red]")
+        return
+
+    table = Table(title=f"{day.isoformat()} 农历{entries[0].lunar_date} 时辰起卦", box=box.SIMPLE)
+    table.add_column("时辰", style="cyan", justify="center")
+    table.add_column("钟点", justify="center")
+    table.add_column("初传", style="cyan", justify="center")
+    table.add_column("中传", style="green", justify="center")
+    table.add_column("末传", style="magenta", justify="center")
+    table.add_column("生克", style="red", justify="center")
+    for entry in entries:
+        table.add_row(entry.shichen, entry.hours, *entry.symbols, "→".join(entry.relations))
+    console.print(table)
+
 def bazi_calculation():
     date_str = Prompt.ask("[bold cyan]请输入公历日（格式：YYYY-MM-DD）[/bold cyan]")
     time_str = Prompt.ask("[bold cyan]请输入时间（格式：HH:MM）[/bold cyan]")
@@ -305,8 +335,8 @@ def analyze_day_master():
 def tools_submenu():
     while True:
         console.print("\n")
-        display_menu(["笔画数计算", "公历转农历", "五行信息", "日主五行分析"], "工具子菜单", level=2)
-        sub_choice = get_menu_choice(["笔画数计算", "公历转农历", "五行信息", "日主五行分析"], level=2)
+        display_menu(["笔画数计算", "公历转农历", "五行信息", "日主五行分析", "时辰起卦速查"], "工具子菜单", level=2)
+        sub_choice = get_menu_choice(["笔画数计算", "公历转农历", "五行信息", "日主五行分析", "时辰起卦速查"], level=2)
         if sub_choice == 'home':
             break
         elif sub_choice == 1:
@@ -317,6 +347,8 @@ def tools_submenu():
             print_five_elements_info()
         elif sub_choice == 4:
             analyze_day_master()
+        elif sub_choice == 5:
+            shichen_almanac_lookup()
 
 def display_divination_result(table, interpretation):
     console = Console()
@@ -335,6 +367,20 @@ def display_divination_result(table, interpretation):
         # 显示解释面板，宽度与表格相同
         console.print(Panel(interpretation_text, title="大师解读", border_style="magenta", expand=True, width=console_width))
 
+def follow_up_loop(session, model_type, length_mode):
+    """对同一三传继续追问，直接回车结束"""
+    if not session.started:
+        return
+    agent = None
+    while True:
+        follow_up = Prompt.ask("[bold cyan]继续追问（直接回车结束）[/bold cyan]", default="", show_default=False).strip()
+        if not follow_up:
+            return
+        agent = agent or DivinationAgent(model_type)
+        answer = agent.follow_up(session, follow_up, length_mode)
+        console.print(Panel(Text(answer, style="cyan"), title=f"追问：{follow_up}", border_style="magenta",
+                            expand=True, width=console.width))
+
 console = Console()
 
 def validate_chinese_chars(chars_input):
@@ -378,6 +424,7 @@ def select_llm_model():
             api_key_name = SupportedModels.get_api_key_name(model)
             model_name = SupportedModels.get_display_name(model)
             console.print(f"  - {api_key_name} (用于{model_name})")
+        console.print("[cyan]本次将使用离线模板解读（不调用AI）[/cyan]")
         return None
     
     if len(available_models) == 1:
@@ -403,6 +450,14 @@ def select_llm_model():
     
     return None
 
+def select_length_mode(question):
+    """选择解读篇幅，回车使用自动（按问题类型）"""
+    auto_label = f"自动（{LENGTH_LABELS[classify_question(question)]}）"
+    labels = [auto_label] + [LENGTH_LABELS[mode] for mode in LENGTH_MODES[1:]]
+    console.print("[bold cyan]解读篇幅：[/bold cyan]" + "  ".join(f"{i}. {label}" for i, label in enumerate(labels, 1)))
+    choice = Prompt.ask("请选择解读篇幅", choices=[str(i) for i in range(1, len(labels) + 1)], default="1")
+    return LENGTH_MODES[int(choice) - 1]
+
 def xiaoliu_submenu():
     while True:
         console.print("\n")
@@ -411,9 +466,10 @@ def xiaoliu_submenu():
         if sub_choice == 'home':
             return
         
-        # 选择LLM模型
+        # 选择LLM模型；未配置任何API密钥时使用离线模板解读（selected_model 为 None）
+        offline = not DivinationAgent.get_available_models()
         selected_model = select_llm_model()
-        if selected_model is None:
+        if selected_model is None and not offline:
             console.print("[yellow]未选择模型，返回主菜单[/yellow]")
             return
         elif sub_choice == 1:
@@ -459,12 +515,25 @@ def xiaoliu_submenu():
         # 获取用户的具体求问事项
         question = Prompt.ask("[bold cyan]请描述您想占卜的具体事项[/bold cyan]")
 
+        # 解读篇幅：自动按问题类型选择，简短的是非问题少等、少花令牌
+        length_mode = None if offline else select_length_mode(question)
+
+        # 等待 AI 首字时先显示即时的离线模板解读，AI 解读开始输出后替换
+        if not offline:
+            instant = offline_interpreter.interpret(lookup_outcome(num1, num2, num3).symbols, question)
+            console.print(Panel(Text(instant, style="dim"), title="即时解读（离线模板，AI解读生成中…）",
+                                border_style="blue", expand=True, width=console.width))
+
         # 使用生成的数字进行小六壬占卜，传入选择的模型
-        table, interpretation = HandTechnique.predict(num1, num2, num3, question, selected_model)
+        session = ConversationSession()
+        table, interpretation = HandTechnique.predict(num1, num2, num3, question, selected_model, length_mode, session)
         
         # 显示占卜结果解读
         display_divination_result(table, interpretation)
 
+        # 针对同一三传继续追问，沿用本次会话的历史
+        follow_up_loop(session, selected_model, length_mode)
+
 def set_current_working_dir():
     import os
     import sys
@@ -485,5 +554,9 @@ def set_current_working_dir():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # 带子命令时为非交互批处理模式，结果输出到标准输出
+        from cli_batch import run_batch_command
+        sys.exit(run_batch_command(sys.argv[1:]))
     set_current_working_dir()
     main()
\ No newline at end of file
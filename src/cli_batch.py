@@ -0,0 +1,302 @@
+"""
+CLI 非交互批处理子命令
+
+从文件或标准输入读取 JSONL / CSV 记录，逐行输出 JSON 结果到标准输出，顺序与输入一致；
+某条记录出错时输出 {"id": ..., "error": ...}，不中断处理。
+
+    divination  小六壬占卜    字段：numbers（"1,2,3"）或 num1/num2/num3；date + time；chars；可选 question
+    bazi        八字测算      字段：date, time, gender
+    lunar       公历转农历    字段：date
+    strokes     笔画数计算    字段：chars
+
+确定性计算按块分发到进程池（--workers）；divination 加 --with-ai N 时，
+对带 question 的记录调用 LLM 解读，同时进行的请求不超过 N 个。
+
+用法：
+    uv run src/cli.py divination questions.jsonl --with-ai 4
+    echo '{"date": "2024-02-10"}' | uv run src/cli.py lunar
+    uv run src/cli.py bazi births.csv --workers 8
+    uv run src/cli.py daemon serve            # 常驻守护进程，见 daemon.py
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from batch_report import (
+    ReportWriter, build_reports, check_record, chunk_records, detect_format, iter_records, map_chunks, run_pipeline
+)
+from outcome_table import lookup_outcome
+from response_length import LENGTH_MODES
+from utils.calendar_converter import solar_to_lunar
+from utils.lunar_table import get_lunar_table
+from utils.stroke_count import get_stroke_counts
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _record_id(record: Any, line_no: int) -> str:
+    return str((record.get('id') if isinstance(record, dict) else None) or line_no)
+
+
+def _lunar_date(solar: datetime) -> Tuple[int, int, int, bool]:
+    """公历日期转农历，超出农历速查表范围时抛出 ValueError"""
+    if solar.toordinal() not in get_lunar_table():
+        raise ValueError(f"日期超出支持范围：{solar.strftime('%Y-%m-%d')}")
+    return solar_to_lunar(solar.year, solar.month, solar.day)
+
+
+def _split_chars(value: Any) -> List[str]:
+    return [c for c in str(value) if '一' <= c <= '鿿']
+
+
+def divination_numbers(record: Dict[str, Any]) -> Tuple[str, Tuple[int, int, int]]:
+    """
+    按记录中的字段确定起卦方式与三个数字（映射与交互式 CLI 相同）
+
+    Returns:
+        (起卦方式, (num1, num2, num3))
+    """
+    method = record.get('method') or (
+        'hanzi' if record.get('chars') else 'date' if record.get('date') else 'numbers'
+    )
+    if method == 'numbers':
+        if record.get('numbers') is not None:
+            values = record['numbers']
+            numbers = values if isinstance(values, list) else re.split(r'[,，\s]+', str(values).strip())
+        else:
+            numbers = [record.get('num1'), record.get('num2'), record.get('num3')]
+        numbers = [int(n) for n in numbers]
+        if len(numbers) != 3 or any(n < 1 for n in numbers):
+            raise ValueError("需要三个正整数")
+    elif method == 'date':
+        moment = datetime.strptime(f"{record['date']} {record.get('time') or '00:00'}", "%Y-%m-%d %H:%M")
+        _, lunar_month, lunar_day, _ = _lunar_date(moment)
+        numbers = [lunar_month, lunar_day, (moment.hour + 1) % 24 // 2 + 1]
+    elif method == 'hanzi':
+        chars = _split_chars(record['chars'])
+        if len(chars) != 3:
+            raise ValueError(f"需要三个汉字：{record['chars']}")
+        numbers = get_stroke_counts(''.join(chars))
+        if -1 in numbers:
+            raise ValueError(f"字典中没有该汉字：{chars[numbers.index(-1)]}")
+    else:
+        raise ValueError(f"未知的起卦方式：{method}")
+    return method, tuple(numbers)
+
+
+def build_divinations(chunk: List[tuple]) -> List[Dict[str, Any]]:
+    """计算一块占卜记录的三传结果"""
+    results = []
+    for line_no, record in chunk:
+        record_id = _record_id(record, line_no)
+        try:
+            method, numbers = divination_numbers(check_record(record))
+        except (KeyError, TypeError, ValueError) as e:
+            results.append({"id": record_id, "error": f"输入格式错误：{e}"})
+            continue
+        outcome = lookup_outcome(*numbers)
+        result = {
+            "id": record_id,
+            "method": method,
+            "numbers": list(numbers),
+            "symbols": list(outcome.names),
+            "elements": [symbol.element.name for symbol in outcome.symbols],
+            "relations": list(outcome.relations),
+        }
+        if record.get('question'):
+            result["question"] = record['question']
+        results.append(result)
+    return results
+
+
+def build_lunar(chunk: List[tuple]) -> List[Dict[str, Any]]:
+    """公历转农历"""
+    results = []
+    for line_no, record in chunk:
+        record_id = _record_id(record, line_no)
+        try:
+            solar = datetime.strptime(str(check_record(record)['date']).strip(), "%Y-%m-%d")
+            lunar_year, lunar_month, lunar_day, is_leap = _lunar_date(solar)
+        except (KeyError, TypeError, ValueError) as e:
+            results.append({"id": record_id, "error": f"输入格式错误：{e}"})
+            continue
+        results.append({
+            "id": record_id,
+            "date": solar.strftime("%Y-%m-%d"),
+            "lunar_year": lunar_year,
+            "lunar_month": lunar_month,
+            "lunar_day": lunar_day,
+            "is_leap": bool(is_leap),
+            "lunar_date": f"{lunar_year}年{'闰' if is_leap else ''}{lunar_month}月{lunar_day}日",
+        })
+    return results
+
+
+def build_strokes(chunk: List[tuple]) -> List[Dict[str, Any]]:
+    """汉字笔画数"""
+    results = []
+    for line_no, record in chunk:
+        record_id = _record_id(record, line_no)
+        try:
+            chars = _split_chars(check_record(record).get('chars', ''))
+        except ValueError as e:
+            results.append({"id": record_id, "error": f"输入格式错误：{e}"})
+            continue
+        if not chars:
+            results.append({"id": record_id, "error": "输入格式错误：没有汉字"})
+            continue
+        strokes = [get_stroke_counts(c)[0] for c in chars]
+        results.append({
+            "id": record_id,
+            "chars": ''.join(chars),
+            "strokes": strokes,
+            "total": sum(s for s in strokes if s > 0),
+        })
+    return results
+
+
+COMMANDS: Dict[str, Tuple[Callable[[List[tuple]], List[Dict[str, Any]]], str]] = {
+    "divination": (build_divinations, "小六壬占卜"),
+    "bazi": (build_reports, "八字测算"),
+    "lunar": (build_lunar, "公历转农历"),
+    "strokes": (build_strokes, "笔画数计算"),
+}
+
+
+async def interpret_stream(results: Iterator[Dict[str, Any]], agent, concurrency: int,
+                           emit: Callable[[Dict[str, Any]], Awaitable[None]], shared_limit=None,
+                           length_mode: Optional[str] = None) -> int:
+    """
+    为带 question 的占卜结果并发获取 AI 解读，按输入顺序输出
+
+    Args:
+        results: 占卜结果，可为阻塞的惰性迭代器（在线程中逐条读取）
+        agent: DivinationAgent 实例
+        concurrency: 同时进行的 LLM 请求上限；已读入但未输出的结果不超过 concurrency * 4 条
+        emit: 按输入顺序接收结果的协程函数
+        shared_limit: 与其他调用共享的 asyncio.Semaphore（如守护进程的全局上限），可选
+        length_mode: 解读篇幅（auto / brief / standard / detailed），默认使用代理的设置
+
+    Returns:
+        int: 输出的结果条数
+    """
+    import asyncio
+    from contextlib import nullcontext
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def interpret(result: Dict[str, Any]) -> Dict[str, Any]:
+        if "error" in result or not result.get("question"):
+            return result
+        async with semaphore, shared_limit or nullcontext():
+            symbols = lookup_outcome(*result["numbers"]).symbols
+            result["interpretation"] = await agent.interpret_prediction_async(symbols, result["question"], length_mode)
+        return result
+
+    pending = deque()
+    count = 0
+    while True:
+        # 确定性部分可能在进程池中阻塞等待，放到线程里取下一条，不阻塞正在进行的请求
+        result = await asyncio.to_thread(next, results, None)
+        if result is None:
+            break
+        pending.append(asyncio.create_task(interpret(result)))
+        while pending and (pending[0].done() or len(pending) >= concurrency * 4):
+            await emit(await pending.popleft())
+            count += 1
+    while pending:
+        await emit(await pending.popleft())
+        count += 1
+    return count
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="小六壬占卜系统 - 非交互批处理模式")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("input", nargs="?", default="-", help="输入文件（JSONL / CSV），默认标准输入")
+        sub.add_argument("--input-format", choices=["csv", "jsonl"], help="输入格式，默认按扩展名判断")
+        sub.add_argument("--workers", type=int, default=1, help="并行进程数，默认 1（当前进程）")
+        sub.add_argument("--chunk-size", type=int, default=500, help="每块记录数")
+        if name == "divination":
+            sub.add_argument("--with-ai", type=int, default=0, metavar="N",
+                             help="为带 question 的记录生成 AI 解读，最多 N 个请求同时进行")
+            sub.add_argument("--model", help="AI 模型，如 openai:gpt-4o，默认为第一个可用模型")
+            sub.add_argument("--length", choices=LENGTH_MODES, default=None,
+                             help="解读篇幅，auto 按问题类型选择，默认 $SIXREN_RESPONSE_LENGTH 或 auto")
+    subparsers.add_parser("daemon", help="常驻守护进程与客户端（参数见 cli.py daemon -h）", add_help=False)
+    return parser
+
+
+def select_model(name: Optional[str]):
+    """按名称选择可用的 AI 模型，未指定时取第一个可用模型，不可用时抛出 ValueError"""
+    from ai_agent import DivinationAgent, SupportedModels
+
+    available = DivinationAgent.get_available_models()
+    if name:
+        model = next((m for m in SupportedModels if m.value == name), None)
+        if model is None:
+            raise ValueError(f"未知的模型：{name}")
+        if model not in available:
+            raise ValueError(f"未设置{SupportedModels.get_api_key_name(model)}环境变量，无法使用{name}")
+        return model
+    if not available:
+        raise ValueError("未检测到任何可用的LLM模型，请在.env文件中设置API密钥")
+    return available[0]
+
+
+def run_batch_command(argv: List[str]) -> int:
+    """解析子命令并执行，返回进程退出码"""
+    if argv and argv[0] == "daemon":
+        from daemon import main as daemon_main
+
+        return daemon_main(argv[1:])
+
+    args = build_parser().parse_args(argv)
+    build, _ = COMMANDS[args.command]
+
+    in_fmt = detect_format(args.input, args.input_format)
+    source = sys.stdin if args.input == '-' else open(os.path.abspath(args.input), 'r', encoding='utf-8', newline='')
+    os.chdir(PROJECT_ROOT)
+
+    try:
+        records = iter_records(source, in_fmt)
+        if getattr(args, "with_ai", 0) > 0:
+            import asyncio
+
+            try:
+                model_type = select_model(args.model)
+            except ValueError as e:
+                print(str(e), file=sys.stderr)
+                return 2
+
+            results = (
+                result
+                for chunk_results in map_chunks(build, chunk_records(records, args.chunk_size), args.workers)
+                for result in chunk_results
+            )
+
+            async def emit(result: Dict[str, Any]):
+                sys.stdout.write(json.dumps(result, ensure_ascii=False) + '\n')
+                sys.stdout.flush()
+
+            from ai_agent import DivinationAgent
+
+            count = asyncio.run(interpret_stream(results, DivinationAgent(model_type), args.with_ai, emit,
+                                                 length_mode=args.length))
+        else:
+            count = run_pipeline(records, ReportWriter(sys.stdout, 'jsonl'), workers=args.workers,
+                                 chunk_size=args.chunk_size, build=build)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    print(f"已处理 {count} 条记录", file=sys.stderr)
+    return 0
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+小六壬常驻守护进程与客户端
+
+脚本反复调用 CLI 时，每次都要启动解释器、导入模块、读取汉字字典与农历速查表、创建 AI 代理。
+守护进程在 Unix 套接字上常驻，启动时预先加载这些数据，并按模型复用 AI 代理
+（pydantic-ai 在进程内共用同一个 HTTP 客户端，连接保留在连接池中）。
+客户端只用标准库转发输入与输出，单次调用的耗时接近一次套接字往返。
+
+协议：
+    客户端 → 服务端：一行 JSON 请求头 {"command", "input_format", "with_ai", "model", "length"}，
+                     随后为原始输入（JSONL / CSV），写完后关闭写端
+    服务端 → 客户端：每条记录一行 JSON 结果，与 cli_batch 子命令的输出相同（无法解析的记录输出该行的错误记录）；
+                     请求本身有误或处理中意外出错时返回一行 {"error": ...}
+
+守护进程未运行时，客户端在当前进程中处理（与 `cli.py <子命令>` 相同）。
+
+用法：
+    uv run src/daemon.py serve &
+    echo '{"date": "2024-02-10"}' | uv run src/daemon.py lunar
+    uv run src/daemon.py divination questions.jsonl --with-ai 4
+    uv run src/daemon.py ping
+    uv run src/daemon.py stop
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from response_length import LENGTH_MODES
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BATCH_COMMANDS = ("divination", "bazi", "lunar", "strokes")
+CONTROL_COMMANDS = ("ping", "stop")
+
+# 启动时每个子命令先处理一条记录，把导入、字典与速查表都加载好
+WARM_UP_RECORDS = {
+    "divination": {"chars": "小六壬"},
+    "bazi": {"date": "2000-01-01", "time": "12:00", "gender": "M"},
+    "lunar": {"date": "2000-01-01"},
+    "strokes": {"chars": "小六壬"},
+}
+
+
+def default_socket_path() -> str:
+    """套接字路径：环境变量 SIXREN_SOCKET，否则为运行时目录下的 mini-six-ren-<uid>.sock"""
+    if os.environ.get('SIXREN_SOCKET'):
+        return os.environ['SIXREN_SOCKET']
+    import tempfile
+
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(base, f"mini-six-ren-{os.getuid()}.sock")
+
+
+def _json_line(value: Dict[str, Any]) -> bytes:
+    return (json.dumps(value, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+class DivinationDaemon:
+    """常驻服务：预加载数据，按模型复用 AI 代理，限制全局并发的 LLM 请求数"""
+
+    def __init__(self, socket_path: str, max_ai: int = 8, chunk_size: int = 500):
+        self.socket_path = socket_path
+        self.max_ai = max_ai
+        self.chunk_size = chunk_size
+        self.started = time.time()
+        self.requests = 0
+        self._agents = {}
+
+    def warm_up(self):
+        """加载全部子命令用到的模块与数据，并为每个可用模型创建 AI 代理"""
+        os.chdir(PROJECT_ROOT)
+        from ai_agent import DivinationAgent
+        from cli_batch import COMMANDS
+
+        for name, record in WARM_UP_RECORDS.items():
+            COMMANDS[name][0]([(1, record)])
+        for model in DivinationAgent.get_available_models():
+            self._agents[model] = DivinationAgent(model)
+
+    def agent_for(self, model_name: Optional[str]):
+        from ai_agent import DivinationAgent
+        from cli_batch import select_model
+
+        model = select_model(model_name)
+        if model not in self._agents:
+            self._agents[model] = DivinationAgent(model)
+        return self._agents[model]
+
+    async def serve(self):
+        import asyncio
+        import signal
+
+        self._ai_limit = asyncio.Semaphore(self.max_ai)
+        self._stopping = asyncio.Event()
+
+        if os.path.exists(self.socket_path):
+            if ping(self.socket_path) is not None:
+                raise RuntimeError(f"守护进程已在运行：{self.socket_path}")
+            os.unlink(self.socket_path)  # 上次异常退出留下的套接字文件
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._stopping.set)
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path, limit=1 << 20)
+        os.chmod(self.socket_path, 0o600)
+
+        print(f"守护进程已启动：{self.socket_path}（PID {os.getpid()}）", file=sys.stderr)
+        try:
+            async with server:
+                await self._stopping.wait()
+        finally:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        print("守护进程已停止", file=sys.stderr)
+
+    async def handle(self, reader, writer):
+        self.requests += 1
+        try:
+            header = json.loads(await reader.readline() or b'{}')
+            command = header.get("command")
+            if command == "ping":
+                writer.write(_json_line(self.status()))
+            elif command == "stop":
+                writer.write(_json_line({"stopping": True}))
+                self._stopping.set()
+            elif command in BATCH_COMMANDS:
+                await self._run_batch(command, header, reader, writer)
+            else:
+                raise ValueError(f"未知的命令：{command}")
+        except ValueError as e:
+            writer.write(_json_line({"error": str(e)}))
+        except ConnectionError:
+            pass  # 客户端提前断开
+        except Exception as e:
+            # 意外错误也要告知客户端，否则客户端只会看到连接关闭并以为处理成功
+            print(f"处理请求时出错：{e!r}", file=sys.stderr)
+            writer.write(_json_line({"error": f"处理请求时出错：{e}"}))
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "models": [model.value for model in self._agents],
+            "max_ai": self.max_ai,
+        }
+
+    async def _run_batch(self, command: str, header: Dict[str, Any], reader, writer):
+        import asyncio
+
+        from cli_batch import COMMANDS, interpret_stream
+
+        build, _ = COMMANDS[command]
+        with_ai = int(header.get("with_ai") or 0) if command == "divination" else 0
+        agent = self.agent_for(header.get("model")) if with_ai > 0 else None
+
+        async def emit(result: Dict[str, Any]):
+            writer.write(_json_line(result))
+            await writer.drain()
+
+        line_no = 0
+        async for records in self._read_chunks(reader, header.get("input_format") or "jsonl"):
+            chunk = list(enumerate(records, line_no + 1))
+            line_no += len(records)
+            results = await asyncio.to_thread(build, chunk)
+            if agent is None:
+                writer.write(b''.join(_json_line(result) for result in results))
+                await writer.drain()
+            else:
+                await interpret_stream(iter(results), agent, with_ai, emit, self._ai_limit, header.get("length"))
+
+    async def _read_chunks(self, reader, fmt: str):
+        """
+        按块读取客户端输入的记录；CSV 每块都带上表头行（字段内不应含换行）
+
+        无法解析的行作为 InvalidRecord 留在块中，由 build 函数输出为该行的错误记录，不影响同块的其他记录
+        """
+        import io
+
+        from batch_report import iter_records
+
+        csv_header = await reader.readline() if fmt == 'csv' else b''
+        lines = []
+        while True:
+            line = await reader.readline()
+            if line:
+                lines.append(line)
+            if lines and (not line or len(lines) >= self.chunk_size):
+                text = (csv_header + b''.join(lines)).decode('utf-8', errors='replace')
+                yield list(iter_records(io.StringIO(text, newline=''), fmt))
+                lines = []
+            if not line:
+                break
+
+
+def _connect(socket_path: str) -> Optional[socket.socket]:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    return sock
+
+
+def ping(socket_path: str) -> Optional[Dict[str, Any]]:
+    """查询守护进程状态，未运行时返回 None"""
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    with sock, sock.makefile('rb') as f:
+        sock.sendall(_json_line({"command": "ping"}))
+        sock.shutdown(socket.SHUT_WR)
+        return json.loads(f.readline())
+
+
+def _send_input(sock: socket.socket, source):
+    try:
+        while data := source.read(1 << 16):
+            sock.sendall(data)
+        sock.shutdown(socket.SHUT_WR)
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # 服务端已拒绝请求并关闭连接，错误信息由读取端输出
+
+
+def send_request(sock: socket.socket, header: Dict[str, Any], source=None) -> int:
+    """
+    发送请求并把结果逐行写到标准输出
+
+    输入在后台线程中发送，边发送边读取结果，输入输出较大时也不会互相阻塞。
+
+    Returns:
+        int: 进程退出码
+    """
+    sock.sendall(_json_line(header))
+    if source is None:
+        sock.shutdown(socket.SHUT_WR)
+        sender = None
+    else:
+        sender = threading.Thread(target=_send_input, args=(sock, source), daemon=True)
+        sender.start()
+
+    out = sys.stdout.buffer
+    count = 0
+    with sock.makefile('rb') as f:
+        for line in f:
+            if line.startswith(b'{"error"'):
+                print(json.loads(line)["error"], file=sys.stderr)
+                return 2
+            out.write(line)
+            out.flush()
+            count += 1
+    if sender is not None:
+        sender.join()
+    if header["command"] in BATCH_COMMANDS:
+        print(f"已处理 {count} 条记录", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="daemon.py", description="小六壬常驻守护进程与客户端")
+    parser.add_argument("command", choices=("serve",) + CONTROL_COMMANDS + BATCH_COMMANDS,
+                        help="serve 启动守护进程；ping / stop 查询或停止；其余为批处理子命令")
+    parser.add_argument("input", nargs="?", default="-", help="输入文件（JSONL / CSV），默认标准输入")
+    parser.add_argument("--socket", default=None, help="套接字路径，默认 $SIXREN_SOCKET 或运行时目录")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], help="输入格式，默认按扩展名判断")
+    parser.add_argument("--with-ai", type=int, default=0, metavar="N",
+                        help="divination：为带 question 的记录生成 AI 解读，最多 N 个请求同时进行")
+    parser.add_argument("--model", help="divination：AI 模型，如 openai:gpt-4o")
+    parser.add_argument("--length", choices=LENGTH_MODES, default=None,
+                        help="divination：解读篇幅，auto 按问题类型选择")
+    parser.add_argument("--max-ai", type=int, default=8, help="serve：所有客户端合计同时进行的 LLM 请求上限")
+    parser.add_argument("--chunk-size", type=int, default=500, help="serve：每块记录数")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    socket_path = args.socket or default_socket_path()
+
+    if args.command == "serve":
+        import asyncio
+
+        daemon = DivinationDaemon(socket_path, max_ai=args.max_ai, chunk_size=args.chunk_size)
+        daemon.warm_up()
+        try:
+            asyncio.run(daemon.serve())
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        return 0
+
+    sock = _connect(socket_path)
+    if sock is None:
+        if args.command in CONTROL_COMMANDS:
+            print(f"守护进程未运行：{socket_path}", file=sys.stderr)
+            return 1
+        # 守护进程未运行：在当前进程中处理
+        from cli_batch import run_batch_command
+
+        forward = [args.command, args.input]
+        if args.input_format:
+            forward += ["--input-format", args.input_format]
+        if args.command == "divination" and args.with_ai:
+            forward += ["--with-ai", str(args.with_ai)] + (["--model", args.model] if args.model else [])
+            forward += ["--length", args.length] if args.length else []
+        return run_batch_command(forward)
+
+    header = {"command": args.command}
+    source = None
+    if args.command in BATCH_COMMANDS:
+        in_fmt = args.input_format or ('csv' if args.input.lower().endswith('.csv') else 'jsonl')
+        header.update(input_format=in_fmt, with_ai=args.with_ai, model=args.model, length=args.length)
+        source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    try:
+        with sock:
+            return send_request(sock, header, source)
+    finally:
+        if source is not None and source is not sys.stdin.buffer:
+            source.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,53 +1,65 @@
-from symbols import SYMBOLS
+from outcome_table import lookup_outcome
 from rich.table import Table
 from rich import box
 from ai_agent import DivinationAgent, SupportedModels
+import metrics
+import offline_interpreter
+import tracing
 
 class HandTechnique:
     def __init__(self):
         self.ai_agent = DivinationAgent()
     
     @staticmethod
-    def predict(num1, num2, num3, question=None, model_type=SupportedModels.OPENAI_GPT4O):
-        symbols = HandTechnique.__generate_prediction(num1, num2, num3)
-        table = HandTechnique.__format_prediction(symbols)
-        
-        interpretation = None
-        if question:
-            ai_agent = DivinationAgent(model_type)
-            interpretation = ai_agent.interpret_prediction(symbols, question)
+    def predict(num1, num2, num3, question=None, model_type=SupportedModels.OPENAI_GPT4O,
+                 length_mode=None, session=None):
+        with tracing.span("hand_technique.predict", numbers=[num1, num2, num3]):
+            with tracing.span("hand_technique.symbols"):
+                symbols = HandTechnique.__generate_prediction(num1, num2, num3)
+            with tracing.span("hand_technique.format_table"):
+                table = HandTechnique.__format_prediction(symbols)
+            
+            interpretation = None
+            if question and model_type is None:
+                interpretation = HandTechnique.offline_interpretation(symbols, question)
+            elif question:
+                with tracing.span("ai.agent_init", model=model_type.value):
+                    ai_agent = DivinationAgent(model_type)
+                interpretation = ai_agent.interpret_prediction(symbols, question, length_mode, session)
         
         return table, interpretation
     
     @staticmethod
-    async def predict_async(num1, num2, num3, question=None, model_type=SupportedModels.OPENAI_GPT4O):
+    async def predict_async(num1, num2, num3, question=None, model_type=SupportedModels.OPENAI_GPT4O,
+                             length_mode=None, session=None):
         """异步版本的预测方法，用于Web界面"""
-        symbols = HandTechnique.__generate_prediction(num1, num2, num3)
-        table = HandTechnique.__format_prediction(symbols)
-        
-        interpretation = None
-        if question:
-            ai_agent = DivinationAgent(model_type)
-            interpretation = await ai_agent.interpret_prediction_async(symbols, question)
+        with tracing.span("hand_technique.predict", numbers=[num1, num2, num3]):
+            with tracing.span("hand_technique.symbols"):
+                symbols = HandTechnique.__generate_prediction(num1, num2, num3)
+            with tracing.span("hand_technique.format_table"):
+                table = HandTechnique.__format_prediction(symbols)
+            
+            interpretation = None
+            if question and model_type is None:
+                interpretation = HandTechnique.offline_interpretation(symbols, question)
+            elif question:
+                with tracing.span("ai.agent_init", model=model_type.value):
+                    ai_agent = DivinationAgent(model_type)
+                interpretation = await ai_agent.interpret_prediction_async(symbols, question, length_mode, session)
         
         return table, interpretation
 
     @staticmethod
-    def __calculate_symbol(start_position, steps):
-        # For numbers > 9, we use modulo 9 to map to 1-9 range
-        # If steps % 9 == 0, we use 9 instead of 0
-        normalized_steps = steps % 9
-        if normalized_steps == 0:
-            normalized_steps = 9
-        end_position = (start_position + normalized_steps - 1) % 9
-        return SYMBOLS[end_position]
+    def offline_interpretation(symbols, question):
+        """离线模式（model_type 为 None，未配置任何 AI 模型）的模板解读"""
+        metrics.OFFLINE_INTERPRETATIONS.labels(reason="offline").inc()
+        with tracing.span("offline.interpret"):
+            return offline_interpreter.interpret(symbols, question, offline_interpreter.OFFLINE_NOTICE)
 
     @staticmethod
     def __generate_prediction(num1, num2, num3):
-        first_symbol = HandTechnique.__calculate_symbol(0, num1)
-        second_symbol = HandTechnique.__calculate_symbol((num1 - 1) % 9, num2)
-        third_symbol = HandTechnique.__calculate_symbol((num1 + num2 - 2) % 9, num3)
-        return [first_symbol, second_symbol, third_symbol]
+        # 三传只取决于三个数字除以 9 的余数，直接查 729 项结果表
+        return lookup_outcome(num1, num2, num3).symbols
 
     @staticmethod
     def __format_prediction(symbols):
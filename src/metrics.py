@@ -0,0 +1,384 @@
+"""
+运行指标（Prometheus 文本格式）
+
+进程内的计数器、仪表与直方图，由 Web 服务的 /metrics 接口按 Prometheus 文本格式
+（text/plain; version=0.0.4）输出，用于 NiceGUI 部署的容量规划。只依赖标准库，
+CLI 等其他入口导入本模块时只是在内存中累加，不产生额外输出。
+
+主要指标：
+    sixren_divination_requests_total{mode}      各起卦方式的占卜请求数
+    sixren_llm_ttft_seconds{model}              LLM 首字延迟
+    sixren_llm_duration_seconds{model}          LLM 解读总耗时
+    sixren_llm_tokens_total{model,kind}         LLM 令牌数（request / response / cached）
+    sixren_llm_prompt_cache_ratio{model}        输入令牌中命中服务商前缀缓存的比例
+    sixren_llm_ttft_by_cache_seconds{model,cache}  按是否命中前缀缓存区分的首字延迟
+    sixren_llm_inflight{model}                  进行中的 AI 解读
+    sixren_cache_requests_total{cache,result}   缓存命中 / 未命中次数
+    sixren_cache_hit_ratio{cache}               缓存命中率
+    sixren_active_sessions                      已连接的浏览器会话
+    sixren_event_loop_lag_seconds               事件循环延迟
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """指标基类：按标签值保存子指标"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional["Registry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+        if not self.labelnames and type(self)._new_child is not _Metric._new_child:
+            self.labels()  # 无标签的指标从 0 开始输出
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels: str):
+        """按标签取子指标，如 REQUESTS.labels(mode="numbers").inc()"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def children(self) -> List[Tuple[LabelValues, object]]:
+        return list(self._children.items())
+
+    def _unlabeled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} 需要标签：{', '.join(self.labelnames)}")
+        return self.labels()
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """产出 (指标名, 标签串, 数值)"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    """只增计数器"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._unlabeled().inc(amount)
+
+    def samples(self):
+        for key, child in self.children():
+            yield self.name, _format_labels(self.labelnames, key), child.value
+
+
+class Gauge(_Metric):
+    """可增可减的仪表"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._unlabeled().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._unlabeled().dec(amount)
+
+    def set(self, value: float):
+        self._unlabeled().set(value)
+
+    def samples(self):
+        for key, child in self.children():
+            yield self.name, _format_labels(self.labelnames, key), child.value
+
+
+class GaugeFunction(_Metric):
+    """抓取时才计算的仪表：collect() 返回 {标签值元组: 数值}"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Dict[LabelValues, float]], registry: Optional["Registry"] = None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.collect = collect
+
+    def samples(self):
+        for key, value in self.collect().items():
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.bounds) and value > self.bounds[i]:
+            i += 1
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """直方图：累计桶计数、总和与次数"""
+
+    kind = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional["Registry"] = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._unlabeled().observe(value)
+
+    def samples(self):
+        for key, child in self.children():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, key, le), cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum", labels, child.sum
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"指标重复注册：{metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """按 Prometheus 文本格式输出全部指标"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+DIVINATION_REQUESTS = Counter(
+    "sixren_divination_requests_total", "Divination requests by input mode", ["mode"])
+LLM_TTFT = Histogram(
+    "sixren_llm_ttft_seconds", "LLM time to first token", ["model"],
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0))
+LLM_DURATION = Histogram(
+    "sixren_llm_duration_seconds", "LLM interpretation total time", ["model"],
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0))
+LLM_TOKENS = Counter(
+    "sixren_llm_tokens_total", "LLM tokens reported by the provider", ["model", "kind"])
+LLM_TTFT_BY_CACHE = Histogram(
+    "sixren_llm_ttft_by_cache_seconds",
+    "LLM time to first token by provider prompt-cache hit (unknown: stream stopped before usage arrived)",
+    ["model", "cache"],
+    buckets=LLM_TTFT.buckets)
+LLM_ERRORS = Counter(
+    "sixren_llm_errors_total", "Failed LLM interpretations", ["model"])
+LLM_EARLY_STOPS = Counter(
+    "sixren_llm_early_stops_total", "LLM streams stopped early by response-length tier", ["model", "reason"])
+LLM_BREAKER_OPEN = Gauge(
+    "sixren_llm_breaker_open", "1 while the model's circuit breaker is open (LLM calls skipped)", ["model"])
+OFFLINE_INTERPRETATIONS = Counter(
+    "sixren_offline_interpretations_total", "Template interpretations served without the LLM", ["reason"])
+LLM_INFLIGHT = Gauge(
+    "sixren_llm_inflight", "LLM interpretations in progress", ["model"])
+CACHE_REQUESTS = Counter(
+    "sixren_cache_requests_total", "Cache lookups by result (hit / miss)", ["cache", "result"])
+ACTIVE_SESSIONS = Gauge(
+    "sixren_active_sessions", "Connected browser sessions")
+EVENT_LOOP_LAG = Histogram(
+    "sixren_event_loop_lag_seconds", "Event loop scheduling delay",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+
+
+def _cache_hit_ratio() -> Dict[LabelValues, float]:
+    hits: Dict[str, float] = {}
+    totals: Dict[str, float] = {}
+    for (cache, result), child in CACHE_REQUESTS.children():
+        totals[cache] = totals.get(cache, 0.0) + child.value
+        if result == "hit":
+            hits[cache] = hits.get(cache, 0.0) + child.value
+    return {(cache,): hits.get(cache, 0.0) / total for cache, total in totals.items() if total}
+
+
+CACHE_HIT_RATIO = GaugeFunction(
+    "sixren_cache_hit_ratio", "Cache hit ratio since process start", ["cache"], _cache_hit_ratio)
+
+
+def _prompt_cache_ratio() -> Dict[LabelValues, float]:
+    tokens = {key: child.value for key, child in LLM_TOKENS.children()}
+    return {
+        (model,): tokens.get((model, "cached"), 0.0) / value
+        for (model, kind), value in tokens.items() if kind == "request" and value
+    }
+
+
+LLM_PROMPT_CACHE_RATIO = GaugeFunction(
+    "sixren_llm_prompt_cache_ratio", "Share of prompt tokens served from the provider prompt cache",
+    ["model"], _prompt_cache_ratio)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+class LLMCall:
+    """
+    一次 LLM 调用的指标记录：进行中计数、首字延迟、总耗时、令牌数与失败次数
+
+    用法：
+        with metrics.llm_call(model) as call:
+            async for message in result.stream_text():
+                call.first_token()
+            call.record_usage(result.usage())
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.started = 0.0
+        self.ttft: Optional[float] = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        LLM_INFLIGHT.labels(model=self.model).inc()
+        return self
+
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+            LLM_TTFT.labels(model=self.model).observe(self.ttft)
+
+    def record_usage(self, usage, complete: bool = True):
+        """
+        记录 pydantic-ai Usage 中的令牌数
+
+        命中前缀缓存的输入令牌：OpenAI 为 details["cached_tokens"]，
+        DeepSeek 为 details["prompt_cache_hit_tokens"]
+
+        OpenAI、DeepSeek 只在流的最后一块给出用量。流提前结束（complete=False）时用量不完整，
+        不计入令牌数（否则请求、回答与缓存令牌都被记为 0，拉低缓存命中率），
+        首字延迟计入 cache="unknown"
+        """
+        if not complete:
+            if self.ttft is not None:
+                LLM_TTFT_BY_CACHE.labels(model=self.model, cache="unknown").observe(self.ttft)
+            return
+        details = usage.details or {}
+        cached = details.get("cached_tokens") or details.get("prompt_cache_hit_tokens") or 0
+        for kind, value in (("request", usage.request_tokens), ("response", usage.response_tokens),
+                            ("cached", cached)):
+            if value:
+                LLM_TOKENS.labels(model=self.model, kind=kind).inc(value)
+        if self.ttft is not None:
+            LLM_TTFT_BY_CACHE.labels(model=self.model, cache="hit" if cached else "miss").observe(self.ttft)
+
+    def early_stop(self, reason: str):
+        """记录按篇幅档位提前结束的流式输出（reason: extra_section / length）"""
+        LLM_EARLY_STOPS.labels(model=self.model, reason=reason).inc()
+
+    def __exit__(self, exc_type, exc, tb):
+        LLM_INFLIGHT.labels(model=self.model).dec()
+        LLM_DURATION.labels(model=self.model).observe(time.perf_counter() - self.started)
+        if exc_type is not None:
+            LLM_ERRORS.labels(model=self.model).inc()
+        return False
+
+
+def llm_call(model: str) -> LLMCall:
+    return LLMCall(model)
+
+
+async def monitor_event_loop(interval: float = 0.5):
+    """周期性测量事件循环延迟：实际唤醒时间与预定时间之差"""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - expected, 0.0))
+
+
+def render() -> str:
+    return REGISTRY.render()
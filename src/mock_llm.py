@@ -0,0 +1,218 @@
+"""
+本地模拟 LLM
+
+不调用 OpenAI / DeepSeek，按提示词中的求问事项与三传符号生成确定的中文解读并流式输出，
+用于离线压测、CI 与本地开发。首字延迟、输出速率与失败率均可配置：
+
+    SIXREN_MOCK_LLM=1             启用模拟模型（出现在可用模型列表中）
+    SIXREN_MOCK_TTFT=0.5          首字延迟（秒）
+    SIXREN_MOCK_TOKEN_RATE=40     输出速率（令牌/秒），0 表示不等待
+    SIXREN_MOCK_ERROR_RATE=0      请求失败的概率（0-1）
+    SIXREN_MOCK_SEED=0            随机种子
+
+追问（提示词为「【追问】…」或「追问：…」）时，从会话首轮提示词中取三传，生成一段简短回答。
+同一提示词总是得到同样的文本；是否失败由按种子初始化的随机序列决定，同一进程内的失败次数可复现。
+"""
+
+import os
+import random
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from outcome_table import element_relation
+from symbols import SYMBOLS
+
+MODEL_NAME = "sixren-mock"
+
+_SYMBOL_BY_NAME = {symbol.name: symbol for symbol in SYMBOLS}
+
+# 失败序列按种子在进程内共用：每次占卜都会新建代理与模型，失败率仍按全部请求计算
+_failure_rngs: Dict[int, random.Random] = {}
+
+_OPENINGS = (
+    "此卦{first}起、{last}收，",
+    "三传由{first}经{middle}至{last}，",
+    "观{first}、{middle}、{last}三传，",
+)
+_TRENDS = {
+    "生": "前后相生，事情顺势推进，",
+    "克": "前后相克，其间多有阻滞，",
+    "无": "五行平和，变化在于自身把握，",
+}
+_ADVICE = (
+    "宜先稳住根基，再图进取",
+    "宜多与身边之人商量，不可独断",
+    "宜把握时机，不宜拖延",
+    "宜低调行事，静待转机",
+    "宜梳理计划，分步落实",
+)
+
+
+class MockLLMError(RuntimeError):
+    """模拟的 LLM 请求失败"""
+
+
+@dataclass
+class MockLLMConfig:
+    """模拟模型参数"""
+    ttft: float = 0.5
+    token_rate: float = 40.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls) -> "MockLLMConfig":
+        """从 SIXREN_MOCK_* 环境变量读取参数"""
+        return cls(
+            ttft=float(os.environ.get('SIXREN_MOCK_TTFT', cls.ttft)),
+            token_rate=float(os.environ.get('SIXREN_MOCK_TOKEN_RATE', cls.token_rate)),
+            error_rate=float(os.environ.get('SIXREN_MOCK_ERROR_RATE', cls.error_rate)),
+            seed=int(os.environ.get('SIXREN_MOCK_SEED', cls.seed)),
+        )
+
+
+def _parse_symbols(prompt: str, rng: random.Random) -> list:
+    """从提示词中取出三传符号，取不到时随机选取"""
+    # full 模式为「• 符号：大安」，compact 模式为「初传 大安｜木｜…」
+    names = re.findall(r"• 符号：(\S+)|^[初中末]传 (\S+?)｜", prompt, re.M)[:3]
+    symbols = [_SYMBOL_BY_NAME[name] for name in (a or b for a, b in names) if name in _SYMBOL_BY_NAME]
+    return symbols if len(symbols) == 3 else rng.sample(SYMBOLS, 3)
+
+
+def compose_interpretation(prompt: str, seed: int = 0) -> str:
+    """
+    按提示词生成确定的 Markdown 解读
+
+    Args:
+        prompt: DivinationAgent 生成的解读提示词
+        seed: 随机种子
+
+    Returns:
+        str: 与正式模型格式相同（### 标题、粗体、列表）的解读文本
+    """
+    rng = random.Random(zlib.crc32(prompt.encode('utf-8')) ^ seed)
+    match = re.search(r"(?:求问事项|所问)：(.*)", prompt)
+    question = match.group(1).strip() if match else "所问之事"
+    first, middle, last = _parse_symbols(prompt, rng)
+    relations = [element_relation(first, middle), element_relation(middle, last)]
+
+    opening = rng.choice(_OPENINGS).format(first=first.name, middle=middle.name, last=last.name)
+    lines = [
+        "### 卦象分析",
+        f"就「{question}」而言，{opening}**{last.name}**为最终走向。{last.interpretation}",
+        "",
+        "### 时间发展",
+        f"- **初传{first.name}**：{first.description}",
+        f"- **中传{middle.name}**：{middle.description}",
+        f"- **末传{last.name}**：{last.description}",
+        "",
+        "### 五行影响",
+        f"{first.element.name}→{middle.element.name}：{_TRENDS[relations[0]]}"
+        f"{middle.element.name}→{last.element.name}：{_TRENDS[relations[1]]}"
+        "当顺势而为。",
+        "",
+        "### 具体建议",
+    ]
+    lines.extend(f"- {advice}" for advice in rng.sample(_ADVICE, 3))
+    lines += [
+        "",
+        "### 关键提示",
+        f"方位宜向{last.direction}，可求{last.deity}护佑。",
+    ]
+    return "\n".join(lines)
+
+
+def compose_follow_up(question: str, context_prompt: str, seed: int = 0) -> str:
+    """
+    按会话首轮提示词中的三传生成追问的回答
+
+    Args:
+        question: 追问内容
+        context_prompt: 会话首轮的解读提示词
+        seed: 随机种子
+
+    Returns:
+        str: 两三句话的回答
+    """
+    rng = random.Random(zlib.crc32(f"{context_prompt}\n{question}".encode('utf-8')) ^ seed)
+    first, middle, last = _parse_symbols(context_prompt, rng)
+    symbol = rng.choice((first, middle, last))
+    return (
+        f"关于「{question}」：仍以末传**{last.name}**为归宿，{last.description}。"
+        f"其间可留意**{symbol.name}**之象——{symbol.interpretation}\n\n"
+        f"- {rng.choice(_ADVICE)}"
+    )
+
+
+def compose_reply(messages, seed: int = 0) -> str:
+    """按请求消息生成回答：首轮为完整解读，追问为简短回答"""
+    prompt = _prompt_text(messages)
+    match = re.search(r"(?:【追问】|^追问：)(.*?)(?:（结合上文.*）)?$", prompt, re.M)
+    if match and len(messages) > 1:
+        return compose_follow_up(match.group(1).strip(), _prompt_text(messages[:1]), seed)
+    return compose_interpretation(prompt, seed)
+
+
+def split_tokens(text: str, rng: random.Random) -> Iterator[str]:
+    """把文本切成 1-3 个字符的片段，近似中文模型的令牌粒度"""
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 3)
+        yield text[i:i + size]
+        i += size
+
+
+def _prompt_text(messages) -> str:
+    """取出最后一条消息（请求）中的用户提示词"""
+    from pydantic_ai.messages import UserPromptPart
+
+    parts = [part.content for part in messages[-1].parts
+             if isinstance(part, UserPromptPart) and isinstance(part.content, str)]
+    return "\n".join(parts)
+
+
+def build_model(config: Optional[MockLLMConfig] = None):
+    """
+    创建模拟模型
+
+    Args:
+        config: 模拟参数，默认从环境变量读取
+
+    Returns:
+        pydantic-ai FunctionModel，可直接传给 Agent
+    """
+    import asyncio
+
+    from pydantic_ai.messages import ModelResponse, TextPart
+    from pydantic_ai.models.function import FunctionModel
+
+    config = config or MockLLMConfig.from_env()
+    failures = _failure_rngs.setdefault(config.seed, random.Random(config.seed))
+
+    def check_failure():
+        if config.error_rate > 0 and failures.random() < config.error_rate:
+            raise MockLLMError("模拟的 LLM 请求失败")
+
+    async def stream(messages, info):
+        prompt = _prompt_text(messages)
+        if config.ttft > 0:
+            await asyncio.sleep(config.ttft)
+        check_failure()
+        interval = 1 / config.token_rate if config.token_rate > 0 else 0
+        rng = random.Random(zlib.crc32(prompt.encode('utf-8')) ^ config.seed)
+        for token in split_tokens(compose_reply(messages, config.seed), rng):
+            yield token
+            if interval:
+                await asyncio.sleep(interval)
+
+    async def respond(messages, info):
+        text = compose_reply(messages, config.seed)
+        delay = config.ttft + (len(text) / 2 / config.token_rate if config.token_rate > 0 else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        check_failure()
+        return ModelResponse(parts=[TextPart(text)], model_name=MODEL_NAME)
+
+    return FunctionModel(respond, stream_function=stream, model_name=MODEL_NAME)
@@ -0,0 +1,161 @@
+"""
+离线模板解读
+
+不调用 LLM，由三传符号的含义、解释、方位与神灵（data/symbols.json）、五行生克，
+以及各五行在事业、财富等方面的宜忌（data/five_elements.json），按固定模板生成与 LLM 解读
+格式相同的结构化解读（### 小节、粗体、列表）。用于：
+
+    离线模式      未设置任何 API 密钥时，CLI 与 Web 界面直接给出模板解读
+    即时首答      点击占卜后立即显示，LLM 解读到达后替换
+    熔断回退      LLM 连续失败、熔断器打开期间（见 ai_agent.CircuitBreaker）
+
+同一组三传与事项类别的正文只生成一次并缓存，每次只需拼接问题，耗时在微秒级：
+
+    uv run src/offline_interpreter.py 1 2 3 今年换工作顺利吗？
+"""
+
+import os
+import sys
+from typing import Dict, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from outcome_table import POSITION_NAMES, element_relation, lookup_outcome
+from prompt_builder import triple_key
+
+OFFLINE_NOTICE = "离线模板解读：由三传符号含义与五行生克生成，未经 AI 分析"
+
+# 符号吉凶（小六壬六神取大安、速喜、小吉为吉，留连、赤口、空亡为凶；九宫另加天德吉，病符凶，桃花平）
+FORTUNES = {
+    "大安": "吉", "速喜": "吉", "小吉": "吉", "天德": "吉",
+    "留连": "平", "桃花": "平",
+    "赤口": "凶", "空亡": "凶", "病符": "凶",
+}
+
+# 事项类别与问题中的关键词，类别名与 five_elements.json 中 meanings / promotes / taboos 的键相同
+TOPICS: Dict[str, Tuple[str, ...]] = {
+    "事业工作": ("工作", "事业", "面试", "升职", "跳槽", "辞职", "项目", "创业", "考试", "学业", "合作", "生意"),
+    "财富": ("钱", "财", "投资", "股票", "基金", "收入", "工资", "买房", "借", "债", "赚"),
+    "人际关系": ("感情", "恋爱", "婚", "对象", "朋友", "家人", "同事", "关系", "复合", "相亲"),
+    "健康": ("病", "健康", "身体", "手术", "医", "康复", "怀孕", "睡眠"),
+    "权力地位": ("官", "领导", "选举", "晋升", "名声", "地位", "权"),
+}
+
+_OVERALL = {
+    3: "三传皆吉，整体顺遂",
+    2: "三传两吉，大体向好",
+    1: "三传一吉，吉凶参半",
+    0: "三传无吉，需谨慎应对",
+}
+_RELATION_TEXT = {
+    "生": "{a}生{b}，前势推动后势，事情顺势发展",
+    "克": "{a}克{b}，前后相制，过程多有阻滞",
+    "无": "{a}与{b}无生克，变化主要在于自身把握",
+}
+_OUTLOOK = {
+    "吉": "时机有利，可积极推进，把握好节奏",
+    "平": "宜耐心等待、稳中求进，不宜操之过急",
+    "凶": "宜守不宜攻，暂缓重大决定，先做好防范",
+}
+
+_bodies: Dict[Tuple[int, Optional[str]], str] = {}
+
+
+def classify_topic(question: str) -> Optional[str]:
+    """
+    按关键词判断问题所属的事项类别，无法判断时返回 None
+
+    示例:
+    >>> classify_topic("明天面试能过吗？")
+    '事业工作'
+    >>> classify_topic("这笔投资能赚钱吗")
+    '财富'
+    >>> classify_topic("今天运势如何")
+    """
+    for topic, keywords in TOPICS.items():
+        if any(keyword in question for keyword in keywords):
+            return topic
+    return None
+
+
+def _build_body(symbols, topic: Optional[str]) -> str:
+    """问题之后的全部正文（只取决于三传与事项类别）"""
+    first, middle, last = symbols
+    relations = (element_relation(first, middle), element_relation(middle, last))
+    fortune = FORTUNES.get(last.name, "平")
+    good = sum(FORTUNES.get(symbol.name) == "吉" for symbol in symbols)
+    element = last.element
+
+    lines = [
+        f"三传为**{first.name}**→**{middle.name}**→**{last.name}**，{_OVERALL[good]}。"
+        f"末传**{last.name}**（{fortune}）为最终走向，主{last.description}：{last.interpretation}",
+        "",
+        "### 时间发展",
+    ]
+    for position, symbol, stage in zip(POSITION_NAMES, symbols, ("前期", "中期", "后期")):
+        lines.append(f"- **{stage}·{position}{symbol.name}**（{FORTUNES.get(symbol.name, '平')}）："
+                     f"{symbol.description}。{symbol.interpretation}")
+
+    lines += ["", "### 五行影响"]
+    for (a, b), relation in zip(((first, middle), (middle, last)), relations):
+        text = _RELATION_TEXT[relation].format(a=a.element.name, b=b.element.name)
+        lines.append(f"- {a.name}→{b.name}：{text}")
+    meaning = element.meanings.get(topic) if topic else None
+    if isinstance(meaning, str):
+        lines.append(f"- 末传属{element.name}：{element.description}，于{topic}对应{meaning}")
+    else:
+        lines.append(f"- 末传属{element.name}：{element.description}")
+
+    lines += ["", "### 具体建议", f"- {_OUTLOOK[fortune]}"]
+    if "克" in relations:
+        lines.append("- 过程中有阻滞，凡事预留余地，遇阻先缓后进")
+    for area in ((topic,) if topic else ("事业工作", "人际关系")):
+        lines.append(f"- {area}：宜{element.promotes[area]}，{element.taboos[area]}")
+
+    lines += [
+        "",
+        "### 关键提示",
+        f"方位宜向**{last.direction}**，可求**{last.deity}**（{last.deity_description}）护佑。",
+    ]
+    return "\n".join(lines)
+
+
+def interpret(symbols, question: str, notice: str = "") -> str:
+    """
+    生成离线模板解读
+
+    Args:
+        symbols: 三传符号列表
+        question: 用户问题
+        notice: 放在开头的说明（引用块），为空时不加
+
+    Returns:
+        str: Markdown 解读文本
+    """
+    topic = classify_topic(question)
+    cache_key = (triple_key(symbols), topic)
+    body = _bodies.get(cache_key)
+    if body is None:
+        body = _bodies[cache_key] = _build_body(symbols, topic)
+    text = f"### 卦象分析\n就「{question}」而言，{body}"
+    return f"> {notice}\n\n{text}" if notice else text
+
+
+def main(argv=None):
+    import argparse
+    import timeit
+
+    parser = argparse.ArgumentParser(description="小六壬离线模板解读")
+    parser.add_argument("numbers", nargs=3, type=int, help="三个数字")
+    parser.add_argument("question", help="求问事项")
+    args = parser.parse_args(argv)
+
+    symbols = lookup_outcome(*args.numbers).symbols
+    print(interpret(symbols, args.question, OFFLINE_NOTICE))
+    runs = 10000
+    seconds = timeit.timeit(lambda: interpret(symbols, args.question), number=runs)
+    print(f"\n（每次 {seconds / runs * 1e6:.1f} µs）")
+
+
+if __name__ == "__main__":
+    main()
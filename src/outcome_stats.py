@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+小六壬起卦方式的结果分布统计
+
+各起卦方式把输入映射为三个数字的方式不同，结果在 729 种三传上的分布也不同：
+- numbers:  三个数字各自在 1..N 内均匀取值（Web 版限制 N = 999）
+- web_date: Web 版日期起卦，(公历月-1)%9+1、(公历日-1)%9+1、(小时%12)//2+1
+- cli_date: CLI 日期起卦，农历月、农历日、(小时+1)%24//2+1
+- hanzi:    三个汉字各自在字典中均匀取值，取笔画数
+
+三传只取决于三个数字除以 9 的余数，所以每种方式先按余数统计，再用外积或
+bincount 得到 729 项直方图，不逐个输入调用 HandTechnique。
+日期方式对范围内的每一天、每个小时计数一次。
+
+用法：
+    uv run src/outcome_stats.py -o outcome_stats.json
+    uv run src/outcome_stats.py --methods web_date cli_date --start 2000-01-01 --end 2099-12-31
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from outcome_table import OUTCOMES, POSITION_NAMES, SYMBOL_NAMES
+from utils.lunar_bulk import solar_range_to_lunar
+from utils.lunar_table import START_DATE, get_lunar_table
+from utils.stroke_count import iter_dictionary
+
+OUTCOME_COUNT = 729
+RELATION_NAMES = ("生", "克", "无")
+
+# 结果表的数组形式：(729, 3) 三传符号序号，(729, 2) 关系编号
+OUTCOME_SYMBOLS = np.array([o.indices for o in OUTCOMES], dtype=np.int64)
+OUTCOME_RELATIONS = np.array([[RELATION_NAMES.index(r) for r in o.relations] for o in OUTCOMES], dtype=np.int64)
+
+HOURS = np.arange(24)
+
+
+def _residues(numbers: np.ndarray) -> np.ndarray:
+    """数字按 (n - 1) % 9 分桶计数"""
+    return np.bincount((np.asarray(numbers, dtype=np.int64) - 1) % 9, minlength=9)
+
+
+def _outer3(first: np.ndarray, second: np.ndarray, third: np.ndarray) -> np.ndarray:
+    """三个独立余数分布的联合直方图，下标为 r1 * 81 + r2 * 9 + r3"""
+    return (first[:, None, None] * second[None, :, None] * third[None, None, :]).ravel()
+
+
+def _date_histogram(month_numbers: np.ndarray, day_numbers: np.ndarray, hour_numbers: np.ndarray) -> np.ndarray:
+    """日期方式：每一天与每个小时组合计数一次"""
+    day_keys = (month_numbers - 1) % 9 * 9 + (day_numbers - 1) % 9
+    by_day = np.bincount(day_keys, minlength=81)
+    return np.outer(by_day, _residues(hour_numbers)).ravel()
+
+
+def numbers_histogram(max_number: int = 999) -> np.ndarray:
+    """三个数字各自在 1..max_number 内取值"""
+    residues = _residues(np.arange(1, max_number + 1))
+    return _outer3(residues, residues, residues)
+
+
+def web_date_histogram(start: date, end: date) -> np.ndarray:
+    """Web 版日期起卦（公历月、日与 12 小时制时段）"""
+    days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + np.timedelta64(1, 'D'))
+    month_start = days.astype('datetime64[M]')
+    months = month_start.astype(np.int64) % 12 + 1
+    day_of_month = (days - month_start.astype('datetime64[D]')).astype(np.int64) + 1
+    return _date_histogram(months, day_of_month, HOURS % 12 // 2 + 1)
+
+
+def cli_date_histogram(start: date, end: date) -> np.ndarray:
+    """CLI 日期起卦（农历月、日与时辰地支）"""
+    lunar = solar_range_to_lunar(start, end)
+    return _date_histogram(lunar.lunar_month.astype(np.int64), lunar.lunar_day.astype(np.int64),
+                           (HOURS + 1) % 24 // 2 + 1)
+
+
+def hanzi_histogram() -> np.ndarray:
+    """三个汉字各自在字典中取值，取笔画数"""
+    strokes = {}
+    for char, count in iter_dictionary():
+        strokes.setdefault(char, count)
+    residues = _residues(np.fromiter(strokes.values(), dtype=np.int64, count=len(strokes)))
+    return _outer3(residues, residues, residues)
+
+
+def _shares(counts: np.ndarray, names, total: float) -> Dict[str, float]:
+    return {name: round(float(c) / total, 6) for name, c in zip(names, counts)}
+
+
+def summarize(histogram: np.ndarray, top: int = 10, include_histogram: bool = False) -> Dict[str, Any]:
+    """
+    由 729 项直方图计算统计指标
+
+    Returns:
+        Dict[str, Any]: 覆盖率、熵、与均匀分布的差异、各传符号频率、生克比例、最常见结果等
+    """
+    counts = np.asarray(histogram, dtype=np.int64)
+    histogram = counts.astype(np.float64)
+    total = float(histogram.sum())
+    p = histogram / total
+    nonzero = p[p > 0]
+
+    entropy = float(-(nonzero * np.log2(nonzero)).sum())
+
+    positions = {
+        POSITION_NAMES[i]: _shares(
+            np.bincount(OUTCOME_SYMBOLS[:, i], weights=histogram, minlength=len(SYMBOL_NAMES)), SYMBOL_NAMES, total
+        )
+        for i in range(3)
+    }
+    first_relation = np.bincount(OUTCOME_RELATIONS[:, 0], weights=histogram, minlength=3)
+    second_relation = np.bincount(OUTCOME_RELATIONS[:, 1], weights=histogram, minlength=3)
+
+    order = np.argsort(-histogram, kind='stable')[:top]
+    report = {
+        "total": int(counts.sum()),
+        "coverage": int((histogram > 0).sum()),
+        "entropy_bits": round(entropy, 6),
+        "max_entropy_bits": round(math.log2(OUTCOME_COUNT), 6),
+        # 与 729 项均匀分布的差异：KL 散度与总变差距离
+        "kl_from_uniform_bits": round(max(math.log2(OUTCOME_COUNT) - entropy, 0.0), 6),
+        "tv_from_uniform": round(float(np.abs(p - 1 / OUTCOME_COUNT).sum() / 2), 6),
+        "max_min_ratio": round(float(nonzero.max() / nonzero.min()), 6),
+        "symbol_frequency": positions,
+        "relation_ratio": {
+            "初传→中传": _shares(first_relation, RELATION_NAMES, total),
+            "中传→末传": _shares(second_relation, RELATION_NAMES, total),
+            "合计": _shares(first_relation + second_relation, RELATION_NAMES, 2 * total),
+        },
+        "top_outcomes": [
+            {
+                "symbols": list(OUTCOMES[key].names),
+                "relations": list(OUTCOMES[key].relations),
+                "share": round(float(p[key]), 6),
+            }
+            for key in order.tolist()
+        ],
+    }
+    if include_histogram:
+        # 下标为 (num1-1)%9 * 81 + (num2-1)%9 * 9 + (num3-1)%9
+        report["histogram"] = counts.tolist()
+    return report
+
+
+METHODS: Dict[str, Callable[..., np.ndarray]] = {
+    "numbers": lambda args: numbers_histogram(args["max_number"]),
+    "web_date": lambda args: web_date_histogram(args["start"], args["end"]),
+    "cli_date": lambda args: cli_date_histogram(args["start"], args["end"]),
+    "hanzi": lambda args: hanzi_histogram(),
+}
+
+
+def default_date_range() -> tuple:
+    """日期方式的默认统计范围：农历速查表覆盖的全部公历日期"""
+    table = get_lunar_table()
+    return START_DATE, date.fromordinal(table.end_ordinal - 1)
+
+
+def build_report(methods: Optional[List[str]] = None, start: Optional[date] = None, end: Optional[date] = None,
+                 max_number: int = 999, top: int = 10, include_histogram: bool = False) -> Dict[str, Any]:
+    """按起卦方式生成统计报告"""
+    default_start, default_end = default_date_range()
+    params = {"start": start or default_start, "end": end or default_end, "max_number": max_number}
+
+    report = {
+        "parameters": {
+            "date_range": [params["start"].isoformat(), params["end"].isoformat()],
+            "max_number": max_number,
+        },
+        "methods": {},
+    }
+    for name in methods or list(METHODS):
+        if name not in METHODS:
+            raise ValueError(f"未知的起卦方式：{name}")
+        report["methods"][name] = summarize(METHODS[name](params), top, include_histogram)
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="小六壬起卦方式的结果分布统计")
+    parser.add_argument("--methods", nargs="+", choices=list(METHODS), help="统计的起卦方式，默认全部")
+    parser.add_argument("--start", type=date.fromisoformat, help="日期方式的起始日期，默认为农历速查表起点")
+    parser.add_argument("--end", type=date.fromisoformat, help="日期方式的结束日期（含），默认为农历速查表终点")
+    parser.add_argument("--max-number", type=int, default=999, help="数字方式的取值上限")
+    parser.add_argument("--top", type=int, default=10, help="列出最常见结果的个数")
+    parser.add_argument("--histogram", action="store_true", help="输出完整的 729 项直方图")
+    parser.add_argument("-o", "--output", default="-", help="输出 JSON 文件，默认标准输出")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.methods, args.start, args.end, args.max_number, args.top, args.histogram)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+
+
+if __name__ == "__main__":
+    main()
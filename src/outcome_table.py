@@ -0,0 +1,72 @@
+"""
+小六壬三传结果表
+
+三传只取决于三个数字各自除以 9 的余数：
+    初传 = (num1 - 1) % 9
+    中传 = (num1 + num2 - 2) % 9
+    末传 = (num1 + num2 + num3 - 3) % 9
+因此全部可能的结果只有 9 × 9 × 9 = 729 种，按余数预先计算三传符号序号与生克关系，
+占卜、择日与统计只需查表。
+"""
+
+from typing import List, NamedTuple, Tuple
+
+from symbols import SYMBOLS
+
+POSITION_NAMES = ("初传", "中传", "末传")
+SYMBOL_NAMES = tuple(symbol.name for symbol in SYMBOLS)
+SYMBOL_INDEX = {name: i for i, name in enumerate(SYMBOL_NAMES)}
+
+
+class Outcome(NamedTuple):
+    """一种三传结果"""
+    indices: Tuple[int, int, int]  # 三传符号在 SYMBOLS 中的序号
+    relations: Tuple[str, str]  # 初传→中传、中传→末传的关系：生 / 克 / 无
+
+    @property
+    def symbols(self) -> list:
+        return [SYMBOLS[i] for i in self.indices]
+
+    @property
+    def names(self) -> Tuple[str, str, str]:
+        return tuple(SYMBOL_NAMES[i] for i in self.indices)
+
+
+def element_relation(first, second) -> str:
+    """两个符号五行之间的关系（与 HandTechnique 的判断规则一致）"""
+    if first.element.generates == second.element.name:
+        return "生"
+    if first.element.overcomes == second.element.name:
+        return "克"
+    return "无"
+
+
+def outcome_key(num1: int, num2: int, num3: int) -> int:
+    """三个数字对应的结果表下标（0-728）"""
+    return (num1 - 1) % 9 * 81 + (num2 - 1) % 9 * 9 + (num3 - 1) % 9
+
+
+def _build_outcomes() -> List[Outcome]:
+    outcomes = []
+    for key in range(729):
+        r1, r2, r3 = key // 81, key // 9 % 9, key % 9
+        indices = (r1, (r1 + r2) % 9, (r1 + r2 + r3) % 9)
+        first, second, third = (SYMBOLS[i] for i in indices)
+        outcomes.append(Outcome(indices, (element_relation(first, second), element_relation(second, third))))
+    return outcomes
+
+
+OUTCOMES = _build_outcomes()
+
+
+def lookup_outcome(num1: int, num2: int, num3: int) -> Outcome:
+    """
+    查询三个数字的三传结果
+
+    示例:
+    >>> lookup_outcome(1, 2, 3).names
+    ('大安', '留连', '赤口')
+    >>> lookup_outcome(10, 11, 12).names == lookup_outcome(1, 2, 3).names
+    True
+    """
+    return OUTCOMES[outcome_key(num1, num2, num3)]
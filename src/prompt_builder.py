@@ -0,0 +1,349 @@
+"""
+解读提示词构建与令牌计数
+
+两种模式：
+    full      详细提示词：符号各字段逐行列出，生克关系写两遍，解读要求分五条
+    compact   精简提示词：符号字段压缩为一行，生克关系只写一遍，解读要求合并为一段；
+              包含的信息与 full 相同，输入令牌约少四成
+
+提示词布局固定为「系统提示词 → 三传与解读要求 → 求问事项」：问题放在最后，
+前面的部分只取决于三传符号，同一组三传的请求共用完全相同的前缀，可以命中服务商的
+提示词前缀缓存（DeepSeek 按 64 令牌为单位缓存；OpenAI 要求前缀至少 1024 令牌）。
+缓存命中的令牌数记录在 metrics 的 sixren_llm_tokens_total{kind="cached"} 中。
+
+追问（见 ai_agent 的会话模式）只发送 build_follow_up_prompt 生成的一句话，三传与上一轮解读
+已在会话历史中，历史本身又是不变的前缀，同样可以命中缓存。
+
+前缀在首次使用时预先生成：9 个符号在三个位置上的段落与 729 种三传组合的整段前缀，
+之后每次构建只需在末尾拼接问题。
+
+令牌数在本地计算：安装了 tiktoken 且能加载对应编码时精确计数，否则按各模型的
+中文 / 非中文字符比例估算。运行本模块可查看各模型在两种模式下的令牌数与节省比例：
+
+    uv run src/prompt_builder.py
+    SIXREN_PROMPT_MODE=compact uv run src/web.py
+"""
+
+import argparse
+import os
+import sys
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from outcome_table import POSITION_NAMES, SYMBOL_INDEX, element_relation
+from symbols import SYMBOLS
+
+PROMPT_MODES = ("full", "compact")
+DEFAULT_PROMPT_MODE = "full"
+
+_FULL_POSITIONS = ("初传（前期）", "中传（中期）", "末传（后期）")
+
+SYSTEM_PROMPT = (
+    "你是一位精通小六壬占卜的大师，具有深厚的传统文化功底。你的职责是：\n"
+    "1. 仔细理解求问者的具体问题和关切\n"
+    "2. 深入分析三传符号的含义和五行关系\n"
+    "3. 将占卜结果与求问事项紧密结合，提供针对性解读\n"
+    "4. 避免泛泛而谈，要针对具体问题给出具体指导\n"
+    "5. 语言要优雅含蓄，富有哲理，但让现代人容易理解\n\n"
+    "格式要求：\n"
+    "- 使用清晰的段落结构，每段专注一个要点\n"
+    "- 用 ### 标题区分不同主题（如：卦象分析、时间发展、建议指导等）\n"
+    "- 重要内容使用 **粗体** 强调\n"
+    "- 具体建议可用列表形式呈现\n"
+    "请始终围绕求问者的具体问题进行解读，字数控制在1000字以内。"
+)
+
+
+def default_prompt_mode() -> str:
+    """环境变量 SIXREN_PROMPT_MODE 指定的模式，默认 full"""
+    mode = os.environ.get('SIXREN_PROMPT_MODE', DEFAULT_PROMPT_MODE).strip().lower()
+    return mode if mode in PROMPT_MODES else DEFAULT_PROMPT_MODE
+
+
+def triple_key(symbols) -> int:
+    """三传符号组合的下标（0-728）"""
+    i1, i2, i3 = (SYMBOL_INDEX[symbol.name] for symbol in symbols)
+    return i1 * 81 + i2 * 9 + i3
+
+
+def _relation_verb(relation: str) -> str:
+    return relation if relation in ('生', '克') else '与'
+
+
+# ---- full：原有的详细提示词 ----
+
+def _full_symbol_block(position: int, symbol) -> str:
+    return (
+        f"\n{_FULL_POSITIONS[position]}：\n"
+        f"• 符号：{symbol.name}\n"
+        f"• 描述：{symbol.description}\n"
+        f"• 解释：{symbol.interpretation}\n"
+        f"• 五行：{symbol.element.name}\n"
+        f"• 方位：{symbol.direction}\n"
+        f"• 神灵：{symbol.deity} - {symbol.deity_description}\n"
+    )
+
+
+def _full_prefix(symbols) -> str:
+    """full 模式中问题之前的部分：三传、生克关系与解读要求"""
+    blocks = get_symbol_blocks("full")
+    relations = [element_relation(symbols[0], symbols[1]), element_relation(symbols[1], symbols[2])]
+    e1, e2, e3 = (symbol.element.name for symbol in symbols)
+
+    prompt = "=== 三传占卜结果 ===\n"
+    prompt += "".join(blocks[i][SYMBOL_INDEX[symbol.name]] for i, symbol in enumerate(symbols))
+    prompt += "\n=== 五行生克关系 ===\n"
+    prompt += f"初传五行：{e1}\n中传五行：{e2}\n末传五行：{e3}\n\n"
+    prompt += f"初传→中传：{relations[0]}（{e1}{_relation_verb(relations[0])}{e2}）\n"
+    prompt += f"中传→末传：{relations[1]}（{e2}{_relation_verb(relations[1])}{e3}）\n\n"
+
+    prompt += "=== 解读要求 ===\n"
+    prompt += "请紧密结合文末的求问事项，进行以下分析：\n\n"
+    prompt += "1. **针对性分析**：这三传结果对于所问之事意味着什么？请直接回应求问者的关切。\n\n"
+    prompt += "2. **时间发展脉络**：\n"
+    prompt += f"   - 初传（当前/近期）：{symbols[0].name}对此事的影响\n"
+    prompt += f"   - 中传（中期发展）：{symbols[1].name}如何推动事态变化\n"
+    prompt += f"   - 末传（最终结果）：{symbols[2].name}预示的最终走向\n\n"
+    if relations[0] != '无' or relations[1] != '无':
+        prompt += "3. **五行影响机制**：结合求问事项，解释五行生克如何具体影响这件事的发展：\n"
+        if relations[0] != '无':
+            prompt += f"   - {e1}{relations[0]}{e2}：对此事态发展的推动/阻碍作用\n"
+        if relations[1] != '无':
+            prompt += f"   - {e2}{relations[1]}{e3}：对最终结果的影响机制\n"
+    else:
+        prompt += "3. **符号启示**：三传间无明显五行生克，请重点分析各符号本身对此问题的指导意义。\n"
+    prompt += "\n4. **具体建议**：基于以上分析，针对这个具体问题给出实用的行动指导和注意事项。\n\n"
+    prompt += "5. **关键提示**：如有特别需要注意的时间、方位、或神灵护佑，请一并说明。\n\n"
+    prompt += "【重要提醒】请始终围绕求问事项进行解读，将抽象的占卜符号与具体问题紧密结合，给出有针对性的指导。\n\n"
+    return prompt
+
+
+def _build_full(prefix: str, question: str) -> str:
+    return f"{prefix}【重要】求问事项：{question}\n请您务必围绕此具体问题进行解读，避免泛泛而谈。"
+
+
+# ---- compact：精简提示词 ----
+
+def _compact_symbol_block(position: int, symbol) -> str:
+    return (
+        f"{POSITION_NAMES[position]} {symbol.name}｜{symbol.element.name}｜{symbol.direction}｜"
+        f"{symbol.deity}（{symbol.deity_description}）｜{symbol.description}；{symbol.interpretation}\n"
+    )
+
+
+def _compact_prefix(symbols) -> str:
+    blocks = get_symbol_blocks("compact")
+    r1, r2 = element_relation(symbols[0], symbols[1]), element_relation(symbols[1], symbols[2])
+    e1, e2, e3 = (symbol.element.name for symbol in symbols)
+
+    def relation_text(first: str, relation: str, second: str) -> str:
+        return f"{first}{relation}{second}" if relation != '无' else f"{first}{second}无生克"
+
+    prompt = "三传（初→中→末）：\n"
+    prompt += "".join(blocks[i][SYMBOL_INDEX[symbol.name]] for i, symbol in enumerate(symbols))
+    prompt += f"生克：初→中{relation_text(e1, r1, e2)}；中→末{relation_text(e2, r2, e3)}\n"
+    focus = "五行生克对此事的推动或阻碍" if r1 != '无' or r2 != '无' else "各符号本身对此事的启示"
+    prompt += (
+        f"要求：紧扣文末所问，依次写针对性结论、初中末传的发展脉络、{focus}、"
+        "具体建议、需注意的时间方位与神灵护佑。\n"
+    )
+    return prompt
+
+
+def _build_compact(prefix: str, question: str) -> str:
+    return f"{prefix}所问：{question}"
+
+
+_MODES: Dict[str, Tuple[Callable, Callable, Callable]] = {
+    "full": (_full_symbol_block, _full_prefix, _build_full),
+    "compact": (_compact_symbol_block, _compact_prefix, _build_compact),
+}
+
+_symbol_blocks: Dict[str, Tuple[Tuple[str, ...], ...]] = {}
+_triple_prefixes: Dict[str, Tuple[str, ...]] = {}
+
+
+def get_symbol_blocks(mode: str) -> Tuple[Tuple[str, ...], ...]:
+    """各位置上 9 个符号的段落：blocks[位置][符号序号]，首次调用时生成"""
+    blocks = _symbol_blocks.get(mode)
+    if blocks is None:
+        block = _MODES[mode][0]
+        blocks = tuple(tuple(block(position, symbol) for symbol in SYMBOLS) for position in range(3))
+        _symbol_blocks[mode] = blocks
+    return blocks
+
+
+def get_triple_prefixes(mode: str) -> Tuple[str, ...]:
+    """729 种三传组合的提示词前缀（问题之前的全部文字），按 triple_key 排列，首次调用时生成"""
+    prefixes = _triple_prefixes.get(mode)
+    if prefixes is None:
+        build = _MODES[mode][1]
+        prefixes = tuple(
+            build((SYMBOLS[key // 81], SYMBOLS[key // 9 % 9], SYMBOLS[key % 9])) for key in range(729)
+        )
+        _triple_prefixes[mode] = prefixes
+    return prefixes
+
+
+def build_prompt(symbols, question: str, mode: str = DEFAULT_PROMPT_MODE) -> str:
+    """
+    生成解读提示词
+
+    Args:
+        symbols: 三传符号列表
+        question: 用户问题
+        mode: full 或 compact
+
+    Returns:
+        str: 提示词
+    """
+    if mode not in _MODES:
+        raise ValueError(f"未知的提示词模式：{mode}（可选：{', '.join(PROMPT_MODES)}）")
+    return _MODES[mode][2](get_triple_prefixes(mode)[triple_key(symbols)], question)
+
+
+_FOLLOW_UP_TEMPLATES = {
+    "full": "【追问】{question}\n请结合上文的三传与解读回答此追问，直接作答，不必重复卦象分析。",
+    "compact": "追问：{question}（结合上文三传作答，不重复卦象分析）",
+}
+
+
+def build_follow_up_prompt(question: str, mode: str = DEFAULT_PROMPT_MODE) -> str:
+    """
+    生成追问提示词：三传与之前的解读已在会话历史中，只发送追问本身
+
+    Args:
+        question: 追问内容
+        mode: full 或 compact
+
+    Returns:
+        str: 提示词
+    """
+    if mode not in _FOLLOW_UP_TEMPLATES:
+        raise ValueError(f"未知的提示词模式：{mode}（可选：{', '.join(PROMPT_MODES)}）")
+    return _FOLLOW_UP_TEMPLATES[mode].format(question=question)
+
+
+# ---- 令牌计数 ----
+
+class TokenizerSpec(NamedTuple):
+    encoding: Optional[str]  # tiktoken 编码名，None 表示只能估算
+    cjk_ratio: float  # 估算时每个中文字符的令牌数
+    other_ratio: float  # 估算时每个其他字符的令牌数
+
+
+# DeepSeek 官方说明：1 个中文字符约 0.6 个令牌，1 个英文字符约 0.3 个令牌
+TOKENIZERS: Dict[str, TokenizerSpec] = {
+    "openai:gpt-4o": TokenizerSpec("o200k_base", 0.8, 0.25),
+    "deepseek:deepseek-chat": TokenizerSpec(None, 0.6, 0.3),
+    "mock:sixren": TokenizerSpec(None, 0.5, 0.5),
+}
+_FALLBACK_SPEC = TokenizerSpec(None, 0.8, 0.3)
+
+
+def _is_cjk(char: str) -> bool:
+    return '一' <= char <= '鿿' or '　' <= char <= '〿' or '＀' <= char <= '￯'
+
+
+class TokenCounter:
+    """某个模型的令牌计数器：优先用 tiktoken，否则按字符比例估算"""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.spec = TOKENIZERS.get(model, _FALLBACK_SPEC)
+        self._encoding = self._load_encoding(self.spec.encoding)
+
+    @staticmethod
+    def _load_encoding(name: Optional[str]):
+        if name is None:
+            return None
+        try:
+            import tiktoken
+            return tiktoken.get_encoding(name)
+        except Exception:
+            return None  # 未安装或无法下载编码文件
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        cjk = sum(1 for char in text if _is_cjk(char))
+        return round(cjk * self.spec.cjk_ratio + (len(text) - cjk) * self.spec.other_ratio)
+
+
+_counters: Dict[str, TokenCounter] = {}
+
+
+def get_token_counter(model: str) -> TokenCounter:
+    counter = _counters.get(model)
+    if counter is None:
+        counter = _counters.setdefault(model, TokenCounter(model))
+    return counter
+
+
+def count_tokens(text: str, model: str) -> int:
+    """按模型计算文本的令牌数"""
+    return get_token_counter(model).count(text)
+
+
+# ---- 节省报告 ----
+
+SAMPLE_QUESTIONS = ("今年换工作是否顺利？", "能", "这段感情接下来会怎样发展，对方是否真心？")
+
+
+def savings_report(models: Sequence[str], questions: Sequence[str] = SAMPLE_QUESTIONS,
+                   system_prompt: str = "") -> List[Dict[str, object]]:
+    """
+    计算各模型在全部 729 种三传与示例问题上的平均输入令牌数
+
+    Returns:
+        每个模型一项：{model, exact, full, compact, saved, saved_ratio}
+    """
+    report = []
+    for model in models:
+        counter = get_token_counter(model)
+        system_tokens = counter.count(system_prompt) if system_prompt else 0
+        totals = {}
+        for mode in PROMPT_MODES:
+            build = _MODES[mode][2]
+            tokens = [counter.count(build(prefix, question))
+                      for prefix in get_triple_prefixes(mode) for question in questions]
+            totals[mode] = sum(tokens) / len(tokens) + system_tokens
+        saved = totals["full"] - totals["compact"]
+        report.append({
+            "model": model,
+            "exact": counter.exact,
+            "full": round(totals["full"], 1),
+            "compact": round(totals["compact"], 1),
+            "saved": round(saved, 1),
+            "saved_ratio": round(saved / totals["full"], 3),
+        })
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="解读提示词令牌数对比（full / compact）")
+    parser.add_argument("--model", action="append", help="模型标识，可重复，默认全部")
+    parser.add_argument("--no-system", action="store_true", help="不计入系统提示词")
+    parser.add_argument("--show", choices=PROMPT_MODES, help="打印一个示例提示词后退出")
+    args = parser.parse_args(argv)
+
+    if args.show:
+        print(build_prompt((SYMBOLS[0], SYMBOLS[2], SYMBOLS[4]), SAMPLE_QUESTIONS[0], args.show))
+        return
+
+    system_prompt = "" if args.no_system else SYSTEM_PROMPT
+    models = args.model or list(TOKENIZERS)
+    print(f"{'模型':<26}{'full':>8}{'compact':>9}{'节省':>8}{'比例':>8}  计数方式")
+    for row in savings_report(models, system_prompt=system_prompt):
+        method = "tiktoken" if row["exact"] else "估算"
+        print(f"{row['model']:<26}{row['full']:>8.0f}{row['compact']:>9.0f}{row['saved']:>8.0f}"
+              f"{row['saved_ratio']:>8.0%}  {method}")
+
+
+if __name__ == "__main__":
+    main()
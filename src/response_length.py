@@ -0,0 +1,134 @@
+"""
+解读篇幅档位与提前结束
+
+按问题类型或用户选择确定解读篇幅：
+    brief      简短：是非类的短问题，只写结论与建议，max_tokens 400
+    standard   标准：一般问题，写卦象、时间发展与建议，max_tokens 700
+    detailed   详细：需要分析原因、趋势的长问题，沿用原有的完整解读，max_tokens 1000
+    auto       按问题自动选择（默认，可用环境变量 SIXREN_RESPONSE_LENGTH 修改）
+
+篇幅要求追加在提示词末尾（问题之后），不影响可缓存的提示词前缀。
+追问（select_follow_up_tier）只限字数，max_tokens 为同档位的一半。
+流式输出时 EarlyStop 跟踪已收到的 ### 小节：要求的小节都已出现后，模型再开始新的小节，
+或篇幅超出该档位的字数上限时，立即结束流式读取并关闭连接，不再为多余的令牌付费、等待。
+"""
+
+import os
+import re
+from typing import NamedTuple, Optional, Tuple
+
+
+class LengthTier(NamedTuple):
+    """一个篇幅档位"""
+    name: str
+    label: str
+    max_tokens: int
+    max_chars: int  # 要求的小节都已出现后，超过该字数即在段落结尾处结束
+    sections: Tuple[str, ...]  # 要求的小节标题关键词，空表示不提前结束
+    instruction: str  # 追加在提示词末尾的篇幅要求
+
+
+TIERS = {
+    "brief": LengthTier(
+        "brief", "简短", 400, 350, ("卦象分析", "建议"),
+        "\n\n【篇幅】此问简明作答即可：只写 ### 卦象分析 与 ### 具体建议 两节，合计 300 字以内。",
+    ),
+    "standard": LengthTier(
+        "standard", "标准", 700, 700, ("卦象分析", "时间发展", "建议"),
+        "\n\n【篇幅】请写 ### 卦象分析、### 时间发展、### 具体建议 三节，合计 600 字以内。",
+    ),
+    "detailed": LengthTier("detailed", "详细", 1000, 0, (), ""),
+}
+LENGTH_MODES = ("auto",) + tuple(TIERS)
+LENGTH_LABELS = {"auto": "自动", **{name: tier.label for name, tier in TIERS.items()}}
+
+_YES_NO = re.compile(r"(能不能|会不会|是不是|可不可以|行不行|好不好|要不要|该不该|有没有|是否|[吗么否]\s*[？?]?\s*$)")
+_OPEN_ENDED = re.compile(r"(如何|怎样|怎么|为什么|为何|哪些|分析|发展|趋势|前景|原因|详细)")
+
+
+def default_length_mode() -> str:
+    """环境变量 SIXREN_RESPONSE_LENGTH 指定的档位，默认 auto"""
+    mode = os.environ.get('SIXREN_RESPONSE_LENGTH', 'auto').strip().lower()
+    return mode if mode in LENGTH_MODES else 'auto'
+
+
+def classify_question(question: str) -> str:
+    """
+    按问题类型选择篇幅档位
+
+    示例:
+    >>> classify_question("明天面试能过吗？")
+    'brief'
+    >>> classify_question("这段感情接下来会如何发展？")
+    'detailed'
+    >>> classify_question("下个月搬家")
+    'standard'
+    """
+    text = question.strip()
+    if _OPEN_ENDED.search(text) or len(text) > 40:
+        return "detailed"
+    if _YES_NO.search(text) and len(text) <= 20:
+        return "brief"
+    return "standard"
+
+
+def select_tier(question: str, mode: Optional[str] = None) -> LengthTier:
+    """按用户选择的档位（auto 时按问题类型）返回篇幅档位"""
+    mode = mode or default_length_mode()
+    if mode == "auto":
+        mode = classify_question(question)
+    if mode not in TIERS:
+        raise ValueError(f"未知的篇幅档位：{mode}（可选：{', '.join(LENGTH_MODES)}）")
+    return TIERS[mode]
+
+
+# 追问的字数上限
+FOLLOW_UP_CHARS = {"brief": 150, "standard": 300, "detailed": 600}
+
+
+def select_follow_up_tier(question: str, mode: Optional[str] = None) -> LengthTier:
+    """追问的篇幅档位：不要求小节，max_tokens 减半，只在提示词中限定字数"""
+    tier = select_tier(question, mode)
+    return tier._replace(
+        max_tokens=tier.max_tokens // 2,
+        max_chars=0,
+        sections=(),
+        instruction=f"\n\n【篇幅】{FOLLOW_UP_CHARS[tier.name]} 字以内。",
+    )
+
+
+_HEADING = re.compile(r"^#{1,6}[ \t]*(.*)$", re.M)
+
+
+class EarlyStop:
+    """
+    流式输出的提前结束判断
+
+    check() 每收到一段累计文本调用一次，需要结束时返回截断后的文本，否则返回 None；
+    结束原因记录在 reason 中（extra_section / length）。
+    """
+
+    def __init__(self, tier: LengthTier):
+        self.tier = tier
+        self.reason: Optional[str] = None
+
+    def check(self, text: str) -> Optional[str]:
+        if not self.tier.sections:
+            return None
+        remaining = list(self.tier.sections)
+        complete_at = None  # 最后一个要求的小节标题行结束的位置
+        for match in _HEADING.finditer(text):
+            if complete_at is not None:
+                # 要求的小节都已出现，模型又开始新的小节
+                self.reason = "extra_section"
+                return text[:match.start()].rstrip()
+            title = match.group(1)
+            remaining = [keyword for keyword in remaining if keyword not in title]
+            if not remaining:
+                complete_at = match.end()
+        if complete_at is not None and len(text) > self.tier.max_chars:
+            cut = text.rfind("\n")
+            if cut > complete_at + 1:  # 最后一节至少保留一行内容
+                self.reason = "length"
+                return text[:cut].rstrip()
+        return None
@@ -0,0 +1,218 @@
+"""
+占卜流程的分阶段追踪
+
+设置环境变量 SIXREN_TRACE 后启用：各阶段（输入校验、笔画查询、三传计算、提示词生成、
+LLM 首字延迟、流式输出、界面渲染）记录为 Chrome trace 事件，进程退出时写入 JSON 文件，
+可用 chrome://tracing 或 https://ui.perfetto.dev 打开。
+
+    SIXREN_TRACE=1                 写入 traces/sixren-<pid>.json
+    SIXREN_TRACE=path/trace.json   写入指定文件
+
+未启用时 span() 直接返回同一个空操作对象，开销只有一次函数调用。
+同一线程内的同步阶段按调用嵌套；异步任务各自占一条轨道（tid 为任务标识），并发的占卜互不交叠。
+
+用法：
+    import tracing
+
+    with tracing.span("hand_technique.symbols", numbers=[1, 2, 3]):
+        ...
+    stage = tracing.start_span("ai.ttft", model="openai:gpt-4o")
+    ...
+    stage.end()
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+DEFAULT_TRACE_DIR = 'traces'
+MAX_EVENTS = 200_000  # 长时间运行的 Web 服务只保留最近的事件
+
+
+class _NoopSpan:
+    """追踪未启用时使用的空操作阶段"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def end(self, **args):
+        pass
+
+    def set(self, **args):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def _lane() -> int:
+    """当前异步任务（或线程）的轨道编号"""
+    asyncio = sys.modules.get('asyncio')
+    if asyncio is not None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            return id(task)
+    return threading.get_ident()
+
+
+class Span:
+    """一个计时阶段，结束时记录为 Chrome trace 的完整事件（ph = X）"""
+
+    __slots__ = ("tracer", "name", "args", "start", "lane", "done")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.lane = _lane()
+        self.done = False
+        self.start = time.perf_counter_ns()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.end()
+        return False
+
+    def set(self, **args):
+        """补充事件参数"""
+        self.args.update(args)
+
+    def end(self, **args):
+        """结束阶段；重复调用只记录第一次"""
+        if self.done:
+            return
+        self.done = True
+        finish = time.perf_counter_ns()
+        self.args.update(args)
+        self.tracer.add({
+            "name": self.name,
+            "cat": self.name.split('.', 1)[0],
+            "ph": "X",
+            "ts": (self.start - self.tracer.origin) / 1000,
+            "dur": (finish - self.start) / 1000,
+            "pid": self.tracer.pid,
+            "tid": self.lane,
+            "args": self.args,
+        })
+
+
+class Tracer:
+    """收集追踪事件并导出为 Chrome trace JSON"""
+
+    def __init__(self, path: str, max_events: int = MAX_EVENTS):
+        self.path = path
+        self.pid = os.getpid()
+        self.origin = time.perf_counter_ns()
+        self.wall_origin = time.time()
+        self.events = deque(maxlen=max_events)
+
+    def add(self, event: Dict[str, Any]):
+        self.events.append(event)
+
+    def instant(self, name: str, args: Dict[str, Any]):
+        self.add({
+            "name": name,
+            "cat": name.split('.', 1)[0],
+            "ph": "i",
+            "s": "t",
+            "ts": (time.perf_counter_ns() - self.origin) / 1000,
+            "pid": self.pid,
+            "tid": _lane(),
+            "args": args,
+        })
+
+    def export(self, path: Optional[str] = None) -> str:
+        """
+        把目前收集的事件写入 JSON 文件
+
+        Returns:
+            str: 写入的文件路径
+        """
+        path = path or self.path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        trace = {
+            "traceEvents": list(self.events),
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": self.wall_origin, "pid": self.pid},
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, ensure_ascii=False)
+        return path
+
+
+_tracer: Optional[Tracer] = None
+
+
+def _default_path() -> str:
+    return os.path.join(DEFAULT_TRACE_DIR, f"sixren-{os.getpid()}.json")
+
+
+def enable(path: Optional[str] = None) -> Tracer:
+    """启用追踪，进程退出时写入 path（默认 traces/sixren-<pid>.json）"""
+    global _tracer
+    if _tracer is None:
+        # 相对路径按启用时的工作目录解析，之后切换目录不影响输出位置
+        _tracer = Tracer(os.path.abspath(path or _default_path()))
+        atexit.register(flush)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    _tracer = None
+
+
+def is_enabled() -> bool:
+    return _tracer is not None
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, **args) -> Any:
+    """用于 with 语句的计时阶段；未启用时返回空操作对象"""
+    if _tracer is None:
+        return _NOOP
+    return Span(_tracer, name, args)
+
+
+start_span = span  # 手动结束的阶段：stage = start_span(...); ...; stage.end()
+
+
+def instant(name: str, **args):
+    """记录一个时间点事件"""
+    if _tracer is not None:
+        _tracer.instant(name, args)
+
+
+def flush(path: Optional[str] = None) -> Optional[str]:
+    """把已收集的事件写入文件，未启用时返回 None"""
+    if _tracer is None or not _tracer.events:
+        return None
+    return _tracer.export(path)
+
+
+def _enable_from_env():
+    value = os.environ.get('SIXREN_TRACE', '').strip()
+    if value and value != '0':
+        enable(None if value == '1' else value)
+
+
+_enable_from_env()
@@ -0,0 +1,181 @@
+"""
+批量八字计算引擎
+
+面向大规模出生时间队列的向量化实现，与 ganzhi / bazi_calculator 中的
+标量函数结果一致：
+- batch_charts: 四柱甲子序号矩阵 (N, 4)
+- batch_element_counts: 五行个数矩阵 (N, 5)，列顺序为木火土金水
+- missing_element_mask: 所缺五行位掩码，bit e 表示缺五行序号 e
+- batch_day_master_yang / batch_spouse_palace: 日主阴阳、配偶宫地支及类别
+- batch_analyze: 一次调用返回以上全部结果
+
+文本只在需要展示时通过 decode_* 系列函数按行生成。
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .ganzhi import (
+    DAY_PILLAR_OFFSET, DAY_TABLE_START, JIAZI_ELEMENTS, JIAZI_NAMES, PILLARS,
+    WUXING_ORDER, WUXING_COUNT_ORDER, get_day_pillar_table
+)
+from .solar_terms import (
+    EPOCH_ORDINAL, MINUTES_PER_DAY, get_solar_terms_table, month_pillar_of_term, year_pillar_of_term
+)
+
+ArrayLike = Union[np.ndarray, List[int]]
+
+# 每个甲子对五行个数的贡献 (60, 5)
+JIAZI_COUNT_VECTORS = np.zeros((60, 5), dtype=np.uint8)
+for _j, (_stem_element, _branch_element) in enumerate(JIAZI_ELEMENTS):
+    JIAZI_COUNT_VECTORS[_j, _stem_element] += 1
+    JIAZI_COUNT_VECTORS[_j, _branch_element] += 1
+
+# 同一贡献打包为 uint64，每个字节对应一种五行；四柱相加时各字节最多为 8，不会进位
+JIAZI_PACKED_COUNTS = np.zeros(60, dtype='<u8')
+JIAZI_PACKED_COUNTS.view(np.uint8).reshape(60, 8)[:, :5] = JIAZI_COUNT_VECTORS
+
+# 配偶宫地支类别：0 子午卯酉，1 辰戌丑未，2 寅申巳亥（地支序号 % 3）
+SPOUSE_PALACE_TEXTS = (
+    "配偶可能性格较为固执但忠诚",
+    "配偶可能性格温和，注重家庭",
+    "配偶可能富有冒险精神和创造力",
+)
+
+# [是否男性][日主是否为阳]
+DAY_MASTER_TEXTS = (
+    (
+        "日主阴柔，有利于女性的人际关系和家庭和谐",
+        "日主阳刚，女性可能在事业上较为顺利，但需要注意家庭平衡",
+    ),
+    (
+        "日主阴柔，男性可能需要在事业上更加努力",
+        "日主阳刚，有利于男性发展",
+    ),
+)
+
+
+# datetime64 以 1970-01-01 为 0，换算到节气表分钟计数起点的天数差
+_UNIX_EPOCH_DAYS = np.datetime64('1970-01-01', 'D').astype(object).toordinal() - EPOCH_ORDINAL
+
+
+class BaziBatch(NamedTuple):
+    """批量八字分析结果（各数组首维等长）"""
+    charts: np.ndarray  # (N, 4) uint8，年/月/日/时柱甲子序号
+    element_counts: np.ndarray  # (N, 5) uint8，木火土金水个数
+    missing_mask: np.ndarray  # (N,) uint8，所缺五行位掩码
+    day_master_yang: np.ndarray  # (N,) bool
+    spouse_branch: np.ndarray  # (N,) uint8，配偶宫地支序号
+    spouse_category: np.ndarray  # (N,) uint8，配偶宫类别
+
+
+def batch_day_numbers(years: np.ndarray, months: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """公历日期自 1900-01-01 起的天数（与节气表、日柱表的起点一致）"""
+    solar_days = (
+        (years - 1970).astype('datetime64[Y]') + (months - 1).astype('timedelta64[M]')
+    ).astype('datetime64[D]') + (days - 1).astype('timedelta64[D]')
+    return solar_days.astype(np.int64) + _UNIX_EPOCH_DAYS
+
+
+def batch_year_month_pillars(years: np.ndarray, months: np.ndarray, day_numbers: np.ndarray,
+                             hours: np.ndarray, minutes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """向量化按节气确定年柱（立春为界）与月柱（节为界），超出节气表范围的记录按公历年月近似"""
+    table = get_solar_terms_table()
+    term_minutes = np.frombuffer(table.minutes, dtype=np.uint32).astype(np.int64)
+
+    stamps = day_numbers * MINUTES_PER_DAY + hours.astype(np.int64) * 60 + minutes
+
+    index = np.searchsorted(term_minutes, stamps, side='right') - 1
+    by_years = (years - 4) % 60
+    month_branch = (months + 1) % 12
+    month_stem = (by_years % 10 * 2 + months + 1) % 10
+    by_months = (6 * month_stem - 5 * month_branch) % 60
+
+    valid = (index >= 0) & (stamps < table.end_minute)
+    return (np.where(valid, year_pillar_of_term(index), by_years),
+            np.where(valid, month_pillar_of_term(index), by_months))
+
+
+def batch_day_pillars(day_numbers: np.ndarray) -> np.ndarray:
+    """向量化查询日柱，与标量 ganzhi.day_pillar 共用同一张日柱速查表"""
+    table = np.frombuffer(get_day_pillar_table(), dtype=np.uint8)
+    index = day_numbers + (EPOCH_ORDINAL - DAY_TABLE_START)
+    inside = (index >= 0) & (index < table.size)
+    by_table = table[np.where(inside, index, 0)]
+    by_formula = (day_numbers + EPOCH_ORDINAL + DAY_PILLAR_OFFSET) % 60
+    return np.where(inside, by_table, by_formula)
+
+
+def batch_charts(years: ArrayLike, months: ArrayLike, days: ArrayLike, hours: ArrayLike,
+                 minutes: Optional[ArrayLike] = None) -> np.ndarray:
+    """向量化计算四柱甲子序号，算法与 ganzhi.compute_chart 相同"""
+    years = np.asarray(years, dtype=np.int32)
+    months = np.asarray(months, dtype=np.int32)
+    days = np.asarray(days, dtype=np.int32)
+    hours = np.asarray(hours, dtype=np.int32)
+    minutes = np.zeros_like(hours) if minutes is None else np.asarray(minutes, dtype=np.int32)
+
+    day_numbers = batch_day_numbers(years, months, days)
+
+    year_pillar, month_pillar = batch_year_month_pillars(years, months, day_numbers, hours, minutes)
+
+    day_pillar = batch_day_pillars(day_numbers)
+
+    hour_branch = (hours + 1) // 2 % 12
+    hour_stem = (day_pillar % 10 * 2 + hour_branch) % 10
+    hour_pillar = (6 * hour_stem - 5 * hour_branch) % 60
+
+    return np.stack([year_pillar, month_pillar, day_pillar, hour_pillar], axis=1).astype(np.uint8)
+
+
+def batch_element_counts(charts: np.ndarray) -> np.ndarray:
+    """五行个数矩阵 (N, 5)，列顺序为木火土金水"""
+    packed = (
+        JIAZI_PACKED_COUNTS[charts[:, 0]] + JIAZI_PACKED_COUNTS[charts[:, 1]]
+        + JIAZI_PACKED_COUNTS[charts[:, 2]] + JIAZI_PACKED_COUNTS[charts[:, 3]]
+    )
+    return packed.astype('<u8', copy=False).view(np.uint8).reshape(-1, 8)[:, :5]
+
+
+def missing_element_mask(counts: np.ndarray) -> np.ndarray:
+    """所缺五行位掩码，bit e 置位表示缺五行序号 e"""
+    weights = (1 << np.arange(5)).astype(np.uint8)
+    return ((counts == 0) * weights).sum(axis=1, dtype=np.uint8)
+
+
+def batch_day_master_yang(charts: np.ndarray) -> np.ndarray:
+    """日干是否为阳干（甲丙戊庚壬）"""
+    return charts[:, 2] % 2 == 0
+
+
+def batch_spouse_palace(charts: np.ndarray, is_male: ArrayLike) -> np.ndarray:
+    """配偶宫地支序号：男看日支，女看年支"""
+    is_male = np.asarray(is_male, dtype=bool)
+    return np.where(is_male, charts[:, 2] % 12, charts[:, 0] % 12).astype(np.uint8)
+
+
+def batch_analyze(years: ArrayLike, months: ArrayLike, days: ArrayLike, hours: ArrayLike,
+                  is_male: ArrayLike, minutes: Optional[ArrayLike] = None) -> BaziBatch:
+    """一次性计算四柱、五行个数、所缺五行、日主阴阳与配偶宫"""
+    charts = batch_charts(years, months, days, hours, minutes)
+    counts = batch_element_counts(charts)
+    spouse_branch = batch_spouse_palace(charts, is_male)
+    return BaziBatch(
+        charts=charts,
+        element_counts=counts,
+        missing_mask=missing_element_mask(counts),
+        day_master_yang=batch_day_master_yang(charts),
+        spouse_branch=spouse_branch,
+        spouse_category=spouse_branch % 3,
+    )
+
+
+def decode_bazi(chart_row: np.ndarray) -> Dict[str, str]:
+    """将一行四柱序号还原为干支字符串"""
+    return {pillar: JIAZI_NAMES[j] for pillar, j in zip(PILLARS, chart_row.tolist())}
+
+
+def decode_missing(mask: int) -> List[str]:
+    """将所缺五行位掩码还原为五行列表（按 analyze_wuxing 的输出顺序）"""
+    return [name for name in WUXING_COUNT_ORDER if mask >> WUXING_ORDER.index(name) & 1]
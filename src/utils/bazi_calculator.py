@@ -1,37 +1,12 @@
 from typing import Dict, Tuple
 from .calendar_converter import solar_to_lunar
 from .five_elements_utils import analyze_wuxing, get_wuxing
+from .ganzhi import HEAVENLY_STEMS, EARTHLY_BRANCHES, ZODIAC_ANIMALS, compute_chart, chart_to_bazi
 
-HEAVENLY_STEMS = ["甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸"]
-EARTHLY_BRANCHES = ["子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥"]
-ZODIAC_ANIMALS = ["鼠", "牛", "虎", "兔", "龙", "蛇", "马", "羊", "猴", "鸡", "狗", "猪"]
 
 def calculate_bazi(year: int, month: int, day: int, hour: int, minute: int) -> Dict[str, str]:
-    # 使用简化的八字计算方法
-    # 年柱：基于年份计算
-    year_stem_index = (year - 4) % 10
-    year_branch_index = (year - 4) % 12
-    
-    # 月柱：基于月份和年份计算
-    month_stem_index = (year_stem_index * 2 + month) % 10
-    month_branch_index = (month + 1) % 12
-    
-    # 日柱：基于日期计算（简化版）
-    day_stem_index = (year * 5 + month * 6 + day) % 10
-    day_branch_index = (year * 5 + month * 6 + day) % 12
-    
-    # 时柱：基于时辰计算
-    hour_branch_index = (hour + 1) // 2 % 12
-    hour_stem_index = (day_stem_index * 2 + hour_branch_index) % 10
-    
-    bazi = {
-        "year": f"{HEAVENLY_STEMS[year_stem_index]}{EARTHLY_BRANCHES[year_branch_index]}",
-        "month": f"{HEAVENLY_STEMS[month_stem_index]}{EARTHLY_BRANCHES[month_branch_index]}",
-        "day": f"{HEAVENLY_STEMS[day_stem_index]}{EARTHLY_BRANCHES[day_branch_index]}",
-        "time": f"{HEAVENLY_STEMS[hour_stem_index]}{EARTHLY_BRANCHES[hour_branch_index]}"
-    }
-    
-    return bazi
+    # 四柱以六十甲子序号计算，仅在此处转换为干支字符串
+    return chart_to_bazi(compute_chart(year, month, day, hour, minute))
 
 def get_chinese_year(year: int) -> str:
     stem = HEAVENLY_STEMS[(year - 4) % 10]
@@ -0,0 +1,262 @@
+"""
+八字反查：按四柱条件查找对应的公历时间段
+
+倒排索引按柱分别建立，时间统一以节气表的分钟计数（自 1900-01-01 00:00 起）表示：
+- 年柱：每个立春开始一个年柱，月柱：每个节（小寒、立春、惊蛰……）开始一个月柱，
+  均预先按甲子序号汇总为有序的分钟区间表（首个小寒之前按 compute_chart 的公历回退规则）
+- 日柱：日序按 60 日连续循环，日柱 j 对应 ordinal ≡ j - DAY_PILLAR_OFFSET (mod 60)
+- 时柱：地支决定钟点（子时为 23 点与 0 点），天干由日干按五鼠遁决定，
+  因此时柱条件同时约束日干
+
+查询先求年、月区间与查询范围的交集，再在交集内按 60 日步长枚举日柱，
+最后展开时辰，结果以生成器逐段产出。
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .ganzhi import (
+    DAY_PILLAR_OFFSET, EARTHLY_BRANCHES, HEAVENLY_STEMS, JIAZI_INDEX, JIAZI_NAMES, compute_chart
+)
+from .solar_terms import (
+    EPOCH, EPOCH_ORDINAL, LICHUN, MINUTES_PER_DAY, TERMS_PER_YEAR, get_solar_terms_table, minute_of,
+    month_pillar_of_term, year_pillar_of_term
+)
+
+Interval = Tuple[int, int]
+PillarValue = Union[str, int, None]
+
+# 时辰地支 -> 当日的钟点区间（分钟偏移），子时跨越日首与日尾
+HOUR_WINDOWS = tuple(
+    ((0, 60), (23 * 60, 24 * 60)) if branch == 0 else (((2 * branch - 1) * 60, (2 * branch + 1) * 60),)
+    for branch in range(12)
+)
+
+
+class PillarMatch(NamedTuple):
+    """一段满足条件的时间区间 [start, end)"""
+    start: datetime
+    end: datetime
+
+    @property
+    def bazi(self) -> Dict[str, str]:
+        """区间内任一时刻的四柱（区间内四柱相同）"""
+        t = self.start
+        return dict(zip(("year", "month", "day", "time"),
+                        (JIAZI_NAMES[j] for j in compute_chart(t.year, t.month, t.day, t.hour, t.minute))))
+
+
+def parse_pillar(value: PillarValue) -> Optional[FrozenSet[int]]:
+    """
+    将柱条件解析为允许的甲子序号集合
+
+    支持完整干支（"甲子"）、单个天干（"甲"）、单个地支（"午"）或甲子序号；
+    None 表示不限。
+
+    示例:
+    >>> sorted(parse_pillar("甲子"))
+    [0]
+    >>> sorted(parse_pillar("午"))
+    [6, 18, 30, 42, 54]
+    >>> len(parse_pillar("甲"))
+    6
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        if not 0 <= value < 60:
+            raise ValueError(f"甲子序号应在 0-59 之间：{value}")
+        return frozenset((value,))
+    value = value.strip()
+    if value in JIAZI_INDEX:
+        return frozenset((JIAZI_INDEX[value],))
+    if value in HEAVENLY_STEMS:
+        stem = HEAVENLY_STEMS.index(value)
+        return frozenset(j for j in range(60) if j % 10 == stem)
+    if value in EARTHLY_BRANCHES:
+        branch = EARTHLY_BRANCHES.index(value)
+        return frozenset(j for j in range(60) if j % 12 == branch)
+    raise ValueError(f"无法识别的干支：{value}")
+
+
+def _merge(intervals: List[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _intersect(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    result, i, j = [], 0, 0
+    while i < len(a) and j < len(b):
+        start, end = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+class PillarIndex:
+    """四柱倒排索引，覆盖节气表的时间范围 [1900-01-01, 2101-01-01)"""
+
+    def __init__(self):
+        table = get_solar_terms_table()
+        self.start_minute = 0
+        self.end_minute = table.end_minute
+
+        # 年柱 / 月柱 -> 有序分钟区间：年柱自每个立春、月柱自每个节换柱，
+        # 首个小寒之前按 compute_chart 的回退规则确定
+        head_year, head_month = compute_chart(EPOCH.year, EPOCH.month, EPOCH.day, 0)[:2]
+        term_count = len(table.minutes)
+        self.year_intervals_by_pillar = self._split_by_terms(
+            head_year, [0, *range(LICHUN, term_count, TERMS_PER_YEAR)], year_pillar_of_term
+        )
+        self.month_intervals = self._split_by_terms(head_month, range(0, term_count, 2), month_pillar_of_term)
+
+    def _split_by_terms(self, head_pillar: int, term_indexes: Iterable[int],
+                        pillar_of_term: Callable[[int], int]) -> Dict[int, List[Interval]]:
+        """按节气切分时间轴：每段自 term_indexes 中的一个节气开始，柱为 pillar_of_term(节气序号)"""
+        minutes = get_solar_terms_table().minutes
+        bounds = [(self.start_minute, head_pillar)]
+        bounds += [(minutes[index], pillar_of_term(index)) for index in term_indexes]
+        bounds.append((self.end_minute, None))
+
+        intervals: Dict[int, List[Interval]] = {j: [] for j in range(60)}
+        for (start, pillar), (end, _) in zip(bounds, bounds[1:]):
+            if start < end:
+                intervals[pillar].append((start, end))
+        return intervals
+
+    def year_intervals(self, pillars: Optional[FrozenSet[int]]) -> List[Interval]:
+        """年柱条件对应的立春区间"""
+        if pillars is None:
+            return [(self.start_minute, self.end_minute)]
+        return _merge([interval for j in pillars for interval in self.year_intervals_by_pillar[j]])
+
+    def month_intervals_for(self, pillars: Optional[FrozenSet[int]]) -> List[Interval]:
+        """月柱条件对应的节气区间"""
+        if pillars is None:
+            return [(self.start_minute, self.end_minute)]
+        return _merge([interval for j in pillars for interval in self.month_intervals[j]])
+
+    def search(self, year: PillarValue = None, month: PillarValue = None, day: PillarValue = None,
+               time: PillarValue = None, start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> Iterator[PillarMatch]:
+        """
+        查找四柱满足条件的时间段
+
+        Args:
+            year / month / day / time: 各柱条件，可为完整干支、单个天干或地支，None 表示不限
+            start: 查询起点（含），默认为索引起点
+            end: 查询终点（不含），默认为索引终点
+
+        Yields:
+            PillarMatch: 按时间顺序排列、互不重叠的时间段
+        """
+        year_set, month_set = parse_pillar(year), parse_pillar(month)
+        day_set, time_set = parse_pillar(day), parse_pillar(time)
+
+        lo = self.start_minute if start is None else max(minute_of(start), self.start_minute)
+        hi = self.end_minute if end is None else min(minute_of(end), self.end_minute)
+        if lo >= hi:
+            return
+
+        spans = _intersect(self.year_intervals(year_set), self.month_intervals_for(month_set))
+        spans = _intersect(spans, [(lo, hi)])
+
+        # 时柱地支 -> 允许的日干（五鼠遁：时干 = 日干 * 2 + 时支）
+        hour_rules: Optional[Dict[int, FrozenSet[int]]] = None
+        if time_set is not None:
+            hour_rules = {}
+            for j in time_set:
+                stem, branch = j % 10, j % 12
+                day_stems = frozenset(s for s in range(10) if (s * 2 + branch) % 10 == stem)
+                hour_rules[branch] = hour_rules.get(branch, frozenset()) | day_stems
+
+        # 满足日柱条件的日序余数（mod 60）
+        day_residues = None if day_set is None else sorted(
+            (j - DAY_PILLAR_OFFSET) % 60 for j in day_set
+        )
+
+        for span_start, span_end in spans:
+            yield from self._search_span(span_start, span_end, day_residues, hour_rules)
+
+    def _search_span(self, span_start: int, span_end: int, day_residues: Optional[List[int]],
+                     hour_rules: Optional[Dict[int, FrozenSet[int]]]) -> Iterator[PillarMatch]:
+        first_day = span_start // MINUTES_PER_DAY
+        last_day = (span_end - 1) // MINUTES_PER_DAY
+
+        pending: Optional[Interval] = None
+        for day_number in self._iter_days(first_day, last_day, day_residues):
+            day_start = day_number * MINUTES_PER_DAY
+            if hour_rules is None:
+                windows = [(0, MINUTES_PER_DAY)]
+            else:
+                day_stem = (day_number + EPOCH_ORDINAL + DAY_PILLAR_OFFSET) % 10
+                windows = sorted(
+                    window
+                    for branch, stems in hour_rules.items() if day_stem in stems
+                    for window in HOUR_WINDOWS[branch]
+                )
+            for offset_start, offset_end in windows:
+                start = max(day_start + offset_start, span_start)
+                end = min(day_start + offset_end, span_end)
+                if start >= end:
+                    continue
+                # 相邻区间合并为一段（如不限时柱时的连续多日）
+                if pending and pending[1] == start:
+                    pending = (pending[0], end)
+                    continue
+                if pending:
+                    yield self._match(pending)
+                pending = (start, end)
+        if pending:
+            yield self._match(pending)
+
+    @staticmethod
+    def _iter_days(first_day: int, last_day: int, residues: Optional[List[int]]) -> Iterator[int]:
+        if residues is None:
+            yield from range(first_day, last_day + 1)
+            return
+        base = first_day - (first_day + EPOCH_ORDINAL) % 60
+        for cycle_start in range(base, last_day + 1, 60):
+            for residue in residues:
+                day_number = cycle_start + residue
+                if first_day <= day_number <= last_day:
+                    yield day_number
+
+    @staticmethod
+    def _match(interval: Interval) -> PillarMatch:
+        return PillarMatch(EPOCH + timedelta(minutes=interval[0]), EPOCH + timedelta(minutes=interval[1]))
+
+
+_index: Optional[PillarIndex] = None
+
+
+def get_pillar_index() -> PillarIndex:
+    """获取全局四柱倒排索引（首次调用时建立）"""
+    global _index
+    if _index is None:
+        _index = PillarIndex()
+    return _index
+
+
+def search_bazi(year: PillarValue = None, month: PillarValue = None, day: PillarValue = None,
+                time: PillarValue = None, start: Optional[datetime] = None,
+                end: Optional[datetime] = None) -> Iterator[PillarMatch]:
+    """
+    按四柱条件反查公历时间段
+
+    示例:
+    >>> matches = search_bazi(day="甲子", time="午", start=datetime(2024, 1, 1), end=datetime(2025, 1, 1))
+    >>> [(m.start.strftime("%Y-%m-%d %H:%M"), m.end.strftime("%H:%M")) for m in matches][:2]
+    [('2024-01-01 11:00', '13:00'), ('2024-03-01 11:00', '13:00')]
+    """
+    return get_pillar_index().search(year, month, day, time, start, end)
@@ -0,0 +1,241 @@
+"""
+八字合婚匹配引擎
+
+两人的合婚分数（0-100）由四部分组成，均只依赖少量整数特征：
+- 日主天干（30 分）：天干五合 30，五行相生 20，比和 12，相克 0
+- 配偶宫地支（25 分）：六合 25，三合 20，同支 10，六害 2，六冲 0，其余 8
+- 年支生肖（20 分）：六合 20，三合 16，同支 8，六害 2，六冲 0，其余 6
+- 五行互补（25 分）：一方所缺而另一方具备的五行，每个 5 分，最多 25 分
+
+日主天干与配偶宫合并为一个特征码（10×12），年支与所缺五行掩码合并为另一个
+特征码（12×32），任意两人的分数 = 两张预计算查表之和。因此 N×N 分数矩阵
+只需两次广播查表；top-k 查询按行分块计算，不生成完整矩阵。
+"""
+
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from .bazi_batch import BaziBatch, batch_analyze
+from .ganzhi import EARTHLY_BRANCHES, HEAVENLY_STEMS, STEM_ELEMENT, WUXING_ORDER
+
+ArrayLike = Union[np.ndarray, List[int]]
+
+# 日主天干、五行互补满分
+STEM_POINTS = 30
+COMPLEMENT_POINTS = 25
+COMPLEMENT_PER_ELEMENT = 5
+
+# 配偶宫 / 年支的地支关系得分：(六合, 三合, 同支, 六害, 六冲, 其余)
+SPOUSE_RELATION_SCORES = (25, 20, 10, 2, 0, 8)
+ZODIAC_RELATION_SCORES = (20, 16, 8, 2, 0, 6)
+
+_MASK_VALUES = 32  # 五行缺失掩码取值数
+
+
+def stem_score(stem_a: int, stem_b: int) -> int:
+    """日主天干得分：五合 > 相生 > 比和 > 相克"""
+    if abs(stem_a - stem_b) == 5:
+        return STEM_POINTS
+    element_a, element_b = STEM_ELEMENT[stem_a], STEM_ELEMENT[stem_b]
+    if element_a == element_b:
+        return 12
+    if (element_a - element_b) % 5 in (1, 4):
+        return 20
+    return 0
+
+
+def branch_relation(branch_a: int, branch_b: int) -> int:
+    """地支关系编号：0 六合，1 三合，2 同支，3 六害，4 六冲，5 其余"""
+    if branch_a == branch_b:
+        return 2
+    if (branch_a + branch_b) % 12 == 1:
+        return 0
+    if (branch_a - branch_b) % 12 == 6:
+        return 4
+    if (branch_a + branch_b) % 12 == 7:
+        return 3
+    if branch_a % 4 == branch_b % 4:
+        return 1
+    return 5
+
+
+def complement_score(missing_a: int, missing_b: int) -> int:
+    """五行互补得分：一方缺而另一方不缺的五行个数 × 5"""
+    supplied = (missing_a & ~missing_b) | (missing_b & ~missing_a)
+    return min(bin(supplied & 0x1F).count('1') * COMPLEMENT_PER_ELEMENT, COMPLEMENT_POINTS)
+
+
+def _build_tables() -> Tuple[np.ndarray, np.ndarray]:
+    # 特征码一：日干 * 12 + 配偶宫地支
+    palace = np.zeros((120, 120), dtype=np.uint8)
+    for a in range(120):
+        for b in range(120):
+            palace[a, b] = (stem_score(a // 12, b // 12)
+                            + SPOUSE_RELATION_SCORES[branch_relation(a % 12, b % 12)])
+    # 特征码二：年支 * 32 + 所缺五行掩码
+    zodiac = np.zeros((12 * _MASK_VALUES, 12 * _MASK_VALUES), dtype=np.uint8)
+    for a in range(12 * _MASK_VALUES):
+        for b in range(12 * _MASK_VALUES):
+            zodiac[a, b] = (ZODIAC_RELATION_SCORES[branch_relation(a // _MASK_VALUES, b // _MASK_VALUES)]
+                            + complement_score(a % _MASK_VALUES, b % _MASK_VALUES))
+    return palace, zodiac
+
+
+_tables: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+
+def get_score_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """两张特征码分数查表（首次调用时生成）"""
+    global _tables
+    if _tables is None:
+        _tables = _build_tables()
+    return _tables
+
+
+class CompatibilityProfiles(NamedTuple):
+    """合婚特征（各数组首维等长）"""
+    palace_code: np.ndarray  # (N,) uint8，日干 * 12 + 配偶宫地支
+    zodiac_code: np.ndarray  # (N,) uint16，年支 * 32 + 所缺五行掩码
+    is_male: np.ndarray  # (N,) bool
+
+    def __len__(self) -> int:
+        return len(self.palace_code)
+
+    def take(self, index: Union[slice, np.ndarray]) -> 'CompatibilityProfiles':
+        return CompatibilityProfiles(self.palace_code[index], self.zodiac_code[index], self.is_male[index])
+
+
+def profiles_from_batch(result: BaziBatch, is_male: ArrayLike) -> CompatibilityProfiles:
+    """由批量八字结果提取合婚特征"""
+    charts = result.charts
+    palace_code = (charts[:, 2] % 10) * 12 + result.spouse_branch
+    zodiac_code = (charts[:, 0] % 12).astype(np.uint16) * _MASK_VALUES + result.missing_mask
+    return CompatibilityProfiles(
+        palace_code=palace_code.astype(np.uint8),
+        zodiac_code=zodiac_code.astype(np.uint16),
+        is_male=np.asarray(is_male, dtype=bool),
+    )
+
+
+def build_profiles(years: ArrayLike, months: ArrayLike, days: ArrayLike, hours: ArrayLike,
+                   is_male: ArrayLike, minutes: Optional[ArrayLike] = None) -> CompatibilityProfiles:
+    """由出生时间直接计算合婚特征"""
+    return profiles_from_batch(batch_analyze(years, months, days, hours, is_male, minutes), is_male)
+
+
+def score_block(rows: CompatibilityProfiles, cols: CompatibilityProfiles) -> np.ndarray:
+    """rows × cols 的分数矩阵块 (len(rows), len(cols))，uint8"""
+    palace, zodiac = get_score_tables()
+    return (palace[rows.palace_code[:, None], cols.palace_code[None, :]]
+            + zodiac[rows.zodiac_code[:, None], cols.zodiac_code[None, :]])
+
+
+def compatibility_matrix(profiles: CompatibilityProfiles,
+                         others: Optional[CompatibilityProfiles] = None) -> np.ndarray:
+    """
+    完整分数矩阵
+
+    Args:
+        profiles: 行方特征
+        others: 列方特征，缺省时为同一组人（N×N，对称矩阵）
+
+    Returns:
+        np.ndarray: 分数矩阵，uint8
+    """
+    return score_block(profiles, profiles if others is None else others)
+
+
+def iter_score_blocks(profiles: CompatibilityProfiles, others: Optional[CompatibilityProfiles] = None,
+                      block_rows: int = 1024) -> Iterator[Tuple[int, np.ndarray]]:
+    """按行分块流式生成分数矩阵，产出 (起始行号, 分数块)"""
+    others = profiles if others is None else others
+    for start in range(0, len(profiles), block_rows):
+        stop = min(start + block_rows, len(profiles))
+        yield start, score_block(profiles.take(slice(start, stop)), others)
+
+
+def save_matrix(path: str, profiles: CompatibilityProfiles,
+                others: Optional[CompatibilityProfiles] = None, block_rows: int = 1024) -> str:
+    """分块写出分数矩阵到 .npy 文件（内存映射），适用于无法整体放入内存的大 N"""
+    others = profiles if others is None else others
+    out = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=(len(profiles), len(others)))
+    for start, block in iter_score_blocks(profiles, others, block_rows):
+        out[start:start + len(block)] = block
+    out.flush()
+    del out
+    return path
+
+
+def top_matches(profiles: CompatibilityProfiles, k: int = 10,
+                others: Optional[CompatibilityProfiles] = None, opposite_gender: bool = False,
+                block_rows: int = 1024) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    为每个人查找分数最高的 k 个匹配对象，按行分块计算，不生成完整矩阵
+
+    Args:
+        profiles: 待匹配的人
+        k: 每人返回的匹配数
+        others: 候选人，缺省时在同一组内匹配（排除本人）
+        opposite_gender: 是否只匹配异性
+        block_rows: 每块行数，内存占用约为 block_rows × 候选人数 × 16 字节
+
+    Yields:
+        (行号, 候选人下标数组, 分数数组)，分数从高到低，同分按下标升序
+    """
+    same_group = others is None
+    others = profiles if same_group else others
+    k = min(k, len(others) - (1 if same_group else 0))
+    if k <= 0:
+        return
+
+    for start, block in iter_score_blocks(profiles, others, block_rows):
+        scores = block.astype(np.int16)
+        rows = np.arange(len(block))
+        if same_group:
+            scores[rows, start + rows] = -1
+        if opposite_gender:
+            row_male = profiles.is_male[start:start + len(block)]
+            scores[row_male[:, None] == others.is_male[None, :]] = -1
+
+        # 以下标倒序作为次键，保证同分时按下标升序、结果稳定
+        keys = scores.astype(np.int32) * len(others) + (len(others) - 1 - np.arange(len(others)))
+        candidates = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(keys, candidates, axis=1), axis=1)
+        best = np.take_along_axis(candidates, order, axis=1)
+        best_scores = np.take_along_axis(scores, best, axis=1)
+
+        for i in range(len(block)):
+            valid = best_scores[i] >= 0
+            yield start + i, best[i][valid], best_scores[i][valid]
+
+
+def pair_breakdown(profiles: CompatibilityProfiles, a: int, b: int,
+                   others: Optional[CompatibilityProfiles] = None) -> Dict[str, object]:
+    """单对匹配的分项说明，用于展示"""
+    others = profiles if others is None else others
+    code_a, code_b = int(profiles.palace_code[a]), int(others.palace_code[b])
+    zodiac_a, zodiac_b = int(profiles.zodiac_code[a]), int(others.zodiac_code[b])
+    relation_names = ("六合", "三合", "同支", "六害", "六冲", "无特殊关系")
+
+    stem = stem_score(code_a // 12, code_b // 12)
+    spouse_relation = branch_relation(code_a % 12, code_b % 12)
+    zodiac_relation = branch_relation(zodiac_a // _MASK_VALUES, zodiac_b // _MASK_VALUES)
+    complement = complement_score(zodiac_a % _MASK_VALUES, zodiac_b % _MASK_VALUES)
+    spouse = SPOUSE_RELATION_SCORES[spouse_relation]
+    zodiac = ZODIAC_RELATION_SCORES[zodiac_relation]
+
+    return {
+        "day_masters": (
+            HEAVENLY_STEMS[code_a // 12] + WUXING_ORDER[STEM_ELEMENT[code_a // 12]],
+            HEAVENLY_STEMS[code_b // 12] + WUXING_ORDER[STEM_ELEMENT[code_b // 12]],
+        ),
+        "stem_score": stem,
+        "spouse_palaces": (EARTHLY_BRANCHES[code_a % 12], EARTHLY_BRANCHES[code_b % 12]),
+        "spouse_relation": relation_names[spouse_relation],
+        "spouse_score": spouse,
+        "zodiac_relation": relation_names[zodiac_relation],
+        "zodiac_score": zodiac,
+        "complement_score": complement,
+        "total": stem + spouse + zodiac + complement,
+    }
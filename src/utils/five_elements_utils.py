@@ -1,13 +1,6 @@
 from typing import Dict, List, Tuple, Any
 from five_elements import FIVE_ELEMENTS
-
-WUXING = {
-    '甲': '木', '乙': '木', '丙': '火', '丁': '火', '戊': '土',
-    '己': '土', '庚': '金', '辛': '金', '壬': '水', '癸': '水',
-    '子': '水', '丑': '土', '寅': '木', '卯': '木', '辰': '土',
-    '巳': '火', '午': '火', '未': '土', '申': '金', '酉': '金',
-    '戌': '土', '亥': '水'
-}
+from .ganzhi import WUXING, bazi_to_chart, analyze_chart
 
 DETAILED_WUXING = {
     "己子": "壁上土", "己丑": "壁上土",
@@ -39,39 +32,11 @@ def build_orders():
 
 GENERATION_ORDER, OVERCOMING_ORDER = build_orders()
 
-# 添加这个打印语句来检查顺序是否正确
-print(f"Generation Order: {GENERATION_ORDER}")
-print(f"Overcoming Order: {OVERCOMING_ORDER}")
-
 def get_wuxing(stem_branch: str) -> Tuple[str, str]:
     return WUXING[stem_branch[0]], WUXING[stem_branch[1]]
 
 def analyze_wuxing(bazi: Dict[str, str]) -> Dict[str, Any]:
-    wuxing_count = {"金": 0, "木": 0, "水": 0, "火": 0, "土": 0}
-    for pillar in bazi.values():
-        wuxing_count[WUXING[pillar[0]]] += 1
-        wuxing_count[WUXING[pillar[1]]] += 1
-    
-    day_wuxing = WUXING[bazi['day'][0]]
-    
-    wuxing_order = ["木", "火", "土", "金", "水"]
-    
-    day_index = wuxing_order.index(day_wuxing)
-    helping_wuxing = [day_wuxing, wuxing_order[(day_index - 1) % 5]]
-    weakening_wuxing = [
-        wuxing_order[(day_index + 1) % 5],
-        wuxing_order[(day_index + 2) % 5],
-        day_wuxing
-    ]
-    
-    missing = [w for w, count in wuxing_count.items() if count == 0]
-    
-    return {
-        "wuxing_count": wuxing_count,
-        "helping_wuxing": helping_wuxing,
-        "weakening_wuxing": weakening_wuxing,
-        "missing": missing
-    }
+    return analyze_chart(bazi_to_chart(bazi))
 
 def analyze_missing_wuxing(missing_wuxing: List[str], gender: str) -> str:
     impacts = []
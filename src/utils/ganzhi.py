@@ -0,0 +1,156 @@
+"""
+干支整数编码核心
+
+每一柱以六十甲子序号（0-59）表示，整张八字为四个小整数 (年, 月, 日, 时)。
+天干、地支、五行均使用预计算的整数表，字符串只在展示层生成。
+
+    六十甲子序号 j：天干 = j % 10，地支 = j % 12
+    五行序号按相生顺序：0木 1火 2土 3金 4水
+"""
+
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Any
+
+from .solar_terms import pillars_at
+
+HEAVENLY_STEMS = ["甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸"]
+EARTHLY_BRANCHES = ["子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥"]
+ZODIAC_ANIMALS = ["鼠", "牛", "虎", "兔", "龙", "蛇", "马", "羊", "猴", "鸡", "狗", "猪"]
+
+# 五行相生顺序，同时作为五行序号
+WUXING_ORDER = ["木", "火", "土", "金", "水"]
+# 五行计数的输出顺序（与原 analyze_wuxing 保持一致）
+WUXING_COUNT_ORDER = ["金", "木", "水", "火", "土"]
+_COUNT_ORDER_ELEMENTS = tuple(WUXING_ORDER.index(name) for name in WUXING_COUNT_ORDER)
+
+PILLARS = ("year", "month", "day", "time")
+
+STEM_ELEMENT = (0, 0, 1, 1, 2, 2, 3, 3, 4, 4)
+BRANCH_ELEMENT = (4, 2, 0, 0, 2, 1, 1, 2, 3, 3, 2, 4)
+
+WUXING = {
+    **{stem: WUXING_ORDER[STEM_ELEMENT[i]] for i, stem in enumerate(HEAVENLY_STEMS)},
+    **{branch: WUXING_ORDER[BRANCH_ELEMENT[i]] for i, branch in enumerate(EARTHLY_BRANCHES)},
+}
+
+JIAZI_NAMES = tuple(HEAVENLY_STEMS[j % 10] + EARTHLY_BRANCHES[j % 12] for j in range(60))
+JIAZI_INDEX = {name: j for j, name in enumerate(JIAZI_NAMES)}
+# 每个甲子的 (天干五行, 地支五行)
+JIAZI_ELEMENTS = tuple((STEM_ELEMENT[j % 10], BRANCH_ELEMENT[j % 12]) for j in range(60))
+
+# 日主五行 -> 帮扶（同我者、生我者）/ 克泄耗（我生者、我克者、同类耗泄）
+HELPING_ELEMENTS = tuple((e, (e - 1) % 5) for e in range(5))
+WEAKENING_ELEMENTS = tuple(((e + 1) % 5, (e + 2) % 5, e) for e in range(5))
+
+Chart = Tuple[int, int, int, int]
+
+# 日柱按儒略日数连续循环：日柱序号 = (JDN + 49) % 60，而 date.toordinal() = JDN - 1721425
+DAY_PILLAR_OFFSET = (1721425 + 49) % 60
+# 日柱速查表覆盖的公历范围 [1900-01-01, 2101-01-01)
+DAY_TABLE_START = date(1900, 1, 1).toordinal()
+DAY_TABLE_END = date(2101, 1, 1).toordinal()
+
+_day_pillars: Optional[bytes] = None
+
+
+def jiazi(stem: int, branch: int) -> int:
+    """由天干序号和地支序号求六十甲子序号（两者奇偶必须相同）"""
+    return (6 * stem - 5 * branch) % 60
+
+
+def get_day_pillar_table() -> bytes:
+    """日序 -> 日柱甲子序号的速查表（首次调用时生成），下标为 ordinal - DAY_TABLE_START"""
+    global _day_pillars
+    if _day_pillars is None:
+        _day_pillars = bytes(
+            (ordinal + DAY_PILLAR_OFFSET) % 60 for ordinal in range(DAY_TABLE_START, DAY_TABLE_END)
+        )
+    return _day_pillars
+
+
+def day_pillar_of(ordinal: int) -> int:
+    """按公历日序（date.toordinal()）查询日柱甲子序号"""
+    if DAY_TABLE_START <= ordinal < DAY_TABLE_END:
+        return get_day_pillar_table()[ordinal - DAY_TABLE_START]
+    return (ordinal + DAY_PILLAR_OFFSET) % 60
+
+
+def day_pillar(year: int, month: int, day: int) -> int:
+    """
+    公历日期的日柱甲子序号
+
+    示例:
+    >>> JIAZI_NAMES[day_pillar(1900, 1, 1)]
+    '甲戌'
+    >>> JIAZI_NAMES[day_pillar(1949, 10, 1)]
+    '甲子'
+    >>> JIAZI_NAMES[day_pillar(2000, 1, 1)]
+    '戊午'
+    >>> JIAZI_NAMES[day_pillar(2024, 2, 10)]
+    '甲辰'
+    """
+    return day_pillar_of(date(year, month, day).toordinal())
+
+
+def compute_chart(year: int, month: int, day: int, hour: int, minute: int = 0) -> Chart:
+    """
+    计算八字的四柱甲子序号
+
+    Returns:
+        Chart: (年柱, 月柱, 日柱, 时柱) 的六十甲子序号
+    """
+    # 年柱与月柱：按节气表二分查找，年柱以立春为界、月柱以节为界；
+    # 超出节气表范围时年柱按公历年份，月柱按公历月份起寅，五虎遁推月干
+    pillars = pillars_at(year, month, day, hour, minute)
+    if pillars is not None:
+        year_pillar, month_pillar = pillars
+    else:
+        year_pillar = (year - 4) % 60
+        month_branch = (month + 1) % 12
+        month_stem = (year_pillar % 10 * 2 + month + 1) % 10
+        month_pillar = jiazi(month_stem, month_branch)
+
+    # 日柱：按日序查六十甲子连续循环
+    day_pillar_index = day_pillar(year, month, day)
+
+    # 时柱：地支按时辰，天干按五鼠遁由日干推出
+    hour_branch = (hour + 1) // 2 % 12
+    hour_stem = (day_pillar_index % 10 * 2 + hour_branch) % 10
+    hour_pillar = jiazi(hour_stem, hour_branch)
+
+    return year_pillar, month_pillar, day_pillar_index, hour_pillar
+
+
+def chart_to_bazi(chart: Chart) -> Dict[str, str]:
+    """将四柱序号转换为展示用的干支字符串"""
+    return {pillar: JIAZI_NAMES[j] for pillar, j in zip(PILLARS, chart)}
+
+
+def bazi_to_chart(bazi: Dict[str, str]) -> Chart:
+    """将干支字符串形式的八字解析为四柱序号"""
+    return tuple(JIAZI_INDEX[bazi[pillar]] for pillar in PILLARS)
+
+
+def element_counts(chart: Chart) -> List[int]:
+    """统计八字中五行个数，按五行序号（木火土金水）返回"""
+    counts = [0, 0, 0, 0, 0]
+    for j in chart:
+        stem_element, branch_element = JIAZI_ELEMENTS[j]
+        counts[stem_element] += 1
+        counts[branch_element] += 1
+    return counts
+
+
+def analyze_chart(chart: Chart) -> Dict[str, Any]:
+    """基于四柱序号分析五行个数、帮扶与克泄耗五行及所缺五行"""
+    counts = element_counts(chart)
+    day_element = STEM_ELEMENT[chart[2] % 10]
+
+    wuxing_count = {name: counts[e] for name, e in zip(WUXING_COUNT_ORDER, _COUNT_ORDER_ELEMENTS)}
+
+    return {
+        "wuxing_count": wuxing_count,
+        "helping_wuxing": [WUXING_ORDER[e] for e in HELPING_ELEMENTS[day_element]],
+        "weakening_wuxing": [WUXING_ORDER[e] for e in WEAKENING_ELEMENTS[day_element]],
+        "missing": [name for name, count in wuxing_count.items() if count == 0]
+    }
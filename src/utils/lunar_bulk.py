@@ -0,0 +1,142 @@
+"""
+批量公历转农历
+
+基于农历速查表（lunar_table）的批量接口：
+- iter_solar_to_lunar: 逐日流式生成，不依赖 NumPy
+- solar_to_lunar_arrays / solar_range_to_lunar: 一次调用返回农历年、月、日、闰月标志数组
+- iter_lunar_chunks: 按块流式生成列数组，用于导出大范围日期
+- export_lunar_csv / export_lunar_npz: 以列式写出，不为每一行构造 Python 对象
+"""
+
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Tuple, Union
+
+import numpy as np
+
+from .lunar_table import (
+    BASE_YEAR, DAY_MASK, LEAP_SHIFT, MONTH_MASK, MONTH_SHIFT, YEAR_MASK, YEAR_SHIFT,
+    get_lunar_table, unpack_record,
+)
+
+# datetime64[D] 以 1970-01-01 为 0，与 date.toordinal() 的差值
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+DateLike = Union[date, str, np.datetime64]
+
+
+class LunarColumns(NamedTuple):
+    """农历列数组（各列等长）"""
+    solar_date: np.ndarray  # datetime64[D]
+    lunar_year: np.ndarray  # uint16
+    lunar_month: np.ndarray  # uint8
+    lunar_day: np.ndarray  # uint8
+    is_leap: np.ndarray  # bool
+
+
+def _table_array() -> Tuple[np.ndarray, int]:
+    """以 NumPy 视图访问 mmap 中的速查表记录（零拷贝）"""
+    table = get_lunar_table()
+    return np.frombuffer(table.records, dtype=np.uint32), table.start_ordinal
+
+
+def _to_datetime64(value: DateLike) -> np.datetime64:
+    return np.datetime64(value, 'D')
+
+
+def iter_solar_to_lunar(start: date, end: date) -> Iterator[Tuple[date, Tuple[int, int, int, bool]]]:
+    """
+    逐日流式转换 [start, end] 闭区间内的公历日期
+
+    Yields:
+        (公历日期, (农历年, 月, 日, 是否闰月))
+    """
+    table = get_lunar_table()
+    first, last = start.toordinal(), end.toordinal()
+    if first not in table or last not in table:
+        raise ValueError(f"日期超出农历速查表范围：{start} ~ {end}")
+
+    current = start
+    records = table.records
+    offset = first - table.start_ordinal
+    for index in range(offset, offset + last - first + 1):
+        yield current, unpack_record(records[index])
+        current += timedelta(days=1)
+
+
+def solar_to_lunar_arrays(dates: Union[np.ndarray, Iterable[DateLike]]) -> LunarColumns:
+    """
+    批量转换任意公历日期数组
+
+    Args:
+        dates: datetime64 数组，或可转换为 datetime64[D] 的日期序列
+
+    Returns:
+        LunarColumns: 农历列数组
+    """
+    solar = np.asarray(dates, dtype='datetime64[D]')
+    records, start_ordinal = _table_array()
+
+    index = solar.astype(np.int64) + (EPOCH_ORDINAL - start_ordinal)
+    if index.size and (index.min() < 0 or index.max() >= records.size):
+        raise ValueError("日期超出农历速查表范围")
+
+    selected = records[index]
+    return LunarColumns(
+        solar_date=solar,
+        lunar_year=((selected >> YEAR_SHIFT) & YEAR_MASK).astype(np.uint16) + BASE_YEAR,
+        lunar_month=((selected >> MONTH_SHIFT) & MONTH_MASK).astype(np.uint8),
+        lunar_day=(selected & DAY_MASK).astype(np.uint8),
+        is_leap=((selected >> LEAP_SHIFT) & 1).astype(bool),
+    )
+
+
+def solar_range_to_lunar(start: DateLike, end: DateLike) -> LunarColumns:
+    """批量转换 [start, end] 闭区间内的每一天"""
+    first, last = _to_datetime64(start), _to_datetime64(end)
+    return solar_to_lunar_arrays(np.arange(first, last + 1, dtype='datetime64[D]'))
+
+
+def iter_lunar_chunks(start: DateLike, end: DateLike, chunk_days: int = 3660) -> Iterator[LunarColumns]:
+    """按块流式转换 [start, end] 闭区间，每块最多 chunk_days 天，内存占用有界"""
+    first, last = _to_datetime64(start), _to_datetime64(end)
+    step = np.timedelta64(chunk_days, 'D')
+    while first <= last:
+        chunk_end = min(first + step - 1, last)
+        yield solar_range_to_lunar(first, chunk_end)
+        first = chunk_end + 1
+
+
+def export_lunar_csv(path: Union[str, Path], chunks: Iterable[LunarColumns]) -> Path:
+    """将农历列数组按块写出为 CSV"""
+    path = Path(path)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write("solar_date,lunar_year,lunar_month,lunar_day,is_leap\n")
+        for columns in chunks:
+            solar = columns.solar_date
+            months = solar.astype('datetime64[M]')
+            matrix = np.column_stack([
+                solar.astype('datetime64[Y]').astype(np.int64) + 1970,
+                months.astype(np.int64) % 12 + 1,
+                (solar - months).astype(np.int64) + 1,
+                columns.lunar_year,
+                columns.lunar_month,
+                columns.lunar_day,
+                columns.is_leap,
+            ])
+            np.savetxt(f, matrix, fmt='%04d-%02d-%02d,%d,%d,%d,%d')
+    return path
+
+
+def export_lunar_npz(path: Union[str, Path], chunks: Iterable[LunarColumns]) -> Path:
+    """将农历列数组合并后以列式 .npz 写出（每列一个数组）"""
+    chunks = list(chunks)
+    columns = {
+        field: np.concatenate([getattr(chunk, field) for chunk in chunks])
+        for field in LunarColumns._fields
+    }
+    path = Path(path)
+    if path.suffix != '.npz':
+        path = path.with_name(path.name + '.npz')
+    np.savez_compressed(path, **columns)
+    return path
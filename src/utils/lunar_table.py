@@ -0,0 +1,169 @@
+"""
+农历速查表
+
+将 lunardate 支持范围内（公历 1900-01-31 起，至农历 2099 年末）的每一天
+预先换算为农历，按天序号存入紧凑的二进制文件 data/lunar_table.bin，
+运行时通过 mmap 映射，公历转农历只需一次数组下标访问。
+
+文件格式（小端序）：
+    头部  : magic(4s) 版本(H) 记录字节数(H) 起始日序(I) 记录条数(I)
+    记录  : 每天一个 uint32
+            bit 0-4   农历日（1-30）
+            bit 5-8   农历月（1-12）
+            bit 9     是否闰月
+            bit 10-17 农历年 - 1900
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional, Tuple
+
+from lunardate import LunarDate
+
+TABLE_PATH = Path(__file__).parent.parent.parent / 'data' / 'lunar_table.bin'
+
+MAGIC = b'LUNR'
+VERSION = 1
+RECORD_SIZE = 4
+HEADER = struct.Struct('<4sHHII')
+
+BASE_YEAR = 1900
+START_DATE = date(1900, 1, 31)  # 农历 1900 年正月初一
+START_ORDINAL = START_DATE.toordinal()
+
+DAY_MASK = 0x1F
+MONTH_SHIFT = 5
+MONTH_MASK = 0xF
+LEAP_SHIFT = 9
+YEAR_SHIFT = 10
+YEAR_MASK = 0xFF
+
+
+def pack_record(lunar_year: int, lunar_month: int, lunar_day: int, is_leap: bool) -> int:
+    """将农历日期打包为一个 uint32 记录"""
+    return (
+        lunar_day
+        | (lunar_month << MONTH_SHIFT)
+        | (int(is_leap) << LEAP_SHIFT)
+        | ((lunar_year - BASE_YEAR) << YEAR_SHIFT)
+    )
+
+
+def unpack_record(record: int) -> Tuple[int, int, int, bool]:
+    """将 uint32 记录解包为 (农历年, 月, 日, 是否闰月)"""
+    return (
+        BASE_YEAR + ((record >> YEAR_SHIFT) & YEAR_MASK),
+        (record >> MONTH_SHIFT) & MONTH_MASK,
+        record & DAY_MASK,
+        bool((record >> LEAP_SHIFT) & 1),
+    )
+
+
+def _count_days() -> int:
+    """lunardate 支持的总天数（农历 1900 年正月初一至 2099 年除夕）"""
+    last_year = BASE_YEAR
+    while True:
+        try:
+            LunarDate.leapMonthForYear(last_year + 1)
+        except ValueError:
+            break
+        last_year += 1
+    # 最后一个农历年的除夕（腊月可能为闰月，可能只有29天）
+    leap = LunarDate.leapMonthForYear(last_year) == 12
+    try:
+        last = LunarDate(last_year, 12, 30, leap).toSolarDate()
+    except ValueError:
+        last = LunarDate(last_year, 12, 29, leap).toSolarDate()
+    return (last - START_DATE).days + 1
+
+
+def build_lunar_table(path: Optional[Path] = None) -> Path:
+    """
+    使用 lunardate 逐日生成农历速查表并写入二进制文件
+
+    Args:
+        path: 输出路径，默认为 data/lunar_table.bin
+
+    Returns:
+        Path: 写入的文件路径
+    """
+    path = Path(path) if path else TABLE_PATH
+    count = _count_days()
+
+    records = array('I')
+    current = START_DATE
+    for _ in range(count):
+        lunar = LunarDate.fromSolarDate(current.year, current.month, current.day)
+        records.append(pack_record(lunar.year, lunar.month, lunar.day, lunar.isLeapMonth))
+        current += timedelta(days=1)
+
+    if sys.byteorder != 'little':
+        records.byteswap()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, START_ORDINAL, count))
+        f.write(records.tobytes())
+    return path
+
+
+class LunarTable:
+    """mmap 映射的农历速查表"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else TABLE_PATH
+        if not self.path.exists():
+            build_lunar_table(self.path)
+
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size, start_ordinal, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            self._mmap.close()
+            raise ValueError(f"农历速查表格式不匹配：{self.path}")
+
+        self.start_ordinal = start_ordinal
+        self.count = count
+
+        body = memoryview(self._mmap)[HEADER.size:HEADER.size + count * RECORD_SIZE]
+        if sys.byteorder == 'little':
+            self.records = body.cast('I')
+        else:
+            self.records = array('I', body.tobytes())
+            self.records.byteswap()
+
+    @property
+    def end_ordinal(self) -> int:
+        """表尾日序（不含）"""
+        return self.start_ordinal + self.count
+
+    def __contains__(self, ordinal: int) -> bool:
+        return self.start_ordinal <= ordinal < self.end_ordinal
+
+    def record(self, ordinal: int) -> int:
+        """按公历日序（date.toordinal()）读取原始记录"""
+        return self.records[ordinal - self.start_ordinal]
+
+    def lookup(self, ordinal: int) -> Tuple[int, int, int, bool]:
+        """按公历日序查询农历日期"""
+        return unpack_record(self.records[ordinal - self.start_ordinal])
+
+
+_table: Optional[LunarTable] = None
+
+
+def get_lunar_table() -> LunarTable:
+    """获取进程内共享的农历速查表（首次调用时加载）"""
+    global _table
+    if _table is None:
+        _table = LunarTable()
+    return _table
+
+
+if __name__ == "__main__":
+    print(f"已生成农历速查表：{build_lunar_table()}")
@@ -1,15 +1,35 @@
-def getbihua(char: str) -> int:
-    dictionary_path = 'data/hanzi_dictionary.txt'
-    
-    with open(dictionary_path, 'r', encoding='utf-8') as f:
+from typing import Dict, Iterator, Optional, Tuple
+
+DICTIONARY_PATH = 'data/hanzi_dictionary.txt'
+
+
+def iter_dictionary() -> Iterator[Tuple[str, int]]:
+    """按字典文件顺序逐个产出 (汉字, 笔画数)"""
+    with open(DICTIONARY_PATH, 'r', encoding='utf-8') as f:
         for line in f:
             parts = line.strip().split()
-            if len(parts) >= 2 and parts[0] == char:
-                # The stroke count is the 8th and 9th characters of the second part
-                return int(parts[1][7:9])
-    
-    # If the character is not found in the dictionary
-    return -1
+            if len(parts) >= 2:
+                yield parts[0], int(parts[1][7:9])
+
+
+_stroke_table: Optional[Dict[str, int]] = None
+
+
+def get_stroke_table() -> Dict[str, int]:
+    """获取 汉字 -> 笔画数 查询表（首次调用时读取字典文件，之后常驻内存）"""
+    global _stroke_table
+    if _stroke_table is None:
+        table = {}
+        for char, count in iter_dictionary():
+            # 字典中重复出现的汉字以第一条为准
+            table.setdefault(char, count)
+        _stroke_table = table
+    return _stroke_table
+
+
+def getbihua(char: str) -> int:
+    # If the character is not found in the dictionary, return -1
+    return get_stroke_table().get(char, -1)
 
 def get_stroke_counts(chars: str) -> list[int]:
     """
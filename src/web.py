@@ -14,21 +14,29 @@ from typing import Optional, List
 # Add the src directory to the path to import our modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from fastapi.responses import JSONResponse, PlainTextResponse
 from nicegui import ui, app
 from nicegui.events import ValueChangeEventArguments
 
 from hand_technique import HandTechnique
-from ai_agent import DivinationAgent, SupportedModels
+from ai_agent import ConversationSession, DivinationAgent, SupportedModels
+import offline_interpreter
+from response_length import LENGTH_LABELS, default_length_mode
 from utils.stroke_count import get_stroke_counts
 from utils.calendar_converter import solar_to_lunar
+from almanac import day_almanac, lookup_time
+import metrics
+import tracing
 
 
 class DivinationWebApp:
     def __init__(self):
         self.current_model = None
         self.available_models = []
+        self.length_mode = default_length_mode()
         self.divination_result = None
         self.ai_interpretation = None
+        self.session = None  # follow-up conversation for the current divination
         
         # UI element references
         self.model_select = None
@@ -38,8 +46,11 @@ class DivinationWebApp:
         self.time_input = None
         self.chinese_input = None
         self.question_input = None
+        self.length_select = None
         self.result_area = None
         self.ai_result_area = None
+        self.follow_up_area = None
+        self.follow_up_input = None
         self.error_message = None
         
         # Initialize available models
@@ -75,7 +86,8 @@ class DivinationWebApp:
         # Get stroke counts for first 3 characters
         first_three = chinese_chars[:3]
         try:
-            stroke_counts = get_stroke_counts(first_three)
+            with tracing.span("strokes.lookup", chars=len(first_three)):
+                stroke_counts = get_stroke_counts(first_three)
             if not stroke_counts:
                 return False, "无法计算汉字笔画数", []
             return True, "", stroke_counts
@@ -108,6 +120,7 @@ class DivinationWebApp:
     
     async def _perform_divination(self):
         """Perform divination based on current input"""
+        stage = tracing.start_span("web.perform_divination")
         try:
             # Clear previous results
             self.result_area.clear()
@@ -127,6 +140,9 @@ class DivinationWebApp:
                 return
             
             # Validate inputs based on current tab
+            stage.set(mode=current_tab)
+            metrics.DIVINATION_REQUESTS.labels(mode=current_tab).inc()
+            validation = tracing.start_span("web.validate", mode=current_tab)
             if current_tab == "numbers":
                 valid, error_msg, numbers = self._validate_numbers(
                     self.number_inputs[0].value,
@@ -145,41 +161,47 @@ class DivinationWebApp:
             else:
                 self._show_error("请选择输入方式")
                 return
+            validation.end(valid=valid)
             
             if not valid:
                 self._show_error(error_msg)
                 return
             
-            # Show loading with modern design
-            self.result_area.clear()
-            with self.result_area:
-                with ui.card().classes('w-full bento-card rounded-2xl p-12 text-center'):
-                    ui.spinner('dots', size='lg').props('color=purple')
-                    ui.label('正在连接天地智慧...').classes('text-xl text-gray-300 mt-4')
-            
-            # Force UI update to show spinner
-            await asyncio.sleep(0.1)
-            
-            # Perform divination
-            if not self.current_model:
-                self._show_error("请先配置AI模型")
-                return
-            
-            # Get divination result
-            table, ai_result = await HandTechnique.predict_async(
-                numbers[0], numbers[1], numbers[2], 
-                question, self.current_model
-            )
-            
-            # Get the actual symbols for better display
             symbols = HandTechnique._HandTechnique__generate_prediction(numbers[0], numbers[1], numbers[2])
             relations = HandTechnique._HandTechnique__get_relations(symbols)
             
-            # Display results
-            self._display_results(symbols, relations, ai_result)
+            if self.current_model:
+                # Instant template reading while waiting for the LLM; replaced when the LLM result arrives
+                with tracing.span("web.instant_answer"):
+                    self._display_results(symbols, relations, None)
+                    self._display_instant_result(offline_interpreter.interpret(symbols, question))
+                    metrics.OFFLINE_INTERPRETATIONS.labels(reason="instant").inc()
+                
+                # Force UI update to show the instant answer
+                await asyncio.sleep(0)
+            
+            # Get divination result (offline template reading when no AI model is configured);
+            # a new divination starts a new follow-up session
+            self.session = ConversationSession()
+            model_name = self.current_model.value if self.current_model else "offline"
+            with tracing.span("web.predict", model=model_name):
+                table, ai_result = await HandTechnique.predict_async(
+                    numbers[0], numbers[1], numbers[2], 
+                    question, self.current_model, self.length_mode, self.session
+                )
+            
+            with tracing.span("web.render"):
+                if self.current_model:
+                    # Symbols are already on screen with the instant answer
+                    self._display_ai_result(ai_result)
+                else:
+                    self._display_results(symbols, relations, ai_result)
             
         except Exception as e:
+            stage.set(error=type(e).__name__)
             self._show_error(f"占卜计算错误: {str(e)}")
+        finally:
+            stage.end()
     
     def _display_results(self, symbols, relations, ai_result):
         """Display divination results"""
@@ -289,6 +311,55 @@ class DivinationWebApp:
                 with ui.card_section().classes('p-8'):
                     cleaned_result = self._clean_ai_result(ai_result)
                     ui.markdown(cleaned_result).classes('ai-interpretation prose prose-invert max-w-none')
+            
+            if self.session and self.session.started:
+                self._create_follow_up_card()
+    
+    def _create_follow_up_card(self):
+        """Follow-up questions about the same 三传, answered with the session history"""
+        with ui.card().classes('w-full bento-card rounded-2xl p-6 mt-6'):
+            with ui.row().classes('items-center gap-3 mb-4'):
+                ui.icon('forum', size='2rem').classes('text-cyan-400')
+                ui.label('继续追问').classes('text-xl font-semibold text-white')
+            self.follow_up_area = ui.column().classes('w-full gap-4')
+            with ui.row().classes('w-full items-center gap-2 no-wrap'):
+                self.follow_up_input = ui.input(
+                    placeholder='针对这次的三传继续提问，例如：什么时候行动最好？'
+                ).classes('flex-grow').props('dark filled').on('keydown.enter', self._follow_up)
+                ui.button('追问', icon='send', on_click=self._follow_up).props('color=purple')
+    
+    async def _follow_up(self):
+        """Ask a follow-up question; only the new question is added to the conversation"""
+        question = (self.follow_up_input.value or '').strip()
+        if not question or not self.session or not self.session.started:
+            return
+        self.follow_up_input.set_value('')
+        with self.follow_up_area:
+            with ui.column().classes('w-full gap-2') as entry:
+                ui.label(f'问：{question}').classes('text-purple-300 font-semibold')
+                spinner = ui.spinner('dots', size='md').props('color=purple')
+        
+        with tracing.span("web.follow_up", model=self.current_model.value):
+            agent = DivinationAgent(self.current_model)
+            answer = await agent.follow_up_async(self.session, question, self.length_mode)
+        
+        spinner.delete()
+        with entry:
+            ui.markdown(self._clean_ai_result(answer)).classes('ai-interpretation prose prose-invert max-w-none')
+    
+    def _display_instant_result(self, text):
+        """Show the template reading immediately while the LLM interpretation is generated"""
+        self.ai_result_area.clear()
+        with self.ai_result_area:
+            with ui.card().classes('w-full bento-card rounded-2xl overflow-hidden'):
+                with ui.element('div').classes('gradient-cyan p-6'):
+                    with ui.row().classes('items-center gap-3'):
+                        ui.spinner('dots', size='2rem').props('color=white')
+                        ui.label('即时解读 · AI 解读生成中').classes('text-2xl font-bold text-white')
+                
+                with ui.card_section().classes('p-8 opacity-80'):
+                    ui.markdown(self._clean_ai_result(text)).classes(
+                        'ai-interpretation instant-interpretation prose prose-invert max-w-none')
     
     def _clean_ai_result(self, text: str) -> str:
         """Clean and format AI result text for web display"""
@@ -317,6 +388,10 @@ class DivinationWebApp:
                 self.current_model = model
                 break
     
+    def _on_length_change(self, e: ValueChangeEventArguments):
+        """Handle response length selection change"""
+        self.length_mode = e.value
+    
     def create_ui(self):
         """Create the main UI"""
         # Set up modern gradient color scheme
@@ -482,9 +557,10 @@ class DivinationWebApp:
                             on_change=self._on_model_change
                         ).classes('w-full').props('dark filled')
                     else:
-                        with ui.card().classes('w-full bg-red-500/20 border-red-500/50 rounded-xl p-4'):
-                            ui.label('⚠️ 未找到可用的AI模型，请检查API密钥配置').classes('text-red-300')
-                        return
+                        # Offline mode: divinations still work, interpreted by the template engine
+                        with ui.card().classes('w-full bg-amber-500/20 border-amber-500/50 rounded-xl p-4'):
+                            ui.label('⚠️ 未找到可用的AI模型（请检查API密钥配置），当前为离线模式：'
+                                     '使用离线模板解读').classes('text-amber-300')
             
                 # Input section with modern tabs
                 with ui.card().classes('w-full bento-card rounded-2xl p-6 mb-6'):
@@ -548,6 +624,14 @@ class DivinationWebApp:
                         placeholder='请详细描述您要占卜的问题...\n例如：今日运势如何？工作项目能否顺利？感情发展趋势？',
                         validation={'请输入问题': lambda value: len(value.strip()) > 0}
                     ).classes('w-full').props('dark filled autogrow rows=3')
+                    
+                    # Shorter answers for yes/no questions: "auto" picks the tier from the question
+                    self.length_select = ui.select(
+                        LENGTH_LABELS,
+                        label='解读篇幅',
+                        value=self.length_mode,
+                        on_change=self._on_length_change
+                    ).classes('w-full mt-2').props('dark filled')
             
                 # Error message area
                 self.error_message = ui.label('').classes('text-red-400 text-center font-semibold mb-4')
@@ -570,26 +654,51 @@ class DivinationWebApp:
                 self.ai_result_area = ui.column().classes('w-full')
 
 
-def main():
+def main(host: str = '0.0.0.0', port: int = 8080, reload: bool = True):
     """Main function to run the web application"""
     # Set working directory to project root
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     os.chdir(project_root)
     
-    # Create the application
-    web_app = DivinationWebApp()
-    
-    # Set up the main page with dark theme
+    # Set up the main page with dark theme; every browser tab gets its own app state,
+    # otherwise concurrent visitors would overwrite each other's input and result elements
     @ui.page('/', dark=True)
     def index():
-        web_app.create_ui()
+        DivinationWebApp().create_ui()
+
+    @app.get('/api/almanac')
+    def almanac_api(date: str, hour: Optional[int] = None):
+        """Date-method outcomes for one day (all 12 shichen) or for the shichen containing `hour`"""
+        try:
+            day = datetime.strptime(date, "%Y-%m-%d")
+            if hour is None:
+                return {"date": date, "shichen": [entry.to_dict() for entry in day_almanac(day.date())]}
+            if not 0 <= hour <= 23:
+                raise ValueError("hour must be between 0 and 23")
+            return lookup_time(day.replace(hour=hour)).to_dict()
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+
+    @app.get('/metrics')
+    def metrics_endpoint():
+        """Prometheus text exposition of request, LLM, cache and event-loop metrics"""
+        return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+    # Browser sessions and event-loop lag
+    app.on_connect(lambda: metrics.ACTIVE_SESSIONS.inc())
+    app.on_disconnect(lambda: metrics.ACTIVE_SESSIONS.dec())
+
+    async def monitor_event_loop():
+        await metrics.monitor_event_loop()
+
+    app.on_startup(monitor_event_loop)
     
     # Configure and run the application
     ui.run(
         title='小六壬占卜 Web版',
-        port=8080,
-        host='0.0.0.0',
-        reload=True,
+        port=port,
+        host=host,
+        reload=reload,
         favicon='🔮',
         dark=True
     )